@@ -0,0 +1,92 @@
+"""
+Script para autoajustar los filtros de un usuario a partir de sesiones grabadas
+Activa 'record_gaze_traces' en data/config.json para grabar trazas durante el uso
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from src.database.db_manager import DatabaseManager
+from src.core.autotune import FilterAutotuner
+from src.core.gaze_trace import find_user_traces, load_gaze_trace
+from src.utils.logger import setup_logger
+
+
+def select_user(db: DatabaseManager):
+    """Muestra los usuarios y retorna el seleccionado"""
+    users = db.get_all_users()
+    if not users:
+        print("\nNo hay usuarios registrados")
+        return None
+
+    print("\nUsuarios:")
+    for i, user in enumerate(users, 1):
+        traces = find_user_traces(user['id'])
+        print(f"{i}. {user['username']} ({len(traces)} trazas grabadas)")
+
+    try:
+        choice = input("\nSelecciona el número de usuario: ").strip()
+        idx = int(choice) - 1
+        if 0 <= idx < len(users):
+            return users[idx]
+        print("✗ Opción inválida")
+    except (ValueError, IndexError):
+        print("✗ Entrada inválida")
+    return None
+
+
+def main():
+    logger = setup_logger()
+    db = DatabaseManager()
+
+    print("=" * 60)
+    print("AUTOAJUSTE DE FILTROS - Gaze Control v2.0")
+    print("=" * 60)
+
+    try:
+        user = select_user(db)
+        if not user:
+            return
+
+        trace_files = find_user_traces(user['id'])
+        if not trace_files:
+            print(f"\n✗ No hay trazas grabadas para '{user['username']}'")
+            print("  Activa 'record_gaze_traces' en data/config.json y usa el sistema unos minutos")
+            return
+
+        # Los parámetros dependen del espacio de la traza: se ajusta el de la
+        # traza más reciente (la configuración actual del usuario)
+        loaded = [load_gaze_trace(path) for path in trace_files]
+        space = loaded[-1][1]
+        traces = [trace for trace, trace_space in loaded if trace_space == space]
+        skipped = len(loaded) - len(traces)
+        if skipped:
+            logger.warning(f"{skipped} trazas de otro espacio de coordenadas omitidas "
+                           f"(se ajusta el espacio '{space}')")
+        total = sum(len(trace) for trace in traces)
+        print(f"\nEvaluando {len(traces)} trazas en espacio '{space}' ({total} muestras)...")
+
+        tuner = FilterAutotuner(space=space, logger=logger)
+        results = tuner.tune(traces)
+
+        print("\nMejores combinaciones:")
+        print(f"  {'Deadzone':>9} {'MinCutoff':>10} {'Beta':>6} {'Jitter':>9} {'Lag (ms)':>9} {'Score':>7}")
+        for r in results[:5]:
+            print(f"  {r['deadzone']:>9.3f} {r['filter_min_cutoff']:>10.2f} {r['filter_beta']:>6.2f} "
+                  f"{r['jitter']:>9.5f} {r['lag'] * 1000:>9.1f} {r['score']:>7.2f}")
+
+        confirm = input(f"\n¿Guardar el mejor perfil para '{user['username']}'? (si/no): ").strip().lower()
+        if confirm in ['si', 'sí', 's', 'yes', 'y']:
+            tuner.save_profile(db, user['id'], results[0])
+            print("\n✓ Perfil autoajustado guardado")
+        else:
+            print("\nSin cambios")
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Benchmarks de autenticación facial"""
+import pickle
+import numpy as np
+from harness import benchmark
+
+
+@benchmark("face_auth.verify_face_multi", iterations=200, group="auth")
+def bench_verify_face_multi(ctx):
+    from src.auth.face_auth import FaceAuthenticator
+
+    auth = FaceAuthenticator(similarity_threshold=0.85, max_faces=3)
+    auth.initialize()
+    embedding = ctx.rng.random(478 * 3).astype(np.float32)
+    registered = pickle.dumps(embedding / np.linalg.norm(embedding))
+    frames = ctx.frame_cycle()
+
+    def op():
+        auth.verify_face_multi(next(frames), registered)
+    return op
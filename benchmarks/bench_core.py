@@ -0,0 +1,259 @@
+"""Benchmarks del pipeline de seguimiento de mirada"""
+import itertools
+from harness import benchmark, SkipBenchmark
+
+
+@benchmark("one_euro.filter", iterations=20000, group="filters")
+def bench_one_euro(ctx):
+    from src.core.filters import OneEuro
+
+    f = OneEuro(min_cutoff=2.0, beta=0.08)
+    xs = ctx.rng.random(1024).tolist()
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        f.filter(xs[i & 1023], i / 30.0)
+    return op
+
+
+@benchmark("one_euro_bank.filter[2]", iterations=20000, group="filters")
+def bench_one_euro_bank(ctx):
+    from src.core.filters import OneEuroBank
+
+    f = OneEuroBank(min_cutoff=2.0, beta=0.08)
+    xs = ctx.rng.random((1024, 2))
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        f.filter(xs[i & 1023], i / 30.0)
+    return op
+
+
+@benchmark("one_euro_xy.filter", iterations=20000, group="filters")
+def bench_one_euro_xy(ctx):
+    from src.core.filters import OneEuroXY
+
+    f = OneEuroXY(min_cutoff=2.0, beta=0.08)
+    xs = ctx.rng.random((1024, 2)).tolist()
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        f.filter(xs[i & 1023], i / 30.0)
+    return op
+
+
+@benchmark("one_euro_bank.filter[478x3]", iterations=5000, group="filters")
+def bench_one_euro_bank_landmarks(ctx):
+    from src.core.filters import OneEuroBank
+
+    f = OneEuroBank(min_cutoff=2.0, beta=0.08)
+    xs = ctx.rng.random((16, 478, 3))
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        f.filter(xs[i & 15], i / 30.0)
+    return op
+
+
+@benchmark("kalman_cv.filter[2]", iterations=20000, group="filters")
+def bench_kalman(ctx):
+    from src.core.filters import ConstantVelocityKalman
+
+    f = ConstantVelocityKalman(latency=0.06)
+    xs = ctx.rng.random((1024, 2))
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        f.filter(xs[i & 1023], i / 30.0)
+    return op
+
+
+@benchmark("calibration.map_to_screen", iterations=20000, group="calibration")
+def bench_map_to_screen(ctx):
+    from src.core.calibration import Calibration
+
+    calibration = Calibration(1920, 1080)
+    for (x, y) in calibration.get_grid_points(3, 3):
+        calibration.add_sample(x / 1920 + ctx.rng.normal(0, 0.01),
+                               y / 1080 + ctx.rng.normal(0, 0.01), x, y)
+    if not calibration.compute_calibration():
+        raise SkipBenchmark("calibración sintética fallida")
+
+    xs = ctx.rng.random((1024, 2)).tolist()
+    counter = itertools.count()
+
+    def op():
+        x, y = xs[next(counter) & 1023]
+        calibration.map_to_screen(x, y)
+    return op
+
+
+def _make_tracker():
+    from src.core.gaze_tracker import GazeTracker
+    return GazeTracker(1920, 1080, gain=1.85, deadzone=0.008,
+                       filter_min_cutoff=2.0, filter_beta=0.08)
+
+
+@benchmark("gaze_tracker.process_frame", iterations=300, group="pipeline")
+def bench_process_frame(ctx):
+    tracker = _make_tracker()
+    frames = ctx.frame_cycle()
+
+    def op():
+        tracker.process_frame(next(frames))
+    return op
+
+
+@benchmark("gaze_tracker.process_frame[landmarks]", iterations=2000, group="pipeline")
+def bench_process_frame_landmarks(ctx):
+    """Etapas posteriores a FaceMesh con landmarks sintéticos"""
+    tracker = _make_tracker()
+    results = ctx.synthetic_face_results()
+    tracker.face_detector.detect = lambda frame, rgb=None: results
+    frame = ctx.frames[0]
+
+    def op():
+        tracker.process_frame(frame)
+    return op
+
+
+@benchmark("gaze_tracker.detect_gestures", iterations=300, group="pipeline")
+def bench_detect_gestures(ctx):
+    tracker = _make_tracker()
+    frames = ctx.frame_cycle()
+
+    def op():
+        tracker.detect_gestures(next(frames))
+    return op
+
+
+@benchmark("gaze_tracker.detect_gestures[landmarks]", iterations=5000, group="pipeline")
+def bench_detect_gestures_landmarks(ctx):
+    tracker = _make_tracker()
+    results = ctx.synthetic_face_results()
+    tracker.face_detector.detect = lambda frame, rgb=None: results
+    frame = ctx.frames[0]
+
+    def op():
+        tracker.detect_gestures(frame)
+    return op
+
+
+@benchmark("gesture_engine.update", iterations=20000, group="pipeline")
+def bench_gesture_engine(ctx):
+    from src.core.gestures import GestureEngine
+
+    engine = GestureEngine()
+    # EAR alternando ojos abiertos y guiños de ambos ojos
+    ears = ctx.rng.choice([0.1, 0.3], size=(1024, 2), p=[0.2, 0.8]).tolist()
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        left, right = ears[i & 1023]
+        engine.update(left, right, 0.5, i / 30.0)
+    return op
+
+
+@benchmark("ear_classifier.update", iterations=20000, group="pipeline")
+def bench_ear_classifier(ctx):
+    from src.core.ear_classifier import EarSequenceClassifier
+
+    classifier = EarSequenceClassifier()
+    closures = ctx.rng.choice([0.0, 0.35, 0.7], size=(1024, 2), p=[0.8, 0.1, 0.1]).tolist()
+    counter = itertools.count()
+
+    def op():
+        i = next(counter)
+        left, right = closures[i & 1023]
+        classifier.update(left, right, i / 30.0)
+    return op
+
+
+@benchmark("target_snapper.update", iterations=20000, group="pipeline")
+def bench_target_snapper(ctx):
+    from src.core.targets import TargetSnapper
+
+    snapper = TargetSnapper()
+    # 500 objetivos del tamaño de botones y enlaces en una pantalla 1920x1080
+    origins = ctx.rng.uniform((0, 0), (1900, 1060), size=(500, 2))
+    sizes = ctx.rng.uniform((8, 8), (120, 40), size=(500, 2))
+    snapper.set_targets([o + s for o, s in zip(origins.tolist(), sizes.tolist())])
+    points = ctx.rng.uniform((0, 0), (1920, 1080), size=(1024, 2)).tolist()
+    counter = itertools.count()
+
+    def op():
+        x, y = points[next(counter) & 1023]
+        snapper.update(x, y, 'fixation')
+    return op
+
+
+@benchmark("pupil_localizer.locate", iterations=2000, group="pipeline")
+def bench_pupil_localizer(ctx):
+    import cv2 as cv
+    from src.core.pupil import PupilLocalizer
+
+    localizer = PupilLocalizer()
+    gray = cv.cvtColor(ctx.frames[0], cv.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    # Caja de un ojo de ~1/12 del ancho del frame
+    eye_rect = (w // 2, h // 3, w // 12, w // 12)
+
+    def op():
+        localizer.locate(gray, eye_rect)
+    return op
+
+
+@benchmark("frame_preprocessor.process", iterations=2000, group="pipeline")
+def bench_frame_preprocessor(ctx):
+    from src.core.frame_preprocessor import FramePreprocessor
+
+    preprocessor = FramePreprocessor()
+    frames = ctx.frame_cycle()
+
+    def op():
+        preprocessor.process(next(frames))
+    return op
+
+
+@benchmark("metrics.render", iterations=2000, group="metrics")
+def bench_metrics_render(ctx):
+    from src.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    latency = registry.histogram('action_latency_seconds', "Latencia de las acciones",
+                                 label_names=('action',))
+    gestures = registry.counter('gesture_events_total', "Gestos", label_names=('gesture',))
+    for action in ('page_back', 'tab_next'):
+        for value in ctx.rng.random(100) * 0.1:
+            latency.labels(action).observe(float(value))
+        gestures.labels(action).inc()
+
+    # Cada serie de un histograma etiquetado debe llevar su etiqueta (Prometheus
+    # rechaza series duplicadas sin etiquetas)
+    text = registry.render()
+    for action in ('page_back', 'tab_next'):
+        for suffix in ('_bucket{', '_sum{', '_count{'):
+            if f'gaze_action_latency_seconds{suffix}action="{action}"' not in text:
+                raise RuntimeError(f"serie sin etiqueta action=\"{action}\" en {suffix}")
+
+    def op():
+        registry.render()
+    return op
+
+
+@benchmark("flip+cvtColor (sin buffers)", iterations=2000, group="pipeline")
+def bench_flip_cvtcolor(ctx):
+    import cv2 as cv
+
+    frames = ctx.frame_cycle()
+
+    def op():
+        frame = cv.flip(next(frames), 1)
+        cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+    return op
@@ -0,0 +1,63 @@
+"""Benchmarks de operaciones de base de datos"""
+import atexit
+import itertools
+import shutil
+import tempfile
+import numpy as np
+from pathlib import Path
+from harness import benchmark
+
+
+def _make_db():
+    """Base de datos temporal con un usuario"""
+    from src.database.db_manager import DatabaseManager
+
+    tmp_dir = tempfile.mkdtemp(prefix="gaze_bench_")
+    atexit.register(shutil.rmtree, tmp_dir, True)
+    db = DatabaseManager(str(Path(tmp_dir) / "bench.db"))
+    atexit.register(db.close)
+    user_id = db.register_user("bench_user", b"\x00" * 64)
+    return db, user_id
+
+
+@benchmark("db.save_configuration", iterations=500, group="database")
+def bench_save_configuration(ctx):
+    db, user_id = _make_db()
+    counter = itertools.count()
+
+    def op():
+        db.save_configuration(user_id, 'gain', 1.0 + (next(counter) % 100) / 100.0)
+    return op
+
+
+@benchmark("db.get_all_configurations", iterations=2000, group="database")
+def bench_get_all_configurations(ctx):
+    db, user_id = _make_db()
+    for key in ('gain', 'deadzone', 'filter_min_cutoff', 'filter_beta', 'dwell_enabled'):
+        db.save_configuration(user_id, key, 1.0)
+
+    def op():
+        db.get_all_configurations(user_id)
+    return op
+
+
+@benchmark("db.save_calibration", iterations=300, group="database")
+def bench_save_calibration(ctx):
+    db, user_id = _make_db()
+    matrix = ctx.rng.random((2, 5))
+    src = [tuple(row) for row in ctx.rng.random((9, 4))]
+    dst = [(int(x), int(y)) for x, y in ctx.rng.integers(0, 1920, (9, 2))]
+
+    def op():
+        db.save_calibration(user_id, matrix, src, dst)
+    return op
+
+
+@benchmark("db.get_active_calibration", iterations=1000, group="database")
+def bench_get_active_calibration(ctx):
+    db, user_id = _make_db()
+    db.save_calibration(user_id, np.eye(2, 3), [(0.5, 0.5)] * 9, [(960, 540)] * 9)
+
+    def op():
+        db.get_active_calibration(user_id)
+    return op
@@ -0,0 +1,29 @@
+"""Benchmarks de renderizado de la interfaz"""
+from harness import benchmark
+
+
+@benchmark("main_window.draw_hud", iterations=2000, group="ui")
+def bench_draw_hud(ctx):
+    from src.ui.main_window import MainWindow
+
+    window = MainWindow()
+    window.update_auth_status(True, 0.93)
+    config = {'gain': 1.85, 'deadzone': 0.008, 'dwell_enabled': False}
+    user = {'username': 'bench_user'}
+    frames = ctx.frame_cycle()
+
+    def op():
+        window.draw_hud(next(frames), config, user)
+    return op
+
+
+@benchmark("main_window.draw_warning", iterations=2000, group="ui")
+def bench_draw_warning(ctx):
+    from src.ui.main_window import MainWindow
+
+    window = MainWindow()
+    frames = ctx.frame_cycle()
+
+    def op():
+        window.draw_warning(next(frames), "USUARIO NO RECONOCIDO - CONTROL BLOQUEADO")
+    return op
@@ -0,0 +1,146 @@
+"""Infraestructura de medición para los benchmarks"""
+import gc
+import time
+import tracemalloc
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+
+# Registro global: nombre -> (setup, iteraciones, grupo)
+BENCHMARKS: Dict[str, dict] = {}
+
+
+class SkipBenchmark(Exception):
+    """Se lanza desde el setup cuando falta una dependencia o un recurso"""
+
+
+def benchmark(name: str, iterations: int = 1000, group: str = "core"):
+    """
+    Registra un benchmark. La función decorada recibe el contexto y retorna
+    la operación (sin argumentos) a medir
+
+    Args:
+        name: Nombre único del benchmark
+        iterations: Número de operaciones medidas
+        group: Grupo al que pertenece
+    """
+    def decorator(setup: Callable):
+        BENCHMARKS[name] = {'setup': setup, 'iterations': iterations, 'group': group}
+        return setup
+    return decorator
+
+
+def measure(op: Callable, iterations: int, warmup: int = 20,
+            track_allocations: bool = True) -> dict:
+    """
+    Mide una operación
+
+    Args:
+        op: Operación sin argumentos
+        iterations: Número de repeticiones medidas
+        warmup: Repeticiones previas no medidas
+        track_allocations: Medir también memoria asignada por operación
+
+    Returns:
+        Diccionario con percentiles (µs), throughput (ops/s) y asignaciones
+    """
+    for _ in range(warmup):
+        op()
+
+    samples = np.empty(iterations, dtype=np.int64)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(iterations):
+            start = time.perf_counter_ns()
+            op()
+            samples[i] = time.perf_counter_ns() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    us = samples / 1000.0
+    result = {
+        'iterations': iterations,
+        'mean_us': float(us.mean()),
+        'p50_us': float(np.percentile(us, 50)),
+        'p95_us': float(np.percentile(us, 95)),
+        'p99_us': float(np.percentile(us, 99)),
+        'max_us': float(us.max()),
+        'throughput_ops': float(1e9 / max(1.0, samples.mean()))
+    }
+
+    if track_allocations:
+        result.update(_measure_allocations(op, min(iterations, 200)))
+
+    return result
+
+
+def _measure_allocations(op: Callable, iterations: int) -> dict:
+    """
+    Memoria por operación con tracemalloc: pico transitorio y bytes retenidos.
+    Se mide en una pasada aparte porque tracemalloc ralentiza la ejecución
+    """
+    tracemalloc.start()
+    try:
+        peaks = []
+        before_total = tracemalloc.get_traced_memory()[0]
+        for _ in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+        retained = tracemalloc.get_traced_memory()[0] - before_total
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'alloc_peak_bytes': float(np.mean(peaks)),
+        'alloc_retained_bytes': float(retained / iterations)
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            tolerance: float = 0.15, metrics=('p50_us', 'p95_us')) -> List[dict]:
+    """
+    Compara resultados contra una línea base
+
+    Args:
+        results: Resultados actuales por benchmark
+        baseline: Resultados de referencia por benchmark
+        tolerance: Empeoramiento relativo permitido
+        metrics: Métricas a comparar
+
+    Returns:
+        Lista de regresiones detectadas
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or 'skipped' in result or 'skipped' in reference:
+            continue
+        for metric in metrics:
+            old, new = reference.get(metric), result.get(metric)
+            if old and new and new > old * (1.0 + tolerance):
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': new / old - 1.0
+                })
+    return regressions
+
+
+def run_benchmark(name: str, context, iterations: Optional[int] = None) -> dict:
+    """Ejecuta un benchmark registrado"""
+    spec = BENCHMARKS[name]
+    try:
+        op = spec['setup'](context)
+    except SkipBenchmark as e:
+        return {'skipped': str(e)}
+    except ImportError as e:
+        return {'skipped': f"dependencia no disponible: {e}"}
+
+    return measure(op, iterations or spec['iterations'])
@@ -0,0 +1,74 @@
+"""Entradas sintéticas y grabadas para los benchmarks"""
+import types
+import numpy as np
+from typing import List, Optional
+
+
+class BenchmarkContext:
+    """Frames de entrada y utilidades compartidas por los benchmarks"""
+
+    def __init__(self, recording: Optional[str] = None, width: int = 640, height: int = 480,
+                 num_frames: int = 60, seed: int = 0):
+        """
+        Args:
+            recording: Grabación .gzrec para usar frames reales
+            width: Ancho de los frames sintéticos
+            height: Alto de los frames sintéticos
+            num_frames: Frames a cargar/generar
+            seed: Semilla para entradas deterministas
+        """
+        self.rng = np.random.default_rng(seed)
+        self.recording = recording
+        self.frames = (self._load_recording(recording, num_frames) if recording
+                       else self._synthetic_frames(width, height, num_frames))
+        self.height, self.width = self.frames[0].shape[:2]
+
+    def _synthetic_frames(self, width: int, height: int, num_frames: int) -> List[np.ndarray]:
+        """Frames con gradiente y ruido (sin rostro real)"""
+        base = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        base = np.broadcast_to(base, (height, width, 3))
+        frames = []
+        for _ in range(num_frames):
+            noise = self.rng.normal(0, 8, (height, width, 3))
+            frames.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+        return frames
+
+    def _load_recording(self, path: str, num_frames: int) -> List[np.ndarray]:
+        """Frames de una grabación hecha con main.py --record"""
+        from src.core.replay import ReplaySource
+
+        source = ReplaySource(path, realtime=False)
+        frames = []
+        try:
+            while len(frames) < num_frames:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                frames.append(frame)
+        finally:
+            source.release()
+
+        if not frames:
+            raise ValueError(f"La grabación no contiene frames: {path}")
+        return frames
+
+    def frame_cycle(self):
+        """Iterador infinito sobre copias frescas de los frames"""
+        i = 0
+        n = len(self.frames)
+        while True:
+            yield self.frames[i % n].copy()
+            i += 1
+
+    def synthetic_face_results(self, num_faces: int = 1):
+        """
+        Resultado con la forma de MediaPipe Face Mesh (478 landmarks con iris),
+        ojos abiertos, para medir las etapas posteriores a la detección
+        """
+        faces = []
+        for _ in range(num_faces):
+            points = 0.5 + self.rng.normal(0, 0.1, (478, 3))
+            landmarks = [types.SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                         for x, y, z in points]
+            faces.append(types.SimpleNamespace(landmark=landmarks))
+        return types.SimpleNamespace(multi_face_landmarks=faces)
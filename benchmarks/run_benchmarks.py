@@ -0,0 +1,114 @@
+"""
+Suite de benchmarks de Gaze Control
+
+Ejemplos:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --recording data/sesion.gzrec
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --filter filters --tolerance 0.1
+"""
+import sys
+import re
+import json
+import argparse
+import platform
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from harness import BENCHMARKS, run_benchmark, compare
+from inputs import BenchmarkContext
+import bench_core  # noqa: F401  (registra benchmarks)
+import bench_auth  # noqa: F401
+import bench_db  # noqa: F401
+import bench_ui  # noqa: F401
+
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks de Gaze Control")
+    parser.add_argument('--filter', default=None,
+                        help="Regex sobre nombre o grupo de los benchmarks a ejecutar")
+    parser.add_argument('--recording', default=None,
+                        help="Grabación .gzrec para usar frames reales")
+    parser.add_argument('--iterations', type=int, default=None,
+                        help="Forzar número de iteraciones")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help="Archivo de línea base para comparar")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Guardar los resultados como nueva línea base")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Empeoramiento relativo permitido (por defecto 0.15)")
+    parser.add_argument('--output', default=None,
+                        help="Archivo JSON de resultados (por defecto benchmarks/results/)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    context = BenchmarkContext(recording=args.recording)
+
+    pattern = re.compile(args.filter) if args.filter else None
+    names = [name for name, spec in BENCHMARKS.items()
+             if not pattern or pattern.search(name) or pattern.search(spec['group'])]
+
+    print("=" * 78)
+    print(f"BENCHMARKS - {len(names)} casos, entrada: {args.recording or 'sintética'}")
+    print("=" * 78)
+    print(f"{'Benchmark':<42} {'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} {'ops/s':>9}")
+
+    results = {}
+    for name in names:
+        result = run_benchmark(name, context, args.iterations)
+        results[name] = result
+        if 'skipped' in result:
+            print(f"{name:<42} omitido: {result['skipped']}")
+        else:
+            print(f"{name:<42} {result['p50_us']:>9.1f} {result['p95_us']:>9.1f} "
+                  f"{result['p99_us']:>9.1f} {result['throughput_ops']:>9.0f}")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': platform.node(),
+        'python': platform.python_version(),
+        'input': args.recording or 'synthetic',
+        'results': results
+    }
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\nResultados guardados en {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"Línea base guardada en {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print("Sin línea base para comparar (usa --save-baseline)")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))['results']
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"✓ Sin regresiones respecto a {baseline_path} (tolerancia {args.tolerance:.0%})")
+        return 0
+
+    print(f"\n✗ {len(regressions)} regresiones (tolerancia {args.tolerance:.0%}):")
+    for r in regressions:
+        print(f"  {r['benchmark']:<42} {r['metric']}: {r['baseline']:.1f} -> "
+              f"{r['current']:.1f} µs (+{r['change']:.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,11 @@ Gaze Control - Sistema de control del cursor por mirada con autenticación
 Versión 2.0 - Mejorado con arquitectura modular y seguridad
 """
 import sys
+import argparse
 import cv2 as cv
-import pyautogui
 import time
 from pathlib import Path
+from typing import Tuple
 
 # Añadir src al path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -15,32 +16,121 @@ from src.database.db_manager import DatabaseManager
 from src.auth.user_manager import UserManager
 from src.core.gaze_tracker import GazeTracker
 from src.core.mouse_controller import MouseController
+from src.core.input_backend import create_input_backend
+from src.core.targets import TargetFileSource, parse_targets
+from src.core.frame_preprocessor import FramePreprocessor
+from src.core.replay import (FrameRecorder, RecordingCapture, ReplaySource, RecordingMouseSink,
+                             read_recording_header)
 from src.ui.main_window import MainWindow
+from src.ui.headless_window import HeadlessWindow
 from src.utils.logger import setup_logger
-from src.utils.config import Config
+from src.utils.config import Config, ConfigWatcher
 from src.utils.error_handler import ErrorHandler
+from src.utils.profiler import FrameProfiler
+from src.utils.metrics import MetricsRegistry, MetricsServer, process_rss_bytes
+from src.utils.control_server import ControlServer
 
 
 class GazeControlApp:
     """Aplicación principal de control por mirada"""
 
-    def __init__(self):
-        # Setup logging
-        self.logger = setup_logger()
+    # Parámetros ajustables en caliente: (tipo, mínimo, máximo)
+    TUNABLE_PARAMS = {
+        'gain': (float, 0.5, 2.5),
+        'deadzone': (float, 0.0, 0.1),
+        'filter_min_cutoff': (float, 0.01, 10.0),
+        'filter_beta': (float, 0.0, 1.0),
+        'dwell_enabled': (bool, None, None),
+        'dwell_time': (float, 0.2, 5.0),
+        'dwell_refractory': (float, 0.0, 10.0),
+        'debug_mode': (bool, None, None),
+        'wink_threshold': (float, 0.05, 0.5),
+        'scroll_band': (float, 0.0, 0.5),
+        'scroll_step': (int, 1, 1000),
+        'scroll_speed': (float, 0.0, 10000.0),
+        'target_snapping': (bool, None, None),
+        'snap_radius': (float, 0.0, 500.0),
+        'snap_strength': (float, 0.0, 1.0),
+        'blink_threshold': (float, 0.0, 0.5),
+        'fixation_smoothing': (float, 0.1, 10.0),
+        'saccade_smoothing': (float, 0.05, 10.0),
+        'prediction_extra_latency': (float, 0.0, 0.5),
+        'auth_check_interval': (float, 0.5, 60.0)
+    }
+
+    # Parámetros del OneEuro (los filtros de Kalman no los usan)
+    FILTER_PARAMS = ('filter_min_cutoff', 'filter_beta')
+
+    # Estado por usuario guardado junto a sus configuraciones pero que no es
+    # configuración (no se copia a config.json)
+    USER_STATE_KEYS = ('ear_model', 'actions', 'gesture_table')
+
+    # Pantalla al reproducir grabaciones sin resolución en la cabecera
+    REPLAY_SCREEN_SIZE = (1920, 1080)
+
+    def __init__(self, replay_path: str = None, replay_realtime: bool = True,
+                 record_path: str = None, profile_trace_path: str = None,
+                 metrics_port: int = None, headless: bool = False,
+                 control_port: int = None, screen_size: Tuple[int, int] = None):
+        """
+        Args:
+            replay_path: Grabación .gzrec a reproducir en lugar de la cámara
+            replay_realtime: Reproducir al ritmo original (False = máxima velocidad)
+            record_path: Archivo .gzrec donde grabar los frames de la cámara
+            profile_trace_path: Archivo Chrome Trace a exportar al salir (activa el perfilado)
+            metrics_port: Puerto del endpoint de métricas (activa la exportación)
+            headless: Ejecutar sin vista previa (sin imshow/waitKey ni dibujo)
+            control_port: Puerto de la API de control local (activa la API)
+            screen_size: Resolución de pantalla fija al reproducir (None = la de
+                la grabación)
+        """
+        self.replay_path = replay_path
+        self.replay_realtime = replay_realtime
+        self.record_path = record_path
+        self.profile_trace_path = profile_trace_path
+
+        # Configuración
+        self.config = Config()
+
+        # Setup logging (escritura en segundo plano)
+        self.logger = setup_logger(
+            json_lines=self.config.get('log_json'),
+            max_bytes=self.config.get('log_max_bytes'),
+            backup_count=self.config.get('log_backup_count'),
+            rate_limit=self.config.get('log_rate_limit')
+        )
         self.logger.info("=" * 60)
         self.logger.info("Iniciando Gaze Control v2.0")
         self.logger.info("=" * 60)
 
-        # Configuración
-        self.config = Config()
         self.error_handler = ErrorHandler(self.logger)
 
         # Base de datos y autenticación
         self.db = DatabaseManager()
         self.user_manager = UserManager(self.db)
 
+        # Perfilado por etapas (sin coste apreciable mientras está desactivado)
+        self.profiler = FrameProfiler(
+            capacity=self.config.get('profiling_buffer_frames'),
+            enabled=bool(self.config.get('profiling_enabled') or profile_trace_path),
+            logger=self.logger
+        )
+
         # Componentes principales
-        screen_w, screen_h = pyautogui.size()
+        if replay_path:
+            # Reproducción determinista: sin entrada real y con una pantalla fija
+            # (la de la grabación), igual en cualquier máquina
+            self.input_backend = create_input_backend(
+                'null', screen_size=screen_size or self._recording_screen_size(replay_path),
+                logger=self.logger
+            )
+        else:
+            self.input_backend = create_input_backend(
+                self.config.get('input_backend'),
+                failsafe=self.config.get('input_failsafe'),
+                logger=self.logger
+            )
+        screen_w, screen_h = self.input_backend.size()
         self.logger.info(f"Resolución de pantalla: {screen_w}x{screen_h}")
 
         self.gaze_tracker = GazeTracker(
@@ -49,23 +139,104 @@ class GazeControlApp:
             deadzone=self.config.get('deadzone'),
             filter_min_cutoff=self.config.get('filter_min_cutoff'),
             filter_beta=self.config.get('filter_beta'),
+            head_pose_compensation=self.config.get('head_pose_compensation'),
+            smooth_landmarks=self.config.get('smooth_landmarks'),
+            filter_type=self.config.get('filter_type'),
+            process_noise=self.config.get('kalman_process_noise'),
+            measurement_noise=self.config.get('kalman_measurement_noise'),
+            prediction_extra_latency=self.config.get('prediction_extra_latency'),
+            # En reproducción la latencia medida depende del ritmo de la máquina
+            pipeline_latency=self.config.get('replay_pipeline_latency') if replay_path else None,
+            saccade_velocity_threshold=self.config.get('saccade_velocity_threshold'),
+            fixation_dispersion_threshold=self.config.get('fixation_dispersion_threshold'),
+            fixation_smoothing=self.config.get('fixation_smoothing'),
+            saccade_smoothing=self.config.get('saccade_smoothing'),
+            blink_threshold=self.config.get('blink_threshold'),
+            wink_threshold=self.config.get('wink_threshold'),
+            adaptive_ear=self.config.get('adaptive_ear_enabled'),
+            ear_hysteresis=self.config.get('ear_hysteresis'),
+            ear_classifier=self.config.get('ear_classifier_enabled'),
+            ear_classifier_model=self.config.get('ear_classifier_model'),
+            ear_classifier_window=self.config.get('ear_classifier_window'),
+            target_snapping=self.config.get('target_snapping'),
+            snap_radius=self.config.get('snap_radius'),
+            snap_strength=self.config.get('snap_strength'),
+            profiler=self.profiler,
             logger=self.logger
         )
 
-        self.mouse_controller = MouseController(
+        # En reproducción las acciones se registran en lugar de ejecutarse
+        mouse_class = RecordingMouseSink if replay_path else MouseController
+        self.mouse_controller = mouse_class(
             wink_threshold=self.config.get('wink_threshold'),
-            wink_min_frames=self.config.get('wink_min_frames'),
+            wink_min_duration=self.config.get('wink_min_duration'),
             double_wink_window=self.config.get('double_wink_window'),
             dwell_time=self.config.get('dwell_time'),
             scroll_band=self.config.get('scroll_band'),
             scroll_step=self.config.get('scroll_step'),
+            dwell_cell_size=self.config.get('dwell_cell_size'),
+            dwell_refractory=self.config.get('dwell_refractory'),
+            dwell_snap=self.config.get('dwell_snap'),
+            scroll_speed=self.config.get('scroll_speed'),
+            scroll_rate=self.config.get('scroll_rate'),
+            scroll_dead_time=self.config.get('scroll_dead_time'),
+            backend=self.input_backend,
+            action_queue_size=self.config.get('action_queue_size'),
             logger=self.logger
         )
+        # Acciones y tabla de gestos activas (las del usuario tras iniciar
+        # sesión; config.json solo aporta las iniciales)
+        self.user_actions = self.config.get('actions')
+        self.user_gesture_table = self.config.get('gesture_table')
+        self.apply_actions(self.user_actions)
+        self.apply_gesture_table(self.user_gesture_table)
+
+        # Objetivos del magnetismo escritos por herramientas externas
+        self.target_source = None
+        if self.config.get('targets_file'):
+            self.target_source = TargetFileSource(
+                self.gaze_tracker.target_snapper, self.config.get('targets_file'),
+                interval=self.config.get('targets_reload_interval'), logger=self.logger
+            )
 
-        self.window = MainWindow(
-            window_name=self.config.get('window_name'),
-            logger=self.logger
-        )
+        # Volteo + conversión RGB una sola vez por frame en buffers reutilizados
+        self.preprocessor = FramePreprocessor(mirror=True, logger=self.logger)
+
+        self.headless = headless or self.config.get('headless')
+        if self.headless:
+            self.window = HeadlessWindow(
+                snapshot_path=self.config.get('headless_snapshot_path'),
+                snapshot_interval=self.config.get('headless_snapshot_interval'),
+                logger=self.logger
+            )
+        else:
+            self.window = MainWindow(
+                window_name=self.config.get('window_name'),
+                logger=self.logger
+            )
+
+        # Métricas para monitorización (opcional)
+        self.metrics = None
+        self.metrics_registry = None
+        self.metrics_server = None
+        if metrics_port is not None or self.config.get('metrics_enabled'):
+            self.setup_metrics(metrics_port if metrics_port is not None
+                               else self.config.get('metrics_port'))
+
+        # API de control local (opcional)
+        self.control_server = None
+        self.calibration_requested = False
+        if control_port is not None or self.config.get('control_api_enabled'):
+            self.setup_control_server(control_port if control_port is not None
+                                      else self.config.get('control_api_port'))
+
+        # Recarga en caliente de config.json
+        self.config_watcher = None
+        reload_interval = self.config.get('config_reload_interval')
+        if reload_interval:
+            self.config_watcher = ConfigWatcher(
+                str(self.config.config_file), interval=reload_interval, logger=self.logger
+            )
 
         # Estado
         self.camera = None
@@ -75,8 +246,296 @@ class GazeControlApp:
         self.last_auth_check = 0
         self.auth_check_interval = self.config.get('auth_check_interval')
 
+    def setup_metrics(self, port: int):
+        """Registra las métricas y arranca el servidor HTTP en segundo plano"""
+        registry = MetricsRegistry()
+        self.metrics_registry = registry
+        self.metrics = {
+            'frames': registry.counter('frames_total', "Frames procesados"),
+            'dropped': registry.counter('dropped_frames_total', "Lecturas de cámara fallidas"),
+            'latency': registry.histogram('frame_latency_seconds',
+                                          "Latencia captura -> render por frame "
+                                          "(vacía al reproducir grabaciones)"),
+            'auth': registry.counter('auth_verifications_total', "Verificaciones faciales"),
+            'auth_failures': registry.counter('auth_failures_total',
+                                              "Verificaciones faciales fallidas"),
+            'gestures': registry.counter('gesture_events_total',
+                                         "Acciones ejecutadas por gestos", ('action',)),
+            'action_latency': registry.histogram('action_latency_seconds',
+                                                 "Latencia de cada acción (petición -> ejecutada)",
+                                                 buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01,
+                                                          0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+                                                 label_names=('action',)),
+            'db_write': registry.histogram('db_write_seconds', "Duración de escrituras en SQLite",
+                                           buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01,
+                                                    0.025, 0.05, 0.1, 0.25, 1.0))
+        }
+        registry.gauge('fps', "FPS suavizados del loop principal", lambda: self.window.fps)
+        registry.gauge('process_resident_memory_bytes', "Memoria residente del proceso",
+                       process_rss_bytes)
+
+        # Los componentes notifican por callback; los contadores no usan locks
+        gestures = self.metrics['gestures']
+        self.mouse_controller.on_action = lambda action: gestures.labels(action).inc()
+        action_latency = self.metrics['action_latency']
+        self.mouse_controller.on_action_latency = (
+            lambda action, seconds: action_latency.labels(action).observe(seconds)
+        )
+        self.db.on_write = self.metrics['db_write'].observe
+
+        self.metrics_server = MetricsServer(
+            registry, host=self.config.get('metrics_host'), port=port, logger=self.logger
+        )
+        if not self.metrics_server.start():
+            self.metrics_server = None
+
+    def setup_control_server(self, port: int):
+        """Registra las rutas de la API de control y arranca el servidor"""
+        server = ControlServer(port=port, logger=self.logger)
+        server.route('GET', '/params', lambda body: self.get_params())
+        server.route('POST', '/params', lambda body: self.apply_params(body or {}))
+        server.route('POST', '/profile', lambda body: self.apply_profile((body or {}).get('name')))
+        server.route('POST', '/calibrate', lambda body: self.request_calibration())
+        server.route('POST', '/key', lambda body: self.remote_key((body or {}).get('key')))
+        server.route('GET', '/status', lambda body: self.get_status())
+        server.route('POST', '/targets', lambda body: self.set_targets((body or {}).get('targets')))
+        if self.metrics_registry is not None:
+            # Las métricas están pensadas para leerse desde otro hilo
+            server.route('GET', '/metrics', lambda body: self.metrics_registry.render(),
+                         in_frame_loop=False)
+
+        if server.start():
+            self.control_server = server
+
+    def _param_setters(self) -> dict:
+        """Hooks que llevan cada parámetro a los componentes en marcha"""
+        tracker = self.gaze_tracker
+        mouse = self.mouse_controller
+        def set_filter(_value):
+            # min_cutoff y beta se aplican juntos con los valores ya guardados
+            tracker.set_filter_params(
+                self.config.get('filter_min_cutoff'), self.config.get('filter_beta')
+            )
+
+        def set_dwell(enabled):
+            if mouse.dwell_enabled != enabled:
+                mouse.toggle_dwell()
+
+        def set_debug(enabled):
+            self.debug_mode = enabled
+
+        def set_auth_interval(seconds):
+            self.auth_check_interval = seconds
+
+        def set_wink_threshold(threshold):
+            mouse.wink_threshold = threshold
+            tracker.ear_model.base_threshold = threshold
+
+        return {
+            'gain': tracker.set_gain,
+            'deadzone': tracker.set_deadzone,
+            'filter_min_cutoff': set_filter,
+            'filter_beta': set_filter,
+            'dwell_enabled': set_dwell,
+            'dwell_time': lambda v: setattr(mouse, 'dwell_time', v),
+            'dwell_refractory': lambda v: setattr(mouse.dwell_engine, 'refractory_period', v),
+            'debug_mode': set_debug,
+            'wink_threshold': set_wink_threshold,
+            'scroll_band': lambda v: setattr(mouse, 'scroll_band', v),
+            'scroll_step': lambda v: setattr(mouse, 'scroll_step', v),
+            'scroll_speed': lambda v: setattr(mouse.scroll_engine, 'max_speed', v),
+            'blink_threshold': lambda v: setattr(tracker, 'blink_threshold', v),
+            'fixation_smoothing': lambda v: setattr(tracker, 'fixation_smoothing', v),
+            'saccade_smoothing': lambda v: setattr(tracker, 'saccade_smoothing', v),
+            'prediction_extra_latency': lambda v: setattr(tracker, 'prediction_extra_latency', v),
+            'target_snapping': lambda v: setattr(tracker.target_snapper, 'enabled', v),
+            'snap_radius': lambda v: setattr(tracker.target_snapper, 'radius', v),
+            'snap_strength': lambda v: setattr(tracker.target_snapper, 'strength', v),
+            'auth_check_interval': set_auth_interval
+        }
+
+    def get_params(self) -> dict:
+        """Valores actuales de los parámetros ajustables"""
+        return {key: self.config.get(key) for key in self.TUNABLE_PARAMS}
+
+    def apply_params(self, changes: dict) -> dict:
+        """
+        Valida y aplica parámetros a los componentes en marcha
+
+        Args:
+            changes: Diccionario parámetro -> valor
+
+        Returns:
+            Diccionario con los parámetros aplicados
+        """
+        # Validar todo antes de aplicar nada
+        validated = {}
+        for key, value in changes.items():
+            if key not in self.TUNABLE_PARAMS:
+                raise KeyError(f"parámetro no ajustable: '{key}'")
+            kind, low, high = self.TUNABLE_PARAMS[key]
+            if kind is bool:
+                if not isinstance(value, bool):
+                    raise TypeError(f"'{key}' debe ser booleano")
+            elif kind is int:
+                if isinstance(value, bool) or not isinstance(value, int):
+                    raise TypeError(f"'{key}' debe ser entero")
+                if not low <= value <= high:
+                    raise ValueError(f"'{key}' fuera de rango [{low}, {high}]")
+            else:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise TypeError(f"'{key}' debe ser numérico")
+                value = float(value)
+                if not low <= value <= high:
+                    raise ValueError(f"'{key}' fuera de rango [{low}, {high}]")
+            if key == 'gain' and not self.gaze_tracker.gain_applies:
+                raise ValueError("'gain' no se aplica con la calibración de pose de cabeza "
+                                 "(recalibra o resetea la calibración)")
+            if key in self.FILTER_PARAMS and not self.gaze_tracker.filter_params_apply:
+                raise ValueError(f"'{key}' no se aplica con el filtro "
+                                 f"'{self.gaze_tracker.filter_type}' (usa 'one_euro')")
+            validated[key] = value
+
+        for key, value in validated.items():
+            self.config.set(key, value)
+
+        setters = self._param_setters()
+        for key, value in validated.items():
+            setters[key](value)
+
+        if validated:
+            self.logger.info(f"Parámetros aplicados: {validated}")
+        return validated
+
+    def apply_config_changes(self, changes: dict):
+        """
+        Aplica los cambios detectados en config.json: los parámetros ajustables
+        en caliente van a sus hooks; el resto queda para el próximo reinicio
+        """
+        # Las acciones primero: la tabla de gestos puede referenciar acciones nuevas
+        for key, value in sorted(changes.items(), key=lambda item: item[0] != 'actions'):
+            if key == 'gesture_table':
+                self.config.set(key, value)
+                self.user_gesture_table = value
+                self.apply_gesture_table(value)
+                continue
+            if key == 'actions':
+                self.config.set(key, value)
+                self.user_actions = value
+                self.apply_actions(value)
+                continue
+            if key not in self.TUNABLE_PARAMS:
+                self.config.set(key, value)
+                self.logger.info(f"'{key}' cambiado en config.json: se aplicará al reiniciar")
+                continue
+            try:
+                self.apply_params({key: value})
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.warning(f"Valor inválido en config.json ignorado: {e}")
+
+    def apply_gesture_table(self, table):
+        """Carga una tabla de gestos en el controlador (None = tabla por defecto)"""
+        try:
+            self.mouse_controller.set_gesture_table(table)
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Tabla de gestos inválida, se mantiene la anterior: {e}")
+
+    def apply_actions(self, actions):
+        """Carga las acciones y macros del usuario (None = solo las de por defecto)"""
+        try:
+            self.mouse_controller.set_actions(actions)
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Acciones inválidas, se mantienen las anteriores: {e}")
+
+    def apply_profile(self, name: str) -> dict:
+        """Aplica un perfil de sensibilidad en caliente"""
+        profile = self.config.SENSITIVITY_PROFILES.get(name)
+        if profile is None:
+            raise ValueError(f"perfil desconocido: '{name}'")
+        keys = ['gain', 'deadzone', 'filter_min_cutoff', 'filter_beta']
+        if not self.gaze_tracker.gain_applies:
+            # La respuesta no incluye 'gain': indica que no se aplicó
+            self.logger.warning(f"Perfil '{name}': la ganancia no se aplica con la "
+                                f"calibración de pose de cabeza")
+            keys.remove('gain')
+        if not self.gaze_tracker.filter_params_apply:
+            self.logger.warning(f"Perfil '{name}': min_cutoff/beta no se aplican con el "
+                                f"filtro '{self.gaze_tracker.filter_type}'")
+            keys = [key for key in keys if key not in self.FILTER_PARAMS]
+        return self.apply_params({key: profile[key] for key in keys})
+
+    def set_targets(self, targets) -> dict:
+        """Reemplaza los objetivos del magnetismo (p. ej. desde un detector externo)"""
+        rects, names = parse_targets(targets)
+        return {'targets': self.gaze_tracker.target_snapper.set_targets(rects, names)}
+
+    def request_calibration(self) -> dict:
+        """Pide una calibración; se ejecuta al terminar el frame actual"""
+        if self.headless:
+            raise ValueError("la calibración requiere la vista previa (sin --headless)")
+        self.calibration_requested = True
+        return {'calibration': 'scheduled'}
+
+    def remote_key(self, key) -> dict:
+        """Simula una tecla de control (útil en modo headless)"""
+        if not isinstance(key, str) or len(key) != 1:
+            raise ValueError("'key' debe ser un único carácter")
+        if key == 'c':
+            return self.request_calibration()
+        self.process_key(ord(key))
+        return {'key': key}
+
+    def get_status(self) -> dict:
+        """Estado resumido del loop principal"""
+        user = self.user_manager.get_current_user()
+        return {
+            'running': self.running,
+            'fps': round(self.window.fps, 2),
+            'pipeline_latency_ms': round(self.gaze_tracker.pipeline_latency * 1000.0, 2),
+            'user': user['username'] if user else None,
+            'authenticated': self.window.authenticated,
+            'auth_similarity': round(self.window.auth_similarity, 3),
+            'gaze_event': self.gaze_tracker.last_gaze_event,
+            'gain': self.gaze_tracker.gain,
+            'gain_applied': self.gaze_tracker.gain_applies,
+            'filter_params_applied': self.gaze_tracker.filter_params_apply,
+            'ear_thresholds': [round(v, 3) for v in self.gaze_tracker.ear_model.thresholds],
+            'action_latency_ms': {action: round(seconds * 1000.0, 2) for action, seconds
+                                  in self.mouse_controller.action_latency.items()},
+            'targets': len(self.gaze_tracker.target_snapper.index),
+            'snap_target': self.gaze_tracker.target_snapper.current_target,
+            'headless': self.headless,
+            'stages_ms': self.profiler.stage_breakdown() if self.profiler.enabled else None
+        }
+
+    def _recording_screen_size(self, replay_path: str) -> Tuple[int, int]:
+        """Resolución de pantalla guardada en la grabación (o REPLAY_SCREEN_SIZE)"""
+        try:
+            screen_size = read_recording_header(replay_path).get('screen_size')
+        except (OSError, ValueError):
+            # El error se informa al abrir la grabación
+            screen_size = None
+        if not screen_size:
+            self.logger.info(f"La grabación no guarda la resolución de pantalla, "
+                             f"se usa {self.REPLAY_SCREEN_SIZE[0]}x{self.REPLAY_SCREEN_SIZE[1]}")
+            return self.REPLAY_SCREEN_SIZE
+        return tuple(screen_size)
+
     def initialize_camera(self) -> bool:
-        """Inicializa la cámara"""
+        """Inicializa la cámara (o la fuente de reproducción)"""
+        if self.replay_path:
+            try:
+                self.camera = ReplaySource(
+                    self.replay_path, realtime=self.replay_realtime, logger=self.logger
+                )
+                # Eventos registrados con el tiempo de la grabación
+                self.mouse_controller.clock = self.camera.elapsed
+                self.logger.info(f"Reproduciendo grabación {self.replay_path}")
+                return True
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Error abriendo grabación: {e}")
+                return False
+
         try:
             camera_index = self.config.get('camera_index')
             self.logger.info(f"Inicializando cámara {camera_index}...")
@@ -92,6 +551,12 @@ class GazeControlApp:
             self.camera.set(cv.CAP_PROP_FRAME_HEIGHT, self.config.get('camera_height'))
             self.camera.set(cv.CAP_PROP_FPS, self.config.get('camera_fps'))
 
+            if self.record_path:
+                recorder = FrameRecorder(self.record_path, screen_size=self.input_backend.size(),
+                                         logger=self.logger)
+                self.camera = RecordingCapture(self.camera, recorder)
+                self.logger.info(f"Grabando frames en {self.record_path}")
+
             self.logger.info("Cámara inicializada correctamente")
             return True
 
@@ -184,19 +649,21 @@ class GazeControlApp:
             if not ret:
                 continue
 
-            frame = cv.flip(frame, 1)
+            frame, rgb = self.preprocessor.process(frame)
 
             # Mostrar feedback
             cv.putText(
                 frame, f"Autenticando {selected_username}...",
                 (10, 30), cv.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2
             )
-            cv.imshow("Autenticacion", frame)
-            cv.waitKey(1)
+            if not self.headless:
+                cv.imshow("Autenticacion", frame)
+                cv.waitKey(1)
 
             # Intentar login con el usuario seleccionado
-            if self.user_manager.login(frame, user_id=selected_user_id):
-                cv.destroyWindow("Autenticacion")
+            if self.user_manager.login(frame, user_id=selected_user_id, rgb=rgb):
+                if not self.headless:
+                    cv.destroyWindow("Autenticacion")
                 user = self.user_manager.get_current_user()
                 print(f"\n✓ Autenticación exitosa! Bienvenido {user['username']}")
                 self.logger.info(f"Usuario autenticado: {user['username']}")
@@ -205,7 +672,8 @@ class GazeControlApp:
 
             attempts += 1
 
-        cv.destroyWindow("Autenticacion")
+        if not self.headless:
+            cv.destroyWindow("Autenticacion")
         print("\n✗ Autenticación fallida - Rostro no reconocido")
         self.logger.warning("Autenticación fallida")
         return False
@@ -221,11 +689,28 @@ class GazeControlApp:
         # Cargar configuraciones
         configs = self.user_manager.get_all_user_configs()
         for key, value in configs.items():
+            if key in self.USER_STATE_KEYS:
+                continue
             self.config.set(key, value)
 
+        # Umbrales EAR: base del usuario + estadísticas aprendidas
+        self.mouse_controller.wink_threshold = self.config.get('wink_threshold')
+        self.gaze_tracker.ear_model.base_threshold = self.config.get('wink_threshold')
+        self.gaze_tracker.ear_model.load(configs.get('ear_model'))
+
         # Aplicar configuraciones al gaze tracker
         self.gaze_tracker.set_gain(self.config.get('gain'))
         self.gaze_tracker.set_deadzone(self.config.get('deadzone'))
+        self.gaze_tracker.set_filter_params(
+            self.config.get('filter_min_cutoff'),
+            self.config.get('filter_beta')
+        )
+        # Las acciones antes que la tabla de gestos, que puede referenciarlas.
+        # Son del usuario: sin acciones ni tabla propias quedan las de por defecto
+        self.user_actions = configs.get('actions')
+        self.user_gesture_table = configs.get('gesture_table')
+        self.apply_actions(self.user_actions)
+        self.apply_gesture_table(self.user_gesture_table)
 
         # Cargar calibración
         calib_data = self.db.get_active_calibration(user_id)
@@ -246,7 +731,18 @@ class GazeControlApp:
             value = self.config.get(key)
             self.user_manager.save_user_config(key, value)
 
+        # Estadísticas EAR aprendidas en la sesión
+        self.user_manager.save_user_config('ear_model', self.gaze_tracker.ear_model.to_dict())
+
+        # La tabla de gestos es por usuario (solo si se personalizó)
+        if self.user_gesture_table is not None:
+            self.user_manager.save_user_config('gesture_table', self.user_gesture_table)
+        if self.user_actions is not None:
+            self.user_manager.save_user_config('actions', self.user_actions)
+
         self.config.save()
+        if self.config_watcher:
+            self.config_watcher.mark_saved()
         self.logger.info("Configuraciones guardadas")
 
     def run_calibration(self):
@@ -265,19 +761,18 @@ class GazeControlApp:
             if not ret:
                 continue
 
-            frame = cv.flip(frame, 1)
+            frame, rgb = self.preprocessor.process(frame)
 
-            # Obtener posición de mirada sin filtrar
-            gaze_pos = self.gaze_tracker.get_raw_gaze_position(frame)
-            has_face = gaze_pos is not None
+            # Obtener características de mirada sin filtrar
+            features = self.gaze_tracker.get_calibration_features(frame, rgb)
+            has_face = features is not None
 
             # Procesar frame de calibración
             completed_target = self.window.process_calibration_frame(frame, has_face)
 
-            if completed_target and gaze_pos:
+            if completed_target and features:
                 target_x, target_y = completed_target
-                gaze_x, gaze_y = gaze_pos
-                self.gaze_tracker.calibration.add_sample(gaze_x, gaze_y, target_x, target_y)
+                self.gaze_tracker.calibration.add_feature_sample(features, target_x, target_y)
 
             self.window.show_frame(frame)
             if self.window.wait_key(1) == ord('q'):
@@ -306,20 +801,64 @@ class GazeControlApp:
         self.window.create_window()
         self.running = True
 
+        if self.config.get('record_gaze_traces'):
+            self.gaze_tracker.start_trace_recording()
+
         try:
+            profiler = self.profiler
+            metrics = self.metrics
+            frame_budget_ms = 1000.0 / self.config.get('camera_fps')
+
             while self.running:
+                profiler.begin_frame()
+
+                # Cambios en config.json (un stat por intervalo)
+                if self.config_watcher:
+                    changes = self.config_watcher.poll()
+                    if changes:
+                        self.apply_config_changes(changes)
+
+                if self.target_source:
+                    self.target_source.poll()
+
+                # Comandos de la API de control (en este hilo, entre frames)
+                if self.control_server:
+                    self.control_server.process_pending()
+                    if self.calibration_requested:
+                        self.calibration_requested = False
+                        self.run_calibration()
+
+                t = profiler.start()
                 ret, frame = self.camera.read()
+                profiler.stop('capture', t)
                 if not ret:
+                    if metrics:
+                        metrics['dropped'].inc()
+                    if self.replay_path:
+                        self.logger.info("Fin de la grabación")
+                        break
                     self.logger.warning("No se pudo leer frame de cámara")
                     time.sleep(0.1)
                     continue
+                frame_time = self.get_frame_time()
+                if metrics:
+                    metrics['frames'].inc()
 
-                frame = cv.flip(frame, 1)
+                t = profiler.start()
+                frame, rgb = self.preprocessor.process(frame)
+                profiler.stop('color_convert', t)
 
-                # Verificar autenticación periódicamente
-                current_time = time.time()
+                # Verificar autenticación periódicamente (con el tiempo del frame:
+                # en reproducción no depende de la velocidad de la máquina)
+                current_time = frame_time
                 if current_time - self.last_auth_check > self.auth_check_interval:
-                    is_match, similarity, num_faces = self.user_manager.authenticate_user(frame)
+                    t = profiler.start()
+                    is_match, similarity, num_faces = self.user_manager.authenticate_user(frame, rgb)
+                    profiler.stop('auth', t)
+                    if metrics:
+                        metrics['auth'].inc()
+                        if not is_match:
+                            metrics['auth_failures'].inc()
                     self.window.update_auth_status(is_match, similarity)
 
                     if not is_match:
@@ -338,50 +877,78 @@ class GazeControlApp:
                     self.last_auth_check = current_time
 
                 # Procesar seguimiento de mirada SOLO si el usuario está autenticado
-                screen_pos = self.gaze_tracker.process_frame(frame)
+                screen_pos = self.gaze_tracker.process_frame(frame, frame_time, rgb)
 
                 if screen_pos:
                     screen_x, screen_y = screen_pos
 
                     # Mover mouse SOLO si usuario autenticado
+                    t = profiler.start()
                     self.mouse_controller.move_to(screen_x, screen_y)
+                    profiler.stop('actuation', t)
+
+                    # Tiempo monótono en vivo; el grabado al reproducir una sesión
+                    gesture_time = frame_time if self.replay_path else None
 
                     # Detectar gestos
-                    gestures = self.gaze_tracker.detect_gestures(frame)
+                    gestures = self.gaze_tracker.detect_gestures(frame, rgb, gesture_time)
 
+                    t = profiler.start()
                     # Obtener posición x de la mirada para gestos avanzados
                     gaze_x = None
                     if self.gaze_tracker.last_gaze_position:
                         gaze_x = self.gaze_tracker.last_gaze_position[0]
 
-                    self.mouse_controller.process_gestures(gestures, screen_x, screen_y, gaze_x)
+                    self.mouse_controller.process_gestures(
+                        gestures, screen_x, screen_y, gaze_x, timestamp=gesture_time
+                    )
 
                     # Dwell click
                     if self.gaze_tracker.last_gaze_position:
                         gx, gy = self.gaze_tracker.last_gaze_position
-                        self.mouse_controller.process_dwell_click(gx, gy, screen_x, screen_y)
+                        self.mouse_controller.process_dwell_click(
+                            gx, gy, screen_x, screen_y,
+                            gaze_event=self.gaze_tracker.last_gaze_event,
+                            timestamp=gesture_time
+                        )
 
                         # Auto scroll
-                        self.mouse_controller.process_auto_scroll(gy)
+                        self.mouse_controller.process_auto_scroll(gy, gesture_time)
+
+                    # Un único envío al sistema con los eventos del frame
+                    self.mouse_controller.flush()
+                    profiler.stop('actuation', t)
 
                 # Actualizar UI
+                t = profiler.start()
                 self.window.update_fps()
 
-                if self.debug_mode:
+                if self.debug_mode and not self.headless:
                     current_config = {
                         'gain': self.gaze_tracker.gain,
                         'deadzone': self.gaze_tracker.deadzone_filter.threshold,
-                        'dwell_enabled': self.mouse_controller.dwell_enabled
+                        'dwell_enabled': self.mouse_controller.dwell_enabled,
+                        'dwell_progress': self.mouse_controller.dwell_progress
                     }
                     self.window.draw_hud(
                         frame, current_config,
                         self.user_manager.get_current_user()
                     )
+                    if profiler.enabled:
+                        self.window.draw_stage_breakdown(
+                            frame, profiler.stage_breakdown(), frame_budget_ms
+                        )
 
                 self.window.show_frame(frame)
 
                 # Procesar teclas
                 key = self.window.wait_key(1)
+                profiler.stop('render', t)
+                profiler.end_frame()
+                # En reproducción frame_time es tiempo de la grabación: restarlo
+                # del reloj no mide nada
+                if metrics and not self.replay_path:
+                    metrics['latency'].observe(max(0.0, time.time() - frame_time))
                 self.process_key(key)
 
         except KeyboardInterrupt:
@@ -391,6 +958,12 @@ class GazeControlApp:
         finally:
             self.cleanup()
 
+    def get_frame_time(self) -> float:
+        """Instante de captura del último frame (grabado si es una reproducción)"""
+        if isinstance(self.camera, ReplaySource):
+            return self.camera.last_capture_time
+        return time.time()
+
     def process_key(self, key: int):
         """Procesa las teclas presionadas"""
         if key == ord('q'):
@@ -399,7 +972,10 @@ class GazeControlApp:
             self.debug_mode = not self.debug_mode
             self.config.set('debug_mode', self.debug_mode)
         elif key == ord('c'):
-            self.run_calibration()
+            if self.headless:
+                self.logger.warning("La calibración requiere la vista previa (sin --headless)")
+            else:
+                self.run_calibration()
         elif key == ord('r'):
             self.gaze_tracker.calibration.reset()
             self.logger.info("Calibración reseteada")
@@ -414,6 +990,8 @@ class GazeControlApp:
         elif key == ord('g'):
             enabled = self.mouse_controller.toggle_dwell()
             self.config.set('dwell_enabled', enabled)
+        elif key == ord('p'):
+            self.profiler.set_enabled(not self.profiler.enabled)
 
     def cleanup(self):
         """Limpia recursos"""
@@ -421,15 +999,35 @@ class GazeControlApp:
 
         self.save_user_settings()
 
+        if self.gaze_tracker.trace_recorder is not None:
+            user = self.user_manager.get_current_user()
+            self.gaze_tracker.stop_trace_recording(user['id'] if user else None)
+
+        if self.control_server:
+            self.control_server.stop()
+
+        if self.metrics_server:
+            self.metrics_server.stop()
+
+        if self.profile_trace_path:
+            self.profiler.export_chrome_trace(self.profile_trace_path)
+
         if self.camera:
             self.camera.release()
 
+        if isinstance(self.mouse_controller, RecordingMouseSink):
+            self.logger.info(f"Acciones registradas: {self.mouse_controller.summary()}")
+
+        self.mouse_controller.close()
+        self.input_backend.close()
+
         self.window.destroy()
         self.gaze_tracker.close()
         self.user_manager.logout()
         self.db.close()
 
-        cv.destroyAllWindows()
+        if not self.headless:
+            cv.destroyAllWindows()
         self.logger.info("Aplicación cerrada correctamente")
 
     def run(self):
@@ -461,6 +1059,7 @@ class GazeControlApp:
             print("  [c] - Calibrar")
             print("  [r] - Reset calibración")
             print("  [d] - Toggle debug")
+            print("  [p] - Toggle perfilado por etapas")
             print("  [+/-] - Ajustar sensibilidad")
             print("  [g] - Toggle dwell click")
             print("  [q] - Salir")
@@ -481,9 +1080,52 @@ class GazeControlApp:
             return 1
 
 
+def parse_screen_size(text: str) -> Tuple[int, int]:
+    """Convierte 'ANCHOxALTO' en una tupla de enteros positivos"""
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"resolución inválida '{text}' (formato: 1920x1080)")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"resolución inválida '{text}'")
+    return width, height
+
+
+def parse_args():
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Gaze Control - control del cursor por mirada")
+    parser.add_argument('--record', metavar='ARCHIVO',
+                        help="Grabar los frames de la cámara en un archivo .gzrec")
+    parser.add_argument('--replay', metavar='ARCHIVO',
+                        help="Reproducir una grabación .gzrec en lugar de la cámara")
+    parser.add_argument('--replay-speed', choices=['realtime', 'max'], default='realtime',
+                        help="Velocidad de reproducción (por defecto: realtime)")
+    parser.add_argument('--screen-size', type=parse_screen_size, metavar='ANCHOxALTO',
+                        help="Resolución de pantalla fija al reproducir (por defecto: la de la grabación)")
+    parser.add_argument('--profile-trace', metavar='ARCHIVO',
+                        help="Perfilar el loop y exportar una traza Chrome (JSON) al salir")
+    parser.add_argument('--headless', action='store_true',
+                        help="Sin vista previa: teclas por stdin (letra + ENTER)")
+    parser.add_argument('--control-port', type=int, metavar='PUERTO',
+                        help="API de control local en http://127.0.0.1:PUERTO")
+    parser.add_argument('--metrics-port', type=int, metavar='PUERTO',
+                        help="Exponer métricas Prometheus en http://127.0.0.1:PUERTO/metrics")
+    return parser.parse_args()
+
+
 def main():
     """Función principal"""
-    app = GazeControlApp()
+    args = parse_args()
+    app = GazeControlApp(
+        replay_path=args.replay,
+        replay_realtime=args.replay_speed == 'realtime',
+        record_path=args.record,
+        profile_trace_path=args.profile_trace,
+        metrics_port=args.metrics_port,
+        headless=args.headless,
+        control_port=args.control_port,
+        screen_size=args.screen_size
+    )
     sys.exit(app.run())
 
 
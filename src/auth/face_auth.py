@@ -29,12 +29,14 @@ class FaceAuthenticator:
             min_tracking_confidence=0.7
         )
 
-    def extract_face_embedding(self, frame: np.ndarray) -> Optional[bytes]:
+    def extract_face_embedding(self, frame: np.ndarray,
+                               rgb: Optional[np.ndarray] = None) -> Optional[bytes]:
         """
         Extrae el embedding facial de un frame
 
         Args:
             frame: Frame de la cámara en formato BGR
+            rgb: Frame ya convertido a RGB (opcional, evita la conversión)
 
         Returns:
             Embedding serializado o None si no se detecta rostro
@@ -42,7 +44,8 @@ class FaceAuthenticator:
         if self.face_mesh is None:
             self.initialize()
 
-        rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+        if rgb is None:
+            rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
         results = self.face_mesh.process(rgb)
 
         if not results.multi_face_landmarks:
@@ -96,7 +99,8 @@ class FaceAuthenticator:
         is_match = similarity >= self.similarity_threshold
         return is_match, similarity
 
-    def verify_face_multi(self, frame: np.ndarray, registered_embedding: bytes) -> Tuple[bool, float, int]:
+    def verify_face_multi(self, frame: np.ndarray, registered_embedding: bytes,
+                          rgb: Optional[np.ndarray] = None) -> Tuple[bool, float, int]:
         """
         Verifica si algún rostro en el frame coincide con el embedding registrado.
         Detecta múltiples rostros y retorna el mejor match.
@@ -104,6 +108,7 @@ class FaceAuthenticator:
         Args:
             frame: Frame de la cámara
             registered_embedding: Embedding facial registrado
+            rgb: Frame ya convertido a RGB (opcional, evita la conversión)
 
         Returns:
             Tupla (es_match, mejor_score_similitud, num_rostros_detectados)
@@ -111,7 +116,8 @@ class FaceAuthenticator:
         if self.face_mesh is None:
             self.initialize()
 
-        rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+        if rgb is None:
+            rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
         results = self.face_mesh.process(rgb)
 
         if not results.multi_face_landmarks:
@@ -30,7 +30,7 @@ class UserManager:
 
         Args:
             username: Nombre del usuario
-            cap: VideoCapture de la cámara
+            cap: VideoCapture de la cámara (o fuente compatible, p. ej. ReplaySource)
             num_samples: Número de muestras a capturar
 
         Returns:
@@ -107,10 +107,14 @@ class UserManager:
             print(f"Error al registrar usuario: {e}")
             return False
 
-    def authenticate_user(self, frame) -> tuple[bool, float, int]:
+    def authenticate_user(self, frame, rgb=None) -> tuple[bool, float, int]:
         """
         Autentica al usuario logueado verificando entre múltiples rostros
 
+        Args:
+            frame: Frame de la cámara
+            rgb: Frame ya convertido a RGB (opcional)
+
         Returns:
             Tupla (autenticado, score_similitud, num_rostros_detectados)
         """
@@ -121,18 +125,19 @@ class UserManager:
 
         self.face_auth.initialize()
         is_match, similarity, num_faces = self.face_auth.verify_face_multi(
-            frame, user['face_embedding']
+            frame, user['face_embedding'], rgb
         )
 
         return is_match, similarity, num_faces
 
-    def login(self, frame, user_id: Optional[int] = None) -> bool:
+    def login(self, frame, user_id: Optional[int] = None, rgb=None) -> bool:
         """
         Realiza el login de un usuario verificando su rostro
 
         Args:
             frame: Frame de la cámara
             user_id: ID del usuario a loguear (si es None, intenta con el primer usuario registrado)
+            rgb: Frame ya convertido a RGB (opcional)
 
         Returns:
             True si el login fue exitoso
@@ -146,7 +151,7 @@ class UserManager:
             return False
 
         self.face_auth.initialize()
-        is_match, similarity, _ = self.face_auth.verify_face_multi(frame, user['face_embedding'])
+        is_match, similarity, _ = self.face_auth.verify_face_multi(frame, user['face_embedding'], rgb)
 
         if is_match:
             self.current_user = user
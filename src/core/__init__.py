@@ -1,8 +1,11 @@
 """Core modules for gaze tracking"""
-from .filters import OneEuro, EMA
+from .filters import (OneEuro, OneEuroBank, OneEuroXY, EMA, ConstantVelocityKalman,
+                      ConstantAccelerationKalman, IMMPredictor, create_gaze_filter)
 from .face_detector import FaceDetector
 from .gaze_tracker import GazeTracker
 from .mouse_controller import MouseController
 from .calibration import Calibration
 
-__all__ = ['OneEuro', 'EMA', 'FaceDetector', 'GazeTracker', 'MouseController', 'Calibration']
+__all__ = ['OneEuro', 'OneEuroBank', 'OneEuroXY', 'EMA', 'ConstantVelocityKalman',
+           'ConstantAccelerationKalman', 'IMMPredictor', 'create_gaze_filter',
+           'FaceDetector', 'GazeTracker', 'MouseController', 'Calibration']
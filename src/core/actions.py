@@ -0,0 +1,223 @@
+"""Registro de acciones configurables y ejecución de macros en segundo plano"""
+import time
+import queue
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .input_backend import InputBackend
+
+
+# Pasos que puede contener una macro
+STEP_TYPES = ('hotkey', 'click', 'scroll', 'wait')
+
+# Espera máxima de un paso 'wait' (segundos)
+MAX_WAIT = 5.0
+
+
+def default_actions(is_mac: bool = False) -> Dict[str, dict]:
+    """
+    Acciones de teclado por defecto (navegador y sistema)
+
+    Args:
+        is_mac: Usar los atajos de macOS (command en lugar de ctrl/alt)
+    """
+    nav = "command" if is_mac else "alt"
+    mod = "command" if is_mac else "ctrl"
+    return {
+        'page_forward': {'type': 'hotkey', 'keys': [nav, 'right']},
+        'page_back': {'type': 'hotkey', 'keys': [nav, 'left']},
+        'tab_next': {'type': 'hotkey', 'keys': [mod, 'tab']},
+        'tab_prev': {'type': 'hotkey', 'keys': [mod, 'shift', 'tab']},
+        'window_next': {'type': 'hotkey', 'keys': [nav, 'tab']}
+    }
+
+
+def compile_action(name: str, spec: dict) -> Tuple[tuple, ...]:
+    """
+    Valida una acción y la convierte en una secuencia de pasos (tipo, argumento)
+
+    Formatos:
+        {"type": "hotkey", "keys": ["ctrl", "t"]}
+        {"type": "macro", "steps": [{"hotkey": ["ctrl", "c"]}, {"wait": 0.1},
+                                    {"click": "left"}, {"scroll": -5}]}
+
+    Raises:
+        ValueError: Si la especificación es inválida
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Acción '{name}': la especificación debe ser un objeto")
+    kind = spec.get('type')
+    if kind == 'hotkey':
+        raw_steps = [{'hotkey': spec.get('keys')}]
+    elif kind == 'macro':
+        raw_steps = spec.get('steps')
+        if not isinstance(raw_steps, list) or not raw_steps:
+            raise ValueError(f"Acción '{name}': 'steps' debe ser una lista no vacía")
+    else:
+        raise ValueError(f"Acción '{name}': tipo desconocido '{kind}' (hotkey o macro)")
+
+    steps = []
+    for raw in raw_steps:
+        if not isinstance(raw, dict) or len(raw) != 1:
+            raise ValueError(f"Acción '{name}': paso inválido {raw!r}")
+        (step, arg), = raw.items()
+        if step == 'hotkey':
+            if (not isinstance(arg, list) or not arg or
+                    not all(isinstance(key, str) and key for key in arg)):
+                raise ValueError(f"Acción '{name}': 'hotkey' requiere una lista de teclas")
+            steps.append(('hotkey', tuple(arg)))
+        elif step == 'click':
+            if arg not in ('left', 'right', 'middle'):
+                raise ValueError(f"Acción '{name}': botón desconocido '{arg}'")
+            steps.append(('click', arg))
+        elif step == 'scroll':
+            if isinstance(arg, bool) or not isinstance(arg, int):
+                raise ValueError(f"Acción '{name}': 'scroll' requiere un entero")
+            steps.append(('scroll', arg))
+        elif step == 'wait':
+            if isinstance(arg, bool) or not isinstance(arg, (int, float)) or not 0 <= arg <= MAX_WAIT:
+                raise ValueError(f"Acción '{name}': 'wait' debe estar en [0, {MAX_WAIT}] s")
+            steps.append(('wait', float(arg)))
+        else:
+            raise ValueError(f"Acción '{name}': paso desconocido '{step}' {STEP_TYPES}")
+    return tuple(steps)
+
+
+class ActionRegistry:
+    """
+    Acciones de teclado y macros por nombre. Las acciones del usuario se
+    añaden a las de por defecto o las reemplazan (p. ej. otro atajo para
+    'page_back' en un puesto con otro navegador)
+    """
+
+    def __init__(self, is_mac: bool = False, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            is_mac: Usar los atajos de macOS en las acciones por defecto
+        """
+        self.logger = logger
+        self._defaults = {name: compile_action(name, spec)
+                          for name, spec in default_actions(is_mac).items()}
+        self._actions = dict(self._defaults)
+
+    def set_actions(self, actions: Optional[Dict[str, dict]], required: Sequence[str] = ()):
+        """
+        Reemplaza las acciones del usuario (se valida todo antes de aplicar)
+
+        Args:
+            actions: Diccionario nombre -> especificación (None = solo las de por defecto)
+            required: Acciones que deben seguir existiendo (las usa la tabla de gestos)
+
+        Raises:
+            ValueError: Si alguna acción es inválida o falta alguna de `required`
+        """
+        if actions is not None and not isinstance(actions, dict):
+            raise ValueError("las acciones deben ser un objeto nombre -> especificación")
+        compiled = dict(self._defaults)
+        for name, spec in (actions or {}).items():
+            compiled[name] = compile_action(name, spec)
+        missing = [name for name in required if name not in compiled]
+        if missing:
+            raise ValueError(f"acciones usadas por la tabla de gestos sin definir: {missing}")
+        self._actions = compiled
+        if self.logger and actions:
+            self.logger.info(f"Acciones del usuario cargadas: {sorted(actions)}")
+
+    def get(self, name: str) -> Optional[Tuple[tuple, ...]]:
+        """Pasos de la acción (None si no existe)"""
+        return self._actions.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._actions
+
+    def names(self) -> List[str]:
+        return sorted(self._actions)
+
+
+class ActionWorker:
+    """
+    Ejecuta las acciones de teclado y las macros en un hilo de fondo para que
+    una macro larga (o un atajo lento del sistema) no detenga el loop de
+    frames. Los eventos se envían al backend bajo el mismo lock que usa el
+    loop principal para mover el cursor.
+
+    Las latencias (encolado -> fin de la ejecución) se devuelven por una cola
+    y el loop principal las recoge con completed(), así las métricas solo se
+    escriben desde un hilo
+    """
+
+    def __init__(self, backend: InputBackend, lock: threading.Lock, max_pending: int = 8,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            backend: Backend de entrada del sistema
+            lock: Lock compartido con el loop principal para usar el backend
+            max_pending: Acciones en cola como máximo (las demás se descartan)
+        """
+        self.backend = backend
+        self.lock = lock
+        self.max_pending = max_pending
+        self.logger = logger
+
+        self._jobs: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+        self._done: "queue.SimpleQueue[Tuple[str, float]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, name: str, steps: Tuple[tuple, ...]) -> bool:
+        """
+        Encola una acción (no bloquea)
+
+        Returns:
+            False si la cola está llena y la acción se descartó
+        """
+        if self._jobs.qsize() >= self.max_pending:
+            if self.logger:
+                self.logger.warning(f"Cola de acciones llena, se descarta '{name}'")
+            return False
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="action-worker", daemon=True)
+            self._thread.start()
+        self._jobs.put((name, steps, time.perf_counter()))
+        return True
+
+    def completed(self) -> List[Tuple[str, float]]:
+        """Acciones terminadas desde la última llamada: lista (nombre, latencia en s)"""
+        done = []
+        while True:
+            try:
+                done.append(self._done.get_nowait())
+            except queue.Empty:
+                return done
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            name, steps, submitted = job
+            try:
+                for step, arg in steps:
+                    if step == 'wait':
+                        time.sleep(arg)
+                        continue
+                    with self.lock:
+                        if step == 'hotkey':
+                            self.backend.hotkey(*arg)
+                        elif step == 'click':
+                            self.backend.click(button=arg)
+                        elif step == 'scroll':
+                            self.backend.scroll(arg)
+                        self.backend.flush()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error ejecutando la acción '{name}': {e}")
+                continue
+            self._done.put((name, time.perf_counter() - submitted))
+
+    def stop(self, timeout: float = 1.0):
+        """Detiene el hilo tras las acciones en cola"""
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(timeout)
+            self._thread = None
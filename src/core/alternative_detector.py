@@ -2,100 +2,272 @@
 Detector facial alternativo sin MediaPipe
 Usa OpenCV Cascade Classifier como fallback
 """
+import time
 import cv2 as cv
 import numpy as np
 from typing import Optional, Tuple, List
+from .ear_model import AdaptiveEarThresholds
+from .ear_classifier import EarSequenceClassifier
+from .pupil import PupilLocalizer
 
 
 class AlternativeFaceDetector:
-    """Detector facial usando OpenCV sin MediaPipe"""
-    
-    def __init__(self, logger=None):
+    """
+    Detector facial usando OpenCV sin MediaPipe.
+
+    Procesa cada frame una sola vez con update(): la cascada corre sobre una
+    imagen reducida y, si hay un rostro previo, solo en su entorno y con
+    minSize/maxSize derivados de su tamaño. Entre detecciones el rostro se
+    sigue con template matching. La cascada de ojos solo corre al detectar el
+    rostro: las cajas de los ojos se guardan relativas a él, así siguen al
+    rostro entre detecciones y siguen ahí con el ojo cerrado. En cada ojo se
+    localiza la pupila (PupilLocalizer). El rostro, los ojos, las pupilas y la
+    imagen en grises quedan en face_rect, eye_rects, pupils y gray para todos
+    los consumidores del frame
+    """
+
+    def __init__(self, detection_width: int = 320, redetect_interval: int = 10,
+                 track_threshold: float = 0.6, eye_roi_width: int = 160, logger=None):
+        """
+        Args:
+            detection_width: Ancho (px) de la imagen reducida para la cascada de rostros
+            redetect_interval: Frames de seguimiento entre detecciones completas
+            track_threshold: Correlación mínima del template matching para seguir
+            eye_roi_width: Ancho (px) al que se reduce el rostro para buscar los ojos
+        """
         self.logger = logger
+        self.detection_width = detection_width
+        self.redetect_interval = redetect_interval
+        self.track_threshold = track_threshold
+        self.eye_roi_width = eye_roi_width
+
         self.face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
         self.eye_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_eye.xml')
-        
+
         if self.face_cascade.empty():
             if logger:
                 logger.error("No se pudo cargar el clasificador de rostros")
             raise RuntimeError("Error cargando haarcascade")
-            
+
+        # Resultado del último frame procesado
+        self.face_rect: Optional[Tuple[int, int, int, int]] = None
+        self.eye_rects: List[Tuple[int, int, int, int]] = []
+        # (x, y, apertura) de cada ojo de eye_rects, en píxeles del frame
+        self.pupils: List[Tuple[float, float, float]] = []
+        self.gray: Optional[np.ndarray] = None
+
+        self.pupil_localizer = PupilLocalizer()
+        # Cajas de los ojos en fracciones del rostro (última detección con dos ojos)
+        self._eye_offsets: Optional[List[Tuple[float, float, float, float]]] = None
+
+        # Estado de seguimiento en la imagen reducida
+        self._small_face: Optional[Tuple[int, int, int, int]] = None
+        self._template: Optional[np.ndarray] = None
+        self._frames_since_detection = 0
+
+    def reset(self):
+        """Olvida el rostro seguido (la próxima llamada detecta en toda la imagen)"""
+        self._small_face = None
+        self._template = None
+        self.face_rect = None
+        self.eye_rects = []
+        self.pupils = []
+        self._eye_offsets = None
+
+    def update(self, frame: np.ndarray) -> Tuple[Optional[Tuple[int, int, int, int]],
+                                                 List[Tuple[int, int, int, int]]]:
+        """
+        Procesa un frame: rostro (detectado o seguido), ojos y pupilas
+
+        Returns:
+            Tupla (rectángulo del rostro o None, rectángulos de los ojos
+            ordenados de izquierda a derecha en la imagen)
+        """
+        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        self.gray = gray
+        scale = min(1.0, self.detection_width / gray.shape[1])
+        small = (cv.resize(gray, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+                 if scale < 1.0 else gray)
+
+        box = None
+        if self._small_face is not None and self._frames_since_detection < self.redetect_interval:
+            box = self._track(small)
+        if box is None:
+            box = self._detect(small)
+
+        if box is None:
+            self.reset()
+            return None, []
+
+        x, y, w, h = box
+        self.face_rect = (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
+        eye_rects = self._locate_eyes(gray, self.face_rect)
+
+        # Solo los ojos con pupila localizada, para que ambas listas coincidan
+        self.eye_rects, self.pupils = [], []
+        for eye_rect in eye_rects:
+            pupil = self.pupil_localizer.locate(gray, eye_rect)
+            if pupil is not None:
+                self.eye_rects.append(eye_rect)
+                self.pupils.append(pupil)
+        return self.face_rect, self.eye_rects
+
+    def _locate_eyes(self, gray: np.ndarray,
+                     face_rect: Tuple[int, int, int, int]) -> List[Tuple[int, int, int, int]]:
+        """
+        Cajas de los ojos del frame: la cascada corre al detectar el rostro (o
+        mientras no se conocen los ojos) y entre detecciones se reutilizan las
+        posiciones relativas al rostro de la última detección con dos ojos
+        """
+        fx, fy, fw, fh = face_rect
+        if self._frames_since_detection == 0 or self._eye_offsets is None:
+            eyes = self._detect_eyes_gray(gray, face_rect)
+            if len(eyes) == 2:
+                self._eye_offsets = [((ex - fx) / fw, (ey - fy) / fh, ew / fw, eh / fh)
+                                     for (ex, ey, ew, eh) in eyes]
+            elif self._eye_offsets is None:
+                return eyes
+        return [(fx + int(ox * fw), fy + int(oy * fh), int(ow * fw), int(oh * fh))
+                for (ox, oy, ow, oh) in self._eye_offsets]
+
+    def _detect(self, small: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Cascada de rostros en la imagen reducida (primero alrededor del rostro previo)"""
+        faces = ()
+        offset_x = offset_y = 0
+        if self._small_face is not None:
+            x, y, w, h = self._small_face
+            margin = w // 2
+            offset_x, offset_y = max(0, x - margin), max(0, y - margin)
+            roi = small[offset_y:y + h + margin, offset_x:x + w + margin]
+            faces = self.face_cascade.detectMultiScale(
+                roi, 1.1, 4, minSize=(int(w * 0.7),) * 2, maxSize=(int(w * 1.4) + 1,) * 2
+            )
+        if len(faces) == 0:
+            offset_x = offset_y = 0
+            min_face = max(24, small.shape[1] // 12)
+            faces = self.face_cascade.detectMultiScale(small, 1.1, 4, minSize=(min_face, min_face))
+        if len(faces) == 0:
+            return None
+
+        # El rostro más grande
+        x, y, w, h = (int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+        box = (x + offset_x, y + offset_y, w, h)
+        self._small_face = box
+        self._template = small[box[1]:box[1] + h, box[0]:box[0] + w].copy()
+        self._frames_since_detection = 0
+        return box
+
+    def _track(self, small: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Sigue el rostro con template matching cerca de su última posición"""
+        x, y, w, h = self._small_face
+        margin = max(4, w // 4)
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        region = small[y0:y + h + margin, x0:x + w + margin]
+        if region.shape[0] < h or region.shape[1] < w:
+            return None
+
+        scores = cv.matchTemplate(region, self._template, cv.TM_CCOEFF_NORMED)
+        _, score, _, (dx, dy) = cv.minMaxLoc(scores)
+        if score < self.track_threshold:
+            return None
+        self._small_face = (x0 + dx, y0 + dy, w, h)
+        self._frames_since_detection += 1
+        return self._small_face
+
     def detect_face(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
         """
         Detecta el rostro más grande en el frame
-        
+
         Returns:
             Tuple (x, y, w, h) o None si no se detecta rostro
         """
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-        
-        if len(faces) > 0:
-            # Retornar el rostro más grande
-            largest_face = max(faces, key=lambda f: f[2] * f[3])
-            return tuple(largest_face)
-            
-        return None
-        
+        return self.update(frame)[0]
+
     def get_gaze_position(self, frame: np.ndarray) -> Optional[Tuple[float, float]]:
         """
-        Estima la posición de la mirada basada en el centro del rostro
-        
+        Estima la posición de la mirada: punto medio de las pupilas o, si no
+        se localizan ambas, el centro del rostro
+
         Returns:
             Tuple (x, y) normalizadas (0-1) o None
         """
         face_rect = self.detect_face(frame)
         if face_rect is None:
             return None
-            
+        if len(self.pupils) >= 2:
+            return self.pupil_center(self.pupils, frame.shape)
+        return self.face_center(face_rect, frame.shape)
+
+    @staticmethod
+    def pupil_center(pupils: List[Tuple[float, float, float]], shape) -> Tuple[float, float]:
+        """Punto medio de las pupilas normalizado (0-1), como get_iris_position de MediaPipe"""
+        h_img, w_img = shape[:2]
+        x = sum(p[0] for p in pupils) / len(pupils)
+        y = sum(p[1] for p in pupils) / len(pupils)
+        return (x / w_img, y / h_img)
+
+    @staticmethod
+    def face_center(face_rect: Tuple[int, int, int, int], shape) -> Tuple[float, float]:
+        """Centro del rostro normalizado (0-1), aproximación de la mirada"""
         x, y, w, h = face_rect
-        
-        # El centro del rostro es una aproximación de la mirada
-        center_x = x + w // 2
-        center_y = y + h // 2
-        
-        # Normalizar a 0-1
-        h_img, w_img = frame.shape[:2]
-        norm_x = center_x / w_img
-        norm_y = center_y / h_img
-        
-        return (norm_x, norm_y)
+        h_img, w_img = shape[:2]
+        return ((x + w // 2) / w_img, (y + h // 2) / h_img)
         
     def detect_eyes(self, frame: np.ndarray, face_rect: Tuple[int, int, int, int]) -> List[Tuple[int, int, int, int]]:
         """
         Detecta ojos dentro de un rostro
-        
+
         Returns:
             Lista de rectángulos de ojos [(x, y, w, h), ...]
         """
+        return self._detect_eyes_gray(cv.cvtColor(frame, cv.COLOR_BGR2GRAY), face_rect)
+
+    def _detect_eyes_gray(self, gray: np.ndarray, face_rect: Tuple[int, int, int, int]) -> List[Tuple[int, int, int, int]]:
+        """
+        Cascada de ojos en la franja superior del rostro, reducida a
+        eye_roi_width y con tamaños de ojo acotados por el del rostro
+
+        Returns:
+            Hasta dos rectángulos de ojos ordenados de izquierda a derecha
+        """
         x, y, w, h = face_rect
-        roi_gray = cv.cvtColor(frame[y:y+h, x:x+w], cv.COLOR_BGR2GRAY)
-        
-        eyes = self.eye_cascade.detectMultiScale(roi_gray)
-        
-        # Ajustar coordenadas relativas al frame completo
-        eye_rects = []
-        for (ex, ey, ew, eh) in eyes:
-            eye_rects.append((x + ex, y + ey, ew, eh))
-            
-        return eye_rects
-        
+        top, bottom = y + int(0.15 * h), y + int(0.6 * h)
+        roi = gray[max(0, top):bottom, max(0, x):x + w]
+        if roi.size == 0:
+            return []
+        scale = min(1.0, self.eye_roi_width / roi.shape[1])
+        if scale < 1.0:
+            roi = cv.resize(roi, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+
+        face_w = roi.shape[1]
+        eyes = self.eye_cascade.detectMultiScale(
+            roi, 1.1, 3, minSize=(face_w // 8,) * 2, maxSize=(face_w // 2,) * 2
+        )
+        if len(eyes) == 0:
+            return []
+
+        # Los dos más grandes, de izquierda a derecha, en coordenadas del frame
+        eyes = sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2]
+        return sorted(
+            (max(0, x) + int(ex / scale), max(0, top) + int(ey / scale),
+             int(ew / scale), int(eh / scale)) for (ex, ey, ew, eh) in eyes
+        )
+
     def get_eye_aspect_ratio(self, frame: np.ndarray, eye_rect: Tuple[int, int, int, int]) -> float:
         """
-        Calcula una métrica simple para detectar si el ojo está cerrado
-        
+        Apertura del ojo medida en la imagen: altura del iris visible
+        respecto al ancho del ojo (ver PupilLocalizer)
+
         Returns:
-            EAR-like value (menor = ojo más cerrado)
+            EAR-like value (menor = ojo más cerrado, ~0 cerrado)
         """
-        x, y, w, h = eye_rect
-        
-        # Métrica simple: ratio altura/anchura
-        if w > 0:
-            return h / w
-        return 0.0
+        gray = frame if frame.ndim == 2 else cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        pupil = self.pupil_localizer.locate(gray, eye_rect)
+        return pupil[2] if pupil is not None else 0.0
         
     def draw_detections(self, frame: np.ndarray, face_rect: Optional[Tuple] = None, 
-                       eye_rects: List[Tuple] = None) -> np.ndarray:
+                       eye_rects: List[Tuple] = None,
+                       pupils: Optional[List[Tuple[float, float, float]]] = None) -> np.ndarray:
         """
         Dibuja las detecciones en el frame
         """
@@ -105,14 +277,19 @@ class AlternativeFaceDetector:
             x, y, w, h = face_rect
             cv.rectangle(result, (x, y), (x+w, y+h), (0, 255, 0), 2)
             
-            # Dibujar punto central (mirada estimada)
-            center_x = x + w // 2
-            center_y = y + h // 2
-            cv.circle(result, (center_x, center_y), 5, (0, 0, 255), -1)
+            # Dibujar punto central (mirada estimada sin pupilas)
+            if not pupils:
+                center_x = x + w // 2
+                center_y = y + h // 2
+                cv.circle(result, (center_x, center_y), 5, (0, 0, 255), -1)
             
         if eye_rects:
             for (ex, ey, ew, eh) in eye_rects:
                 cv.rectangle(result, (ex, ey), (ex+ew, ey+eh), (255, 0, 0), 2)
+
+        if pupils:
+            for (px, py, _) in pupils:
+                cv.circle(result, (int(round(px)), int(round(py))), 3, (0, 0, 255), -1)
                 
         return result
 
@@ -121,26 +298,60 @@ class AlternativeGazeTracker:
     """Seguimiento de mirada alternativo sin MediaPipe"""
     
     def __init__(self, screen_width: int, screen_height: int, 
-                 gain: float = 1.2, deadzone: float = 0.015, logger=None):
+                 gain: float = 1.2, deadzone: float = 0.015,
+                 wink_threshold: float = 0.15, adaptive_ear: bool = True,
+                 ear_classifier: bool = True, ear_classifier_model: Optional[str] = None,
+                 logger=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.gain = gain
         self.deadzone = deadzone
         self.logger = logger
         
-        self.face_detector = AlternativeFaceDetector(logger)
+        self.face_detector = AlternativeFaceDetector(logger=logger)
         self.last_position = None
+        # Contador de frames que avanza process_frame y frame al que corresponde
+        # la detección de face_detector (se comparte con detect_gestures y
+        # draw_debug_info). No se usa la identidad del array: el preprocesado
+        # reutiliza el mismo buffer en cada frame
+        self._frame_index = 0
+        self._observed_index = -1
+
+        # La apertura medida en la imagen (~0.25-0.3 abierto, ~0 cerrado) tiene
+        # otra escala que el EAR de landmarks, por eso su umbral de partida es distinto
+        self.ear_model = AdaptiveEarThresholds(
+            base_threshold=wink_threshold, enabled=adaptive_ear, logger=logger
+        )
+        # El clasificador trabaja con el cierre relativo, independiente de la escala
+        self.ear_classifier = None
+        if ear_classifier:
+            self.ear_classifier = EarSequenceClassifier(model_path=ear_classifier_model, logger=logger)
         
+    def _observe(self, frame: np.ndarray):
+        """
+        Detección del frame actual, calculada una sola vez por process_frame
+        (sin process_frame previo se detecta en cada llamada)
+        """
+        if self._frame_index == 0 or self._observed_index != self._frame_index:
+            self.face_detector.update(frame)
+            self._observed_index = self._frame_index
+        return self.face_detector.face_rect, self.face_detector.eye_rects
+
     def process_frame(self, frame: np.ndarray) -> Optional[Tuple[int, int]]:
         """
         Procesa un frame y retorna la posición del cursor
         """
-        gaze_pos = self.face_detector.get_gaze_position(frame)
-        
-        if gaze_pos is None:
+        # Cada llamada es un frame nuevo: invalida la detección anterior
+        self._frame_index += 1
+        face_rect, _ = self._observe(frame)
+        if face_rect is None:
             return None
-            
-        gaze_x, gaze_y = gaze_pos
+
+        pupils = self.face_detector.pupils
+        if len(pupils) >= 2:
+            gaze_x, gaze_y = self.face_detector.pupil_center(pupils, frame.shape)
+        else:
+            gaze_x, gaze_y = self.face_detector.face_center(face_rect, frame.shape)
         
         # Aplicar ganancia
         gaze_x = np.clip(gaze_x * self.gain, 0.0, 1.0)
@@ -160,37 +371,39 @@ class AlternativeGazeTracker:
         
         return (screen_x, screen_y)
         
-    def detect_gestures(self, frame: np.ndarray) -> dict:
+    def detect_gestures(self, frame: np.ndarray, timestamp: Optional[float] = None) -> dict:
         """
         Detecta gestos básicos (simplificado sin MediaPipe)
         """
-        face_rect = self.face_detector.detect_face(frame)
-        
+        face_rect, _ = self._observe(frame)
+
         if face_rect is None:
             return {}
-            
-        # Detectar ojos
-        eye_rects = self.face_detector.detect_eyes(frame, face_rect)
-        
+
         gestures = {}
         
-        # Calcular EAR para cada ojo
-        ear_values = []
-        for eye_rect in eye_rects:
-            ear = self.face_detector.get_eye_aspect_ratio(frame, eye_rect)
-            ear_values.append(ear)
+        # Apertura de cada ojo, calculada al localizar la pupila
+        ear_values = [pupil[2] for pupil in self.face_detector.pupils]
             
-        # Detección simple de guiños
+        # Guiños con umbral adaptado por ojo e histéresis
         if len(ear_values) >= 2:
             left_ear, right_ear = ear_values[:2]
-            
-            # Umbral simple para detección de guiño
-            wink_threshold = 0.3
-            
-            if left_ear < wink_threshold and right_ear >= wink_threshold:
-                gestures['left_wink'] = True
-            elif right_ear < wink_threshold and left_ear >= wink_threshold:
-                gestures['right_wink'] = True
+            left_closed, right_closed = self.ear_model.update(left_ear, right_ear)
+            if self.ear_classifier is not None:
+                closure_left, closure_right = self.ear_model.closures(left_ear, right_ear)
+                eye_state = self.ear_classifier.update(
+                    closure_left, closure_right,
+                    time.monotonic() if timestamp is None else timestamp
+                )
+                left_closed, right_closed = self.ear_classifier.closed_flags(eye_state)
+                gestures['eye_state'] = eye_state
+
+            gestures['left_wink'] = left_closed and not right_closed
+            gestures['right_wink'] = right_closed and not left_closed
+            gestures['left_closed'] = left_closed
+            gestures['right_closed'] = right_closed
+            gestures['ear_left'] = left_ear
+            gestures['ear_right'] = right_ear
                 
         return gestures
         
@@ -198,10 +411,6 @@ class AlternativeGazeTracker:
         """
         Dibuja información de depuración
         """
-        face_rect = self.face_detector.detect_face(frame)
-        eye_rects = []
-        
-        if face_rect:
-            eye_rects = self.face_detector.detect_eyes(frame, face_rect)
-            
-        return self.face_detector.draw_detections(frame, face_rect, eye_rects)
\ No newline at end of file
+        face_rect, eye_rects = self._observe(frame)
+        return self.face_detector.draw_detections(frame, face_rect, eye_rects,
+                                                  self.face_detector.pupils)
\ No newline at end of file
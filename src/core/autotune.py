@@ -0,0 +1,231 @@
+"""Autoajuste offline de parámetros de filtrado a partir de trazas grabadas"""
+import itertools
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from .filters import OneEuroBank, DeadzoneFilter
+
+
+# Grilla por defecto alrededor de los perfiles de Config.SENSITIVITY_PROFILES
+DEFAULT_GRID = {
+    'deadzone': [0.0, 0.004, 0.008, 0.012, 0.016, 0.020],
+    'filter_min_cutoff': [0.5, 0.8, 1.2, 1.5, 2.0, 2.5, 3.0, 4.0],
+    'filter_beta': [0.01, 0.03, 0.05, 0.08, 0.12, 0.2, 0.3]
+}
+
+# Grilla y referencias por espacio de la traza. En 'iris' las muestras son la
+# posición del iris en la imagen (recorre pocas centésimas); en 'screen' son
+# coordenadas de pantalla normalizadas de la calibración de pose de cabeza,
+# con desplazamientos y velocidades mucho mayores
+SPACE_DEFAULTS = {
+    'iris': {
+        'grid': DEFAULT_GRID,
+        'jitter_ref': 0.0002,
+        'motion_threshold': 0.05
+    },
+    'screen': {
+        'grid': {
+            'deadzone': [0.0, 0.002, 0.004, 0.006, 0.008, 0.012],
+            'filter_min_cutoff': DEFAULT_GRID['filter_min_cutoff'],
+            'filter_beta': [0.002, 0.005, 0.01, 0.02, 0.03, 0.05, 0.08]
+        },
+        'jitter_ref': 0.001,    # ~2 px en una pantalla de 1920
+        'motion_threshold': 0.3
+    }
+}
+
+
+def _reference_signal(t: np.ndarray, xy: np.ndarray, window: float) -> np.ndarray:
+    """
+    Señal de referencia sin fase: media móvil centrada sobre la traza cruda.
+    Representa dónde miraba el usuario en cada instante
+    """
+    dt = float(np.median(np.diff(t))) if len(t) > 1 else 1.0 / 30.0
+    k = max(1, int(round(window / max(dt, 1e-6))) | 1)
+    kernel = np.ones(k) / k
+    pad = k // 2
+    padded = np.pad(xy, ((pad, pad), (0, 0)), mode='edge')
+    return np.column_stack([np.convolve(padded[:, i], kernel, mode='valid') for i in range(2)])
+
+
+def evaluate_trace(trace: np.ndarray, deadzone: float, min_cutoffs: np.ndarray,
+                   betas: np.ndarray, motion_threshold: float = 0.05,
+                   reference_window: float = 0.1) -> Dict[str, np.ndarray]:
+    """
+    Reproduce una traza a través de DeadzoneFilter + OneEuro para todas las
+    combinaciones (min_cutoff, beta) a la vez
+
+    Args:
+        trace: Array (N, 3) con columnas (t, x, y)
+        deadzone: Umbral de zona muerta
+        min_cutoffs: Array (M,) de min_cutoff
+        betas: Array (M,) de beta (pareado con min_cutoffs)
+        motion_threshold: Velocidad de referencia (u/s) que separa fijación de movimiento
+        reference_window: Ventana (s) de la señal de referencia
+
+    Returns:
+        Diccionario con 'jitter' (RMS de la segunda diferencia en fijación)
+        y 'lag' (retraso mediano en segundos durante movimiento), arrays (M,)
+    """
+    t = trace[:, 0]
+    raw = trace[:, 1:3]
+    n = len(t)
+
+    # Zona muerta (independiente de los parámetros OneEuro)
+    deadzone_filter = DeadzoneFilter(threshold=deadzone)
+    held = np.empty_like(raw)
+    for i in range(n):
+        held[i] = deadzone_filter.filter(raw[i, 0], raw[i, 1])
+
+    # Un canal (x, y) por combinación de parámetros, una actualización por muestra
+    bank = OneEuroBank(min_cutoff=min_cutoffs[:, None], beta=betas[:, None])
+    out = np.empty((n, len(min_cutoffs), 2))
+    frame = np.empty((len(min_cutoffs), 2))
+    for i in range(n):
+        frame[:] = held[i]
+        out[i] = bank.filter(frame, t[i])
+
+    reference = _reference_signal(t, raw, reference_window)
+    dt = np.maximum(np.diff(t), 1e-6)
+    speed = np.hypot(*np.diff(reference, axis=0).T) / dt
+    moving = np.concatenate(([False], speed >= motion_threshold))
+
+    # Jitter: segunda diferencia (componente de alta frecuencia) lejos de los
+    # movimientos, para que el retraso tras una sacada no cuente como jitter
+    margin = max(1, int(round(reference_window / float(np.median(dt)))))
+    near_motion = np.convolve(moving.astype(float), np.ones(2 * margin + 1), mode='same') > 0
+    second = np.linalg.norm(out[2:] - 2 * out[1:-1] + out[:-2], axis=2)  # (N-2, M)
+    still_steps = ~near_motion[1:-1]
+    if still_steps.any():
+        jitter = np.sqrt(np.mean(second[still_steps] ** 2, axis=0))
+    else:
+        jitter = np.zeros(len(min_cutoffs))
+
+    if moving.any():
+        error = np.linalg.norm(out[moving] - reference[moving][:, None, :], axis=2)
+        moving_speed = np.concatenate(([0.0], speed))[moving][:, None]
+        lag = np.median(error / np.maximum(moving_speed, 1e-6), axis=0)
+    else:
+        lag = np.zeros(len(min_cutoffs))
+
+    return {'jitter': jitter, 'lag': lag}
+
+
+def _evaluate_deadzone(args) -> Dict[str, np.ndarray]:
+    """Trabajo de un proceso: todas las combinaciones de una zona muerta"""
+    traces, deadzone, min_cutoffs, betas, motion_threshold = args
+    jitter = np.zeros(len(min_cutoffs))
+    lag = np.zeros(len(min_cutoffs))
+    for trace in traces:
+        result = evaluate_trace(trace, deadzone, min_cutoffs, betas, motion_threshold)
+        jitter += result['jitter']
+        lag += result['lag']
+    return {'jitter': jitter / len(traces), 'lag': lag / len(traces)}
+
+
+class FilterAutotuner:
+    """
+    Busca en una grilla los parámetros de filtrado con mejor balance
+    entre jitter y retraso, evaluando cada zona muerta en un proceso.
+
+    Los parámetros solo valen para el espacio de coordenadas en que se
+    ajustan, así que cada autoajuste usa trazas de un único espacio
+    """
+
+    def __init__(self, space: str = "iris", grid: Optional[Dict[str, Sequence[float]]] = None,
+                 jitter_ref: Optional[float] = None, lag_ref: float = 0.05,
+                 max_workers: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            space: Espacio de las trazas ('iris' o 'screen'); fija la grilla y
+                las referencias por defecto
+            grid: Valores a probar por parámetro ('deadzone', 'filter_min_cutoff', 'filter_beta')
+            jitter_ref: Jitter (unidades del espacio) que cuenta como 1 punto
+                (None = el del espacio)
+            lag_ref: Retraso (s) que cuenta como 1 punto
+            max_workers: Procesos del pool (None = núcleos disponibles)
+        """
+        if space not in SPACE_DEFAULTS:
+            raise ValueError(f"Espacio de traza desconocido: '{space}' {tuple(SPACE_DEFAULTS)}")
+        defaults = SPACE_DEFAULTS[space]
+        self.space = space
+        self.grid = dict(defaults['grid'])
+        if grid:
+            self.grid.update(grid)
+        self.jitter_ref = jitter_ref if jitter_ref is not None else defaults['jitter_ref']
+        self.motion_threshold = defaults['motion_threshold']
+        self.lag_ref = lag_ref
+        self.max_workers = max_workers
+        self.logger = logger
+
+    def score(self, jitter, lag):
+        """Puntuación a minimizar"""
+        return jitter / self.jitter_ref + lag / self.lag_ref
+
+    def tune(self, traces: List[np.ndarray]) -> List[Dict[str, float]]:
+        """
+        Evalúa la grilla completa sobre las trazas
+
+        Args:
+            traces: Lista de arrays (N, 3) con columnas (t, x, y), todas en el
+                espacio del autoajustador
+
+        Returns:
+            Lista de resultados ordenada de mejor a peor
+        """
+        traces = [trace for trace in traces if len(trace) > 10]
+        if not traces:
+            raise ValueError("No hay trazas con muestras suficientes")
+
+        combos = list(itertools.product(self.grid['filter_min_cutoff'], self.grid['filter_beta']))
+        min_cutoffs = np.array([c[0] for c in combos], dtype=np.float64)
+        betas = np.array([c[1] for c in combos], dtype=np.float64)
+        deadzones = list(self.grid['deadzone'])
+
+        if self.logger:
+            self.logger.info(
+                f"Autoajuste ({self.space}): {len(deadzones) * len(combos)} combinaciones, "
+                f"{len(traces)} trazas"
+            )
+
+        jobs = [(traces, dz, min_cutoffs, betas, self.motion_threshold) for dz in deadzones]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            outcomes = list(pool.map(_evaluate_deadzone, jobs))
+
+        results = []
+        for deadzone, outcome in zip(deadzones, outcomes):
+            scores = self.score(outcome['jitter'], outcome['lag'])
+            for i, (min_cutoff, beta) in enumerate(combos):
+                results.append({
+                    'deadzone': float(deadzone),
+                    'filter_min_cutoff': float(min_cutoff),
+                    'filter_beta': float(beta),
+                    'jitter': float(outcome['jitter'][i]),
+                    'lag': float(outcome['lag'][i]),
+                    'score': float(scores[i])
+                })
+
+        results.sort(key=lambda r: r['score'])
+        return results
+
+    def save_profile(self, db_manager, user_id: int, result: Dict[str, float]):
+        """
+        Guarda el mejor resultado como perfil del usuario en `configurations`
+
+        Args:
+            db_manager: DatabaseManager
+            user_id: ID del usuario
+            result: Resultado de tune()
+        """
+        for key in ('deadzone', 'filter_min_cutoff', 'filter_beta'):
+            db_manager.save_configuration(user_id, key, result[key])
+        db_manager.save_configuration(user_id, 'sensitivity_profile', 'autotuned')
+
+        if self.logger:
+            self.logger.info(
+                f"Perfil autoajustado guardado para usuario {user_id}: "
+                f"deadzone={result['deadzone']}, min_cutoff={result['filter_min_cutoff']}, "
+                f"beta={result['filter_beta']}"
+            )
@@ -1,25 +1,37 @@
 """Sistema de calibración para mapeo gaze-to-screen"""
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Sequence
 import logging
 
 
 class Calibration:
-    """Maneja la calibración afín 2D para mapeo de mirada a pantalla"""
+    """
+    Maneja la calibración afín para mapeo de mirada a pantalla.
+
+    Las muestras pueden ser la posición 2D del iris o un vector de
+    características de mayor dimensión (p. ej. offsets del iris más pose de cabeza)
+    """
 
     def __init__(self, screen_width: int, screen_height: int,
+                 min_feature_std: Optional[Sequence[float]] = None, ridge: float = 1e-3,
                  logger: Optional[logging.Logger] = None):
         """
         Args:
             screen_width: Ancho de la pantalla en píxeles
             screen_height: Alto de la pantalla en píxeles
+            min_feature_std: Desviación típica mínima de cada característica durante
+                la calibración para usarla en el ajuste (solo si la dimensión
+                coincide); por debajo su coeficiente queda a 0
+            ridge: Regularización del ajuste sobre características estandarizadas
         """
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.min_feature_std = tuple(min_feature_std) if min_feature_std is not None else None
+        self.ridge = ridge
         self.logger = logger
 
         self.calibration_matrix: Optional[np.ndarray] = None
-        self.samples_src: List[Tuple[float, float]] = []
+        self.samples_src: List[Tuple[float, ...]] = []
         self.samples_dst: List[Tuple[int, int]] = []
 
     def get_grid_points(self, rows: int = 3, cols: int = 3) -> List[Tuple[int, int]]:
@@ -58,12 +70,29 @@ class Calibration:
             screen_x: Coordenada x de pantalla en píxeles
             screen_y: Coordenada y de pantalla en píxeles
         """
-        self.samples_src.append((gaze_x, gaze_y))
+        self.add_feature_sample((gaze_x, gaze_y), screen_x, screen_y)
+
+    def add_feature_sample(self, features: Sequence[float], screen_x: int, screen_y: int):
+        """
+        Añade una muestra de calibración con un vector de características
+
+        Args:
+            features: Vector de características de la mirada
+            screen_x: Coordenada x de pantalla en píxeles
+            screen_y: Coordenada y de pantalla en píxeles
+        """
+        features = tuple(float(f) for f in features)
+        if self.samples_src and len(features) != len(self.samples_src[0]):
+            # Cambio de tipo de características: descartar muestras incompatibles
+            self.clear_samples()
+
+        self.samples_src.append(features)
         self.samples_dst.append((screen_x, screen_y))
 
         if self.logger:
+            feature_text = ", ".join(f"{f:.3f}" for f in features)
             self.logger.debug(
-                f"Muestra añadida: gaze=({gaze_x:.3f}, {gaze_y:.3f}) -> "
+                f"Muestra añadida: gaze=({feature_text}) -> "
                 f"screen=({screen_x}, {screen_y})"
             )
 
@@ -71,37 +100,60 @@ class Calibration:
         """
         Calcula la matriz de calibración usando mínimos cuadrados
 
+        Las características se centran y escalan antes del ajuste (una columna
+        casi constante, como la pose de una cabeza quieta, deja de ser colineal
+        con el término independiente) y se añade una pequeña regularización
+        ridge. Las columnas que apenas varían durante la calibración se
+        descartan: su coeficiente solo ajustaría ruido y amplificaría después
+        cualquier movimiento de cabeza
+
         Returns:
             True si la calibración fue exitosa
         """
-        if len(self.samples_src) < 3:
+        # Se necesita al menos una muestra más que dimensiones de características
+        dim = len(self.samples_src[0]) if self.samples_src else 2
+        required = dim + 1
+        if len(self.samples_src) < required:
             if self.logger:
                 self.logger.warning(
-                    f"Muestras insuficientes para calibración: {len(self.samples_src)}/3"
+                    f"Muestras insuficientes para calibración: {len(self.samples_src)}/{required}"
                 )
             return False
 
         try:
-            # Preparar matrices para mínimos cuadrados
-            X = []
-            Yx = []
-            Yy = []
-
-            for (cx, cy), (px, py) in zip(self.samples_src, self.samples_dst):
-                X.append([cx, cy, 1.0])
-                Yx.append(px)
-                Yy.append(py)
+            X = np.array(self.samples_src, dtype=np.float64)
+            Y = np.array(self.samples_dst, dtype=np.float64)
+
+            # Centrar y escalar; descartar las columnas casi constantes
+            mean = X.mean(axis=0)
+            std = X.std(axis=0)
+            min_std = np.full(dim, 1e-9)
+            if self.min_feature_std is not None and len(self.min_feature_std) == dim:
+                min_std = np.maximum(min_std, self.min_feature_std)
+            used = std >= min_std
+            if not used.any():
+                if self.logger:
+                    self.logger.warning("Las características no varían durante la calibración")
+                return False
+            if self.logger and not used.all():
+                self.logger.info(
+                    f"Características casi constantes en la calibración, no se usan: "
+                    f"{np.flatnonzero(~used).tolist()} (std={np.round(std, 4).tolist()})"
+                )
 
-            X = np.array(X)
-            Yx = np.array(Yx)
-            Yy = np.array(Yy)
+            Z = (X[:, used] - mean[used]) / std[used]
+            Y_mean = Y.mean(axis=0)
 
-            # Resolver sistemas de ecuaciones
-            ax, _residuals, _rank, _s = np.linalg.lstsq(X, Yx, rcond=None)
-            ay, _residuals, _rank, _s = np.linalg.lstsq(X, Yy, rcond=None)
+            # Ridge sobre características estandarizadas (la media no se penaliza)
+            n = len(X)
+            A = Z.T @ Z + self.ridge * n * np.eye(Z.shape[1])
+            B = np.linalg.solve(A, Z.T @ (Y - Y_mean))
 
-            # Construir matriz de transformación
-            self.calibration_matrix = np.vstack([ax, ay])
+            # Volver a la matriz afín sobre las características originales
+            coef = np.zeros((2, dim))
+            coef[:, used] = (B / std[used][:, None]).T
+            bias = Y_mean - coef @ mean
+            self.calibration_matrix = np.hstack([coef, bias[:, None]])
 
             if self.logger:
                 self.logger.info(
@@ -126,8 +178,8 @@ class Calibration:
         Returns:
             Tupla (x, y) en coordenadas de pantalla
         """
-        if self.calibration_matrix is None:
-            # Sin calibración, usar mapeo lineal simple
+        if self.calibration_matrix is None or self.feature_dim != 2:
+            # Sin calibración 2D, usar mapeo lineal simple
             x = int(gaze_x * self.screen_width)
             y = int(gaze_y * self.screen_height)
         else:
@@ -143,6 +195,31 @@ class Calibration:
 
         return x, y
 
+    def map_features_to_screen(self, features: Sequence[float]) -> Optional[Tuple[float, float]]:
+        """
+        Mapea un vector de características a coordenadas de pantalla normalizadas
+
+        Args:
+            features: Vector de características (misma dimensión que la calibración)
+
+        Returns:
+            Tupla (x, y) normalizada 0-1 sin recortar, o None si la calibración
+            activa no corresponde a ese tipo de características
+        """
+        if self.calibration_matrix is None or self.feature_dim != len(features):
+            return None
+
+        v = np.append(np.asarray(features, dtype=np.float64), 1.0)
+        xy = self.calibration_matrix @ v
+        return float(xy[0]) / self.screen_width, float(xy[1]) / self.screen_height
+
+    @property
+    def feature_dim(self) -> Optional[int]:
+        """Dimensión de características de la calibración activa"""
+        if self.calibration_matrix is None:
+            return None
+        return self.calibration_matrix.shape[1] - 1
+
     def clear_samples(self):
         """Limpia las muestras de calibración"""
         self.samples_src.clear()
@@ -171,7 +248,9 @@ class Calibration:
 
     def load_calibration_data(self, data: dict):
         """Carga datos de calibración desde persistencia"""
-        self.calibration_matrix = data.get('matrix')
+        # La base de datos devuelve 'calibration_matrix'
+        matrix = data.get('matrix', data.get('calibration_matrix'))
+        self.calibration_matrix = np.asarray(matrix) if matrix is not None else None
         self.samples_src = data.get('samples_src', [])
         self.samples_dst = data.get('samples_dst', [])
 
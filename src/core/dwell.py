@@ -0,0 +1,178 @@
+"""Motor de dwell click: fijación por ventana deslizante sobre un hash espacial"""
+import time
+import logging
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+class DwellEngine:
+    """
+    Detecta fijaciones con una ventana deslizante de muestras de mirada
+    indexadas en una rejilla (hash espacial) de celda `cell_size`: comprobar si
+    la mirada sigue en el vecindario de la fijación cuesta O(1) (9 celdas)
+    sin importar cuántas muestras haya en la ventana.
+
+    Tras un click hay un periodo refractario y, opcionalmente, hay que salir
+    del vecindario antes de poder volver a hacer click en el mismo sitio
+    """
+
+    def __init__(self, dwell_time: float = 0.70, cell_size: float = 0.01,
+                 window: float = 0.15, fixation_ratio: float = 0.8,
+                 refractory_period: float = 1.0, rearm_on_exit: bool = True,
+                 snap_to_centroid: bool = True, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            dwell_time: Segundos de fijación para hacer click
+            cell_size: Lado de celda en coordenadas normalizadas; el vecindario
+                (3x3 celdas) tolera entre 1 y 2 celdas de desplazamiento
+            window: Duración (s) de la ventana deslizante de muestras
+            fixation_ratio: Fracción de la ventana que debe caer en el vecindario
+            refractory_period: Segundos sin dwell tras un click
+            rearm_on_exit: Exigir que la mirada salga del vecindario antes de
+                otro click (evita clicks repetidos mirando el mismo punto)
+            snap_to_centroid: Hacer click en el centroide de la fijación en lugar
+                de en la última posición del cursor
+        """
+        self.dwell_time = dwell_time
+        self.cell_size = cell_size
+        self.window = window
+        self.fixation_ratio = fixation_ratio
+        self.refractory_period = refractory_period
+        self.rearm_on_exit = rearm_on_exit
+        self.snap_to_centroid = snap_to_centroid
+        self.logger = logger
+
+        # Muestras (t, celda, x de pantalla, y de pantalla) de la ventana
+        self._samples: deque = deque()
+        # celda -> [muestras, suma x pantalla, suma y pantalla]
+        self._cells: Dict[Tuple[int, int], list] = {}
+
+        self.anchor: Optional[Tuple[int, int]] = None
+        self.start_time: Optional[float] = None
+        self.progress = 0.0
+        self.refractory_until = 0.0
+        self.armed = True
+
+    def reset(self):
+        """Olvida la ventana y la fijación en curso"""
+        self._samples.clear()
+        self._cells.clear()
+        self.anchor = None
+        self.start_time = None
+        self.progress = 0.0
+        self.armed = True
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _add(self, t: float, cell: Tuple[int, int], screen_x: int, screen_y: int):
+        self._samples.append((t, cell, screen_x, screen_y))
+        entry = self._cells.get(cell)
+        if entry is None:
+            self._cells[cell] = [1, screen_x, screen_y]
+        else:
+            entry[0] += 1
+            entry[1] += screen_x
+            entry[2] += screen_y
+
+        # Expirar muestras fuera de la ventana
+        limit = t - self.window
+        samples = self._samples
+        while samples and samples[0][0] < limit:
+            _, old_cell, old_x, old_y = samples.popleft()
+            entry = self._cells[old_cell]
+            entry[0] -= 1
+            if entry[0] == 0:
+                del self._cells[old_cell]
+            else:
+                entry[1] -= old_x
+                entry[2] -= old_y
+
+    def _neighbourhood(self, cell: Tuple[int, int]) -> Tuple[int, int, int]:
+        """Muestras y sumas de coordenadas de pantalla en las 9 celdas alrededor de `cell`"""
+        count = sum_x = sum_y = 0
+        cx, cy = cell
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                entry = self._cells.get((cx + dx, cy + dy))
+                if entry is not None:
+                    count += entry[0]
+                    sum_x += entry[1]
+                    sum_y += entry[2]
+        return count, sum_x, sum_y
+
+    def update(self, gaze_x: float, gaze_y: float, screen_x: int, screen_y: int,
+               gaze_event: Optional[str] = None,
+               timestamp: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """
+        Procesa una muestra de mirada
+
+        Args:
+            gaze_x: Coordenada x de mirada normalizada
+            gaze_y: Coordenada y de mirada normalizada
+            screen_x: Coordenada x de pantalla del cursor
+            screen_y: Coordenada y de pantalla del cursor
+            gaze_event: Evento ocular ('fixation', 'saccade', 'blink'), si se conoce
+            timestamp: Instante de la muestra en segundos (None = time.monotonic())
+
+        Returns:
+            Punto de pantalla donde hacer click, o None
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+
+        # Los parpadeos no interrumpen la fijación ni aportan posición válida
+        if gaze_event == 'blink':
+            return None
+
+        cell = self._cell(gaze_x, gaze_y)
+        self._add(now, cell, screen_x, screen_y)
+
+        if gaze_event == 'saccade':
+            self._leave()
+            return None
+
+        # ¿Seguimos en el vecindario de la fijación en curso?
+        if self.anchor is not None and (abs(cell[0] - self.anchor[0]) > 1 or
+                                        abs(cell[1] - self.anchor[1]) > 1):
+            self._leave()
+
+        if self.anchor is None:
+            # Nueva fijación si casi toda la ventana cae alrededor de la muestra
+            count, _, _ = self._neighbourhood(cell)
+            if len(self._samples) < 3 or count < self.fixation_ratio * len(self._samples):
+                return None
+            self.anchor = cell
+            self.start_time = now
+
+        if not self.armed and not self.rearm_on_exit and now >= self.refractory_until:
+            self.armed = True
+        if not self.armed or now < self.refractory_until:
+            self.progress = 0.0
+            return None
+
+        # El tiempo de dwell cuenta desde que terminó el periodo refractario
+        elapsed = now - max(self.start_time, self.refractory_until)
+        self.progress = min(1.0, elapsed / self.dwell_time)
+        if self.progress < 1.0:
+            return None
+
+        # Click: punto ajustado al centroide de la fijación
+        count, sum_x, sum_y = self._neighbourhood(self.anchor)
+        if self.snap_to_centroid and count:
+            point = (int(round(sum_x / count)), int(round(sum_y / count)))
+        else:
+            point = (screen_x, screen_y)
+
+        self.progress = 0.0
+        self.refractory_until = now + self.refractory_period
+        self.armed = False
+        if self.logger:
+            self.logger.debug(f"Dwell click en {point}")
+        return point
+
+    def _leave(self):
+        """La mirada sale de la fijación: se cancela el progreso y se rearma"""
+        self.anchor = None
+        self.start_time = None
+        self.progress = 0.0
+        self.armed = True
@@ -0,0 +1,259 @@
+"""Clasificador temporal de guiños, parpadeos y entrecerrado sobre la serie EAR"""
+import json
+import math
+import logging
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .ear_model import AdaptiveEarThresholds
+from ..utils.ring_buffer import RingBuffer
+
+
+class EarSequenceClassifier:
+    """
+    Clasifica el estado de los ojos a partir de los últimos ~300 ms de EAR de
+    ambos ojos y de su derivada filtrada.
+
+    Los EAR se normalizan como cierre relativo a la apertura habitual de cada
+    ojo (0 = abierto, ~0.7 = cerrado), así el mismo modelo sirve para ojos
+    estrechos y para el EAR aproximado del detector Haar. El modelo es un
+    clasificador gaussiano diagonal (media y desviación por clase y
+    característica) que se entrena con train_ear_classifier.py
+    """
+
+    OPEN = 'open'
+    WINK_LEFT = 'wink_left'
+    WINK_RIGHT = 'wink_right'
+    BLINK = 'blink'
+    SQUINT = 'squint'
+    CLASSES = (OPEN, WINK_LEFT, WINK_RIGHT, BLINK, SQUINT)
+
+    FEATURES = ('closure_left', 'closure_right', 'mean_left', 'mean_right',
+                'max_left', 'max_right', 'velocity_left', 'velocity_right',
+                'asymmetry', 'mean_asymmetry')
+
+    # Modelo por defecto (cierre relativo, velocidades en cierre/s)
+    DEFAULT_MEANS = np.array([
+        [0.00, 0.00, 0.00, 0.00, 0.05, 0.05, 0.0, 0.0, 0.00, 0.00],   # open
+        [0.70, 0.15, 0.55, 0.12, 0.75, 0.20, 0.0, 0.0, 0.55, 0.43],   # wink_left
+        [0.15, 0.70, 0.12, 0.55, 0.20, 0.75, 0.0, 0.0, -0.55, -0.43],  # wink_right
+        [0.60, 0.60, 0.40, 0.40, 0.70, 0.70, 0.0, 0.0, 0.00, 0.00],   # blink
+        [0.35, 0.35, 0.35, 0.35, 0.40, 0.40, 0.0, 0.0, 0.00, 0.00]    # squint
+    ])
+    DEFAULT_STDS = np.array([
+        [0.08, 0.08, 0.25, 0.25, 0.35, 0.35, 3.0, 3.0, 0.08, 0.25],
+        [0.15, 0.15, 0.20, 0.15, 0.15, 0.15, 4.0, 3.0, 0.20, 0.20],
+        [0.15, 0.15, 0.15, 0.20, 0.15, 0.15, 3.0, 4.0, 0.20, 0.20],
+        [0.25, 0.25, 0.20, 0.20, 0.20, 0.20, 8.0, 8.0, 0.10, 0.08],
+        [0.10, 0.10, 0.10, 0.10, 0.10, 0.10, 1.5, 1.5, 0.08, 0.06]
+    ])
+    DEFAULT_PRIORS = np.array([0.80, 0.05, 0.05, 0.05, 0.05])
+
+    def __init__(self, window: float = 0.3, velocity_cutoff: float = 8.0,
+                 model_path: Optional[str] = None, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            window: Duración (s) de la ventana de EAR
+            velocity_cutoff: Frecuencia de corte (Hz) del filtro de la derivada
+            model_path: Modelo entrenado (.npz); si no existe se usa el modelo por defecto
+        """
+        self.window = window
+        self.velocity_cutoff = velocity_cutoff
+        self.logger = logger
+
+        # Filas (t, cierre izquierdo, cierre derecho); 64 filas cubren 300 ms a 200 FPS
+        self.history = RingBuffer(64, width=3)
+        self.velocity_left = 0.0
+        self.velocity_right = 0.0
+        self._velocity_tau = 1.0 / (2.0 * math.pi * velocity_cutoff)
+        self._features = np.zeros(len(self.FEATURES))
+        self.last_label = self.OPEN
+
+        self.set_model(self.DEFAULT_MEANS, self.DEFAULT_STDS, self.DEFAULT_PRIORS)
+        if model_path and Path(model_path).exists():
+            self.load(model_path)
+
+    def set_model(self, means: np.ndarray, stds: np.ndarray, priors: np.ndarray):
+        """
+        Establece los parámetros del modelo
+
+        Args:
+            means: Medias (clases x características)
+            stds: Desviaciones típicas (clases x características)
+            priors: Probabilidad a priori de cada clase
+        """
+        shape = (len(self.CLASSES), len(self.FEATURES))
+        if means.shape != shape or stds.shape != shape or priors.shape != (shape[0],):
+            raise ValueError(f"Modelo con forma inválida: se esperaba {shape}")
+        self.means = means.astype(np.float64)
+        stds = np.maximum(stds.astype(np.float64), 1e-3)
+        self.inv_var = 1.0 / (stds * stds)
+        # Término constante de la log-verosimilitud de cada clase
+        self.log_norm = np.log(np.maximum(priors, 1e-6)) - np.log(stds).sum(axis=1)
+        self.stds = stds
+        self.priors = priors.astype(np.float64)
+
+    def reset(self):
+        """Vacía el historial (p. ej. al perder el rostro)"""
+        self.history.clear()
+        self.velocity_left = 0.0
+        self.velocity_right = 0.0
+        self.last_label = self.OPEN
+
+    def push(self, closure_left: float, closure_right: float, t: float) -> np.ndarray:
+        """
+        Añade una muestra y retorna el vector de características (buffer
+        reutilizado: se sobrescribe en la siguiente llamada)
+
+        Args:
+            closure_left: Cierre relativo del ojo izquierdo
+            closure_right: Cierre relativo del ojo derecho
+            t: Timestamp de la muestra (s)
+        """
+        if len(self.history):
+            last_t, last_left, last_right = self.history.latest().tolist()
+            dt = t - last_t
+            if dt > 0:
+                # Derivada suavizada con un paso bajo de primer orden
+                alpha = dt / (dt + self._velocity_tau)
+                self.velocity_left += alpha * ((closure_left - last_left) / dt - self.velocity_left)
+                self.velocity_right += alpha * ((closure_right - last_right) / dt - self.velocity_right)
+        self.history.append((t, closure_left, closure_right))
+
+        rows = self.history.last()
+        recent = rows[rows[:, 0] >= t - self.window, 1:]
+        mean_left, mean_right = recent.mean(axis=0).tolist()
+        max_left, max_right = recent.max(axis=0).tolist()
+
+        features = self._features
+        features[:] = (closure_left, closure_right, mean_left, mean_right, max_left, max_right,
+                       self.velocity_left, self.velocity_right,
+                       closure_left - closure_right, mean_left - mean_right)
+        return features
+
+    def predict(self, features: np.ndarray) -> str:
+        """Clase más probable para un vector de características"""
+        diff = features - self.means
+        scores = self.log_norm - 0.5 * (diff * diff * self.inv_var).sum(axis=1)
+        return self.CLASSES[int(np.argmax(scores))]
+
+    def update(self, closure_left: float, closure_right: float, t: float) -> str:
+        """
+        Clasifica la muestra actual
+
+        Returns:
+            Una de CLASSES
+        """
+        self.last_label = self.predict(self.push(closure_left, closure_right, t))
+        return self.last_label
+
+    @classmethod
+    def closed_flags(cls, label: str) -> Tuple[bool, bool]:
+        """Traduce una clase a (ojo izquierdo cerrado, ojo derecho cerrado)"""
+        if label == cls.BLINK:
+            return True, True
+        return label == cls.WINK_LEFT, label == cls.WINK_RIGHT
+
+    def fit(self, features: np.ndarray, labels: np.ndarray, min_samples: int = 5):
+        """
+        Estima el modelo a partir de ejemplos etiquetados. Las clases con menos
+        de `min_samples` ejemplos conservan los parámetros actuales
+
+        Args:
+            features: Array (N, características)
+            labels: Array (N,) con nombres de clase
+            min_samples: Ejemplos mínimos para reestimar una clase
+
+        Returns:
+            Diccionario clase -> número de ejemplos usados
+        """
+        means, stds = self.means.copy(), self.stds.copy()
+        priors = self.priors.copy()
+        counts = {}
+        for i, name in enumerate(self.CLASSES):
+            rows = features[labels == name]
+            counts[name] = len(rows)
+            if len(rows) < min_samples:
+                continue
+            means[i] = rows.mean(axis=0)
+            # Suelo de dispersión para no colapsar con pocos ejemplos
+            stds[i] = np.maximum(rows.std(axis=0), 0.25 * self.stds[i])
+            priors[i] = len(rows) / len(labels)
+        self.set_model(means, stds, priors / priors.sum())
+        return counts
+
+    def save(self, file_path: str):
+        """Guarda el modelo en un .npz"""
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, means=self.means, stds=self.stds, priors=self.priors,
+                 classes=np.array(self.CLASSES), features=np.array(self.FEATURES),
+                 window=np.array(self.window))
+
+    def load(self, file_path: str):
+        """Carga un modelo entrenado (se ignora si no es compatible)"""
+        try:
+            with np.load(file_path) as data:
+                if (tuple(data['classes']) != self.CLASSES or
+                        tuple(data['features']) != self.FEATURES):
+                    raise ValueError("clases o características distintas")
+                self.set_model(data['means'], data['stds'], data['priors'])
+                self.window = float(data['window'])
+        except (OSError, KeyError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Modelo de guiños no cargado ({file_path}): {e}")
+            return
+        if self.logger:
+            self.logger.info(f"Modelo de guiños cargado desde {file_path}")
+
+
+def load_label_segments(file_path) -> List[Tuple[float, float, str]]:
+    """
+    Carga las etiquetas de una sesión grabada
+
+    El archivo es una lista JSON de {"start": s, "end": s, "label": clase} con
+    segundos desde el inicio de la grabación
+
+    Returns:
+        Lista de (inicio, fin, clase) ordenada por inicio
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    segments = []
+    for entry in entries:
+        label = entry['label']
+        if label not in EarSequenceClassifier.CLASSES:
+            raise ValueError(f"Etiqueta desconocida en {file_path}: {label}")
+        segments.append((float(entry['start']), float(entry['end']), label))
+    return sorted(segments)
+
+
+def build_training_set(times: np.ndarray, ears: np.ndarray,
+                       segments: List[Tuple[float, float, str]],
+                       base_threshold: float = 0.20, window: float = 0.3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reproduce una serie de EAR como en vivo (modelo adaptativo + ventana) y
+    etiqueta cada frame con el segmento que lo contiene ('open' si ninguno)
+
+    Args:
+        times: Timestamps (N,) en segundos desde el inicio de la sesión
+        ears: EAR (N, 2) de los ojos izquierdo y derecho
+        segments: Segmentos etiquetados de load_label_segments()
+        base_threshold: Umbral EAR de partida
+        window: Duración (s) de la ventana del clasificador
+
+    Returns:
+        Tupla (características (N, F), etiquetas (N,))
+    """
+    ear_model = AdaptiveEarThresholds(base_threshold=base_threshold)
+    classifier = EarSequenceClassifier(window=window)
+
+    features = np.empty((len(times), len(EarSequenceClassifier.FEATURES)))
+    labels = np.full(len(times), EarSequenceClassifier.OPEN, dtype=object)
+    for i, (t, (ear_left, ear_right)) in enumerate(zip(times, ears)):
+        ear_model.update(ear_left, ear_right)
+        features[i] = classifier.push(*ear_model.closures(ear_left, ear_right), t)
+
+    for start, end, label in segments:
+        labels[(times >= start) & (times <= end)] = label
+    return features, labels.astype(str)
@@ -0,0 +1,235 @@
+"""Umbrales EAR adaptativos por usuario con estadísticas en línea"""
+import math
+import logging
+from typing import Optional, Tuple
+
+
+class RunningStats:
+    """
+    Media y varianza en línea (Welford) con olvido: a partir de `max_count`
+    muestras cada nueva muestra pesa 1/max_count, así la estimación sigue
+    los cambios lentos (iluminación, cansancio) con coste O(1)
+    """
+
+    __slots__ = ('count', 'mean', 'var', 'max_count')
+
+    def __init__(self, max_count: int = 3000):
+        self.max_count = max_count
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+
+    def update(self, x: float):
+        self.count = min(self.count + 1, self.max_count)
+        weight = 1.0 / self.count
+        delta = x - self.mean
+        self.mean += weight * delta
+        self.var = (1.0 - weight) * (self.var + weight * delta * delta)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    def to_list(self) -> list:
+        return [self.count, self.mean, self.var]
+
+    def load(self, values: list):
+        count, mean, var = values
+        self.count = min(int(count), self.max_count)
+        self.mean = float(mean)
+        self.var = max(0.0, float(var))
+
+
+class EyeEarModel:
+    """
+    Distribuciones de EAR con el ojo abierto y cerrado de un ojo, y estado
+    abierto/cerrado con histéresis.
+
+    El umbral es el punto entre ambas medias a igual número de desviaciones
+    típicas. Mientras no hay cierres suficientes se usa el umbral base,
+    rebajado si la apertura habitual del usuario queda cerca de él
+    """
+
+    def __init__(self, base_threshold: float = 0.20, hysteresis: float = 0.10,
+                 min_open_samples: int = 90, min_closed_samples: int = 6,
+                 open_sigmas: float = 4.0, threshold_range: Tuple[float, float] = (0.05, 0.45),
+                 max_samples: int = 3000):
+        """
+        Args:
+            base_threshold: Umbral inicial (y máximo mientras no hay cierres registrados)
+            hysteresis: Ancho de la banda de histéresis relativo al umbral
+            min_open_samples: Muestras abiertas antes de adaptar el umbral
+            min_closed_samples: Muestras cerradas antes de usar ambas distribuciones
+            open_sigmas: Desviaciones bajo la media abierta para el umbral sin cierres
+            threshold_range: Límites (mínimo, máximo) del umbral adaptado
+            max_samples: Horizonte de olvido de las estadísticas
+        """
+        self.base_threshold = base_threshold
+        self.hysteresis = hysteresis
+        self.min_open_samples = min_open_samples
+        self.min_closed_samples = min_closed_samples
+        self.open_sigmas = open_sigmas
+        self.threshold_range = threshold_range
+
+        self.open_stats = RunningStats(max_samples)
+        self.closed_stats = RunningStats(max_samples)
+        self.closed = False
+        self.threshold = base_threshold
+
+    def update(self, ear: float) -> bool:
+        """
+        Procesa una muestra de EAR
+
+        Args:
+            ear: Eye Aspect Ratio del frame
+
+        Returns:
+            True si el ojo está cerrado
+        """
+        half_band = 0.5 * self.hysteresis * self.threshold
+        if self.closed:
+            self.closed = ear < self.threshold + half_band
+        else:
+            self.closed = ear < self.threshold - half_band
+
+        open_stats = self.open_stats
+        if open_stats.count < self.min_open_samples:
+            # Arranque: todo lo que no es un cierre evidente cuenta como abierto
+            if open_stats.count < 10 or ear > 0.5 * open_stats.mean:
+                open_stats.update(ear)
+        elif self.closed:
+            self.closed_stats.update(ear)
+        else:
+            open_stats.update(ear)
+
+        self.threshold = self._compute_threshold()
+        return self.closed
+
+    def open_reference(self) -> float:
+        """EAR habitual con el ojo abierto (estimado a partir del umbral al inicio)"""
+        if self.open_stats.count >= self.min_open_samples:
+            return self.open_stats.mean
+        return self.base_threshold / 0.7
+
+    def _compute_threshold(self) -> float:
+        open_stats, closed_stats = self.open_stats, self.closed_stats
+        if open_stats.count < self.min_open_samples:
+            return self.base_threshold
+
+        open_std = open_stats.std + 1e-4
+        if (closed_stats.count >= self.min_closed_samples and
+                open_stats.mean - closed_stats.mean > 2.0 * open_std):
+            closed_std = closed_stats.std + 1e-4
+            threshold = ((closed_stats.mean * open_std + open_stats.mean * closed_std) /
+                         (open_std + closed_std))
+        else:
+            # Ojos estrechos: bajar el umbral para no confundir apertura con guiño
+            threshold = min(self.base_threshold, open_stats.mean - self.open_sigmas * open_std)
+
+        low, high = self.threshold_range
+        return min(high, max(low, threshold))
+
+    def to_dict(self) -> dict:
+        return {'open': self.open_stats.to_list(), 'closed': self.closed_stats.to_list()}
+
+    def load(self, state: dict):
+        self.open_stats.load(state['open'])
+        self.closed_stats.load(state['closed'])
+        self.closed = False
+        self.threshold = self._compute_threshold()
+
+
+class AdaptiveEarThresholds:
+    """Modelos EAR de ambos ojos, persistibles por usuario"""
+
+    def __init__(self, base_threshold: float = 0.20, hysteresis: float = 0.10,
+                 enabled: bool = True, logger: Optional[logging.Logger] = None, **kwargs):
+        """
+        Args:
+            base_threshold: Umbral EAR de partida (wink_threshold)
+            hysteresis: Ancho de la banda de histéresis relativo al umbral
+            enabled: Adaptar los umbrales (False = umbral fijo con histéresis)
+            **kwargs: Parámetros adicionales de EyeEarModel
+        """
+        self.enabled = enabled
+        self.logger = logger
+        self.left = EyeEarModel(base_threshold, hysteresis, **kwargs)
+        self.right = EyeEarModel(base_threshold, hysteresis, **kwargs)
+
+    @property
+    def base_threshold(self) -> float:
+        return self.left.base_threshold
+
+    @base_threshold.setter
+    def base_threshold(self, value: float):
+        for model in (self.left, self.right):
+            model.base_threshold = value
+            model.threshold = model._compute_threshold() if self.enabled else value
+
+    def update(self, ear_left: float, ear_right: float) -> Tuple[bool, bool]:
+        """
+        Procesa los EAR de un frame
+
+        Returns:
+            Tupla (ojo izquierdo cerrado, ojo derecho cerrado)
+        """
+        if not self.enabled:
+            for model in (self.left, self.right):
+                model.threshold = model.base_threshold
+            return self._update_fixed(self.left, ear_left), self._update_fixed(self.right, ear_right)
+        return self.left.update(ear_left), self.right.update(ear_right)
+
+    @staticmethod
+    def _update_fixed(model: EyeEarModel, ear: float) -> bool:
+        half_band = 0.5 * model.hysteresis * model.threshold
+        limit = model.threshold + half_band if model.closed else model.threshold - half_band
+        model.closed = ear < limit
+        return model.closed
+
+    def closures(self, ear_left: float, ear_right: float) -> Tuple[float, float]:
+        """
+        Cierre relativo de cada ojo respecto a su apertura habitual
+
+        Returns:
+            Tupla (izquierdo, derecho): 0 = abierto, ~0.7 = cerrado
+        """
+        return (1.0 - ear_left / max(self.left.open_reference(), 1e-3),
+                1.0 - ear_right / max(self.right.open_reference(), 1e-3))
+
+    @property
+    def thresholds(self) -> Tuple[float, float]:
+        """Umbrales actuales (izquierdo, derecho)"""
+        return self.left.threshold, self.right.threshold
+
+    def to_dict(self) -> dict:
+        """Estado serializable (JSON) para guardarlo por usuario"""
+        return {'left': self.left.to_dict(), 'right': self.right.to_dict()}
+
+    def load(self, state: Optional[dict]):
+        """
+        Restaura el estado guardado de un usuario
+
+        Args:
+            state: Diccionario de to_dict() (None = empezar de cero)
+        """
+        if not state:
+            return
+        try:
+            self.left.load(state['left'])
+            self.right.load(state['right'])
+        except (KeyError, TypeError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Estado EAR guardado inválido, se reinicia: {e}")
+            self.reset()
+            return
+        if self.logger:
+            left, right = self.thresholds
+            self.logger.info(f"Umbrales EAR del usuario: izq={left:.3f}, der={right:.3f}")
+
+    def reset(self):
+        """Olvida las estadísticas aprendidas"""
+        for model in (self.left, self.right):
+            model.open_stats = RunningStats(model.open_stats.max_count)
+            model.closed_stats = RunningStats(model.closed_stats.max_count)
+            model.closed = False
+            model.threshold = model.base_threshold
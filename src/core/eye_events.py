@@ -0,0 +1,111 @@
+"""Clasificación de eventos oculares: fijación, sacada y parpadeo"""
+import logging
+import numpy as np
+from typing import Optional, Tuple
+from ..utils.ring_buffer import RingBuffer
+
+
+class EyeEventClassifier:
+    """
+    Clasificador I-VT / I-DT sobre un historial acotado de muestras.
+
+    Una muestra es sacada si la velocidad supera el umbral (I-VT) o si la
+    dispersión de la ventana reciente es mayor que el umbral (I-DT); en caso
+    contrario es fijación. Con los ojos cerrados la muestra es parpadeo
+    """
+
+    FIXATION = 'fixation'
+    SACCADE = 'saccade'
+    BLINK = 'blink'
+
+    def __init__(self, velocity_threshold: float = 1.0, dispersion_threshold: float = 0.03,
+                 window: float = 0.1, history_size: int = 64,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            velocity_threshold: Velocidad (unidades normalizadas/s) para sacada
+            dispersion_threshold: Dispersión máxima (x + y) de una fijación
+            window: Duración (s) de la ventana de dispersión
+            history_size: Capacidad del historial de muestras
+        """
+        self.velocity_threshold = velocity_threshold
+        self.dispersion_threshold = dispersion_threshold
+        self.window = window
+        self.logger = logger
+
+        # Filas (t, x, y)
+        self.history = RingBuffer(history_size, width=3)
+
+        self.last_event: Optional[str] = None
+        self.fixation_start: Optional[float] = None
+        self.last_velocity = 0.0
+
+    def classify(self, x: float, y: float, t: float, eyes_closed: bool = False) -> str:
+        """
+        Clasifica una muestra de mirada
+
+        Args:
+            x: Coordenada x normalizada
+            y: Coordenada y normalizada
+            t: Timestamp de la muestra
+            eyes_closed: Si ambos ojos están cerrados
+
+        Returns:
+            FIXATION, SACCADE o BLINK
+        """
+        if eyes_closed:
+            # La posición del iris no es válida con los ojos cerrados
+            self.history.clear()
+            return self._set_event(self.BLINK, t)
+
+        self.history.append((t, x, y))
+        if len(self.history) < 3:
+            return self._set_event(self.FIXATION, t)
+
+        # I-VT: velocidad sobre las dos últimas muestras para atenuar ruido
+        samples = self.history.last(len(self.history))
+        t0, x0, y0 = samples[-3]
+        dt = max(1e-6, t - t0)
+        self.last_velocity = float(np.hypot(x - x0, y - y0) / dt)
+        if self.last_velocity > self.velocity_threshold:
+            return self._set_event(self.SACCADE, t)
+
+        # I-DT: dispersión de la ventana reciente
+        recent = samples[samples[:, 0] >= t - self.window, 1:]
+        dispersion = float(np.ptp(recent[:, 0]) + np.ptp(recent[:, 1]))
+        if dispersion > self.dispersion_threshold:
+            return self._set_event(self.SACCADE, t)
+
+        return self._set_event(self.FIXATION, t)
+
+    def _set_event(self, event: str, t: float) -> str:
+        """Actualiza el evento actual y el inicio de la fijación"""
+        if event == self.FIXATION:
+            if self.last_event != self.FIXATION:
+                self.fixation_start = t
+        elif event == self.SACCADE:
+            self.fixation_start = None
+        self.last_event = event
+        return event
+
+    def fixation_duration(self, t: float) -> float:
+        """Duración (s) de la fijación en curso, 0 si no hay fijación"""
+        if self.last_event != self.FIXATION or self.fixation_start is None:
+            return 0.0
+        return t - self.fixation_start
+
+    def fixation_centroid(self) -> Optional[Tuple[float, float]]:
+        """Centroide de la ventana reciente si hay fijación"""
+        if self.last_event != self.FIXATION or len(self.history) == 0:
+            return None
+        samples = self.history.last()
+        recent = samples[samples[:, 0] >= samples[-1, 0] - self.window, 1:]
+        cx, cy = recent.mean(axis=0)
+        return float(cx), float(cy)
+
+    def reset(self):
+        """Resetea el historial"""
+        self.history.clear()
+        self.last_event = None
+        self.fixation_start = None
+        self.last_velocity = 0.0
@@ -4,6 +4,7 @@ import mediapipe as mp
 import numpy as np
 from typing import Optional, Tuple, List
 import logging
+from ..utils.profiler import FrameProfiler
 
 
 class FaceDetector:
@@ -16,17 +17,20 @@ class FaceDetector:
     RIGHT_IRIS_CENTER = 473
 
     def __init__(self, max_num_faces=1, min_detection_confidence=0.6,
-                 min_tracking_confidence=0.6, logger: Optional[logging.Logger] = None):
+                 min_tracking_confidence=0.6, profiler: Optional[FrameProfiler] = None,
+                 logger: Optional[logging.Logger] = None):
         """
         Args:
             max_num_faces: Número máximo de rostros a detectar
             min_detection_confidence: Confianza mínima de detección
             min_tracking_confidence: Confianza mínima de tracking
+            profiler: Perfilador por etapas (opcional)
         """
         self.max_num_faces = max_num_faces
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
         self.logger = logger
+        self.profiler = profiler or FrameProfiler(capacity=1)
 
         self.mp_face = mp.solutions.face_mesh
         self.face_mesh = None
@@ -48,12 +52,13 @@ class FaceDetector:
                 self.logger.error(f"Error inicializando Face Mesh: {e}")
             raise
 
-    def detect(self, frame: np.ndarray) -> Optional[object]:
+    def detect(self, frame: np.ndarray, rgb: Optional[np.ndarray] = None) -> Optional[object]:
         """
         Detecta rostros en el frame
 
         Args:
             frame: Frame BGR de OpenCV
+            rgb: Frame ya convertido a RGB (FramePreprocessor); evita la conversión
 
         Returns:
             Resultado de la detección o None
@@ -62,8 +67,14 @@ class FaceDetector:
             self._initialize()
 
         try:
-            rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+            if rgb is None:
+                t = self.profiler.start()
+                rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+                self.profiler.stop('color_convert', t)
+
+            t = self.profiler.start()
             results = self.face_mesh.process(rgb)
+            self.profiler.stop('face_mesh', t)
             return results
         except Exception as e:
             if self.logger:
@@ -138,6 +149,38 @@ class FaceDetector:
 
         return ear_left, ear_right
 
+    def get_landmark_array(self, results) -> Optional[np.ndarray]:
+        """
+        Convierte los landmarks del primer rostro en un array (N, 3)
+
+        Returns:
+            Array float64 con columnas (x, y, z) o None
+        """
+        if not results or not results.multi_face_landmarks:
+            return None
+
+        landmarks = results.multi_face_landmarks[0].landmark
+        return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
+
+    def get_eye_aspect_ratios_from_array(self, points: np.ndarray) -> Tuple[float, float]:
+        """
+        Calcula los EAR de ambos ojos a partir de un array de landmarks
+
+        Args:
+            points: Array (N, 2+) de landmarks, p. ej. ya filtrados
+
+        Returns:
+            Tupla (ear_izquierdo, ear_derecho)
+        """
+        eyes = points[[self.LEFT_EYE, self.RIGHT_EYE], :2]  # (2, 6, 2)
+
+        v1 = np.linalg.norm(eyes[:, 2] - eyes[:, 5], axis=1)
+        v2 = np.linalg.norm(eyes[:, 3] - eyes[:, 4], axis=1)
+        h = np.linalg.norm(eyes[:, 0] - eyes[:, 1], axis=1)
+
+        ear = (v1 + v2) / (2.0 * h + 1e-6)
+        return float(ear[0]), float(ear[1])
+
     def draw_landmarks(self, frame: np.ndarray, results):
         """
         Dibuja los landmarks en el frame
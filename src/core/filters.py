@@ -18,6 +18,7 @@ class OneEuro:
         self.min_cutoff = min_cutoff
         self.beta = beta
         self.dcutoff = dcutoff
+        self.smoothing = 1.0
         self.x_prev = None
         self.dx_prev = None
         self.t_prev = None
@@ -54,7 +55,7 @@ class OneEuro:
         dx_hat = a_d * dx + (1 - a_d) * self.dx_prev
 
         # Filtrar señal
-        cutoff = self.min_cutoff + self.beta * abs(dx_hat)
+        cutoff = self.min_cutoff / self.smoothing + self.beta * abs(dx_hat)
         a = self.alpha(cutoff)
         x_hat = a * x + (1 - a) * self.x_prev
 
@@ -65,6 +66,15 @@ class OneEuro:
 
         return x_hat
 
+    def set_smoothing(self, factor: float):
+        """
+        Ajusta la intensidad del suavizado sin cambiar los parámetros base
+
+        Args:
+            factor: 1.0 = configurado, >1 más suave, <1 más responsivo
+        """
+        self.smoothing = max(1e-3, factor)
+
     def reset(self):
         """Resetea el filtro"""
         self.x_prev = None
@@ -72,6 +82,453 @@ class OneEuro:
         self.t_prev = None
 
 
+class OneEuroXY:
+    """
+    Par de filtros One-Euro escalares para la mirada (x, y) con la interfaz
+    de OneEuroBank. Con solo dos canales la versión escalar es varias veces
+    más rápida que el banco vectorizado, que compensa a partir de decenas de
+    canales (landmarks)
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, dcutoff=1.0):
+        self.filter_x = OneEuro(min_cutoff=min_cutoff, beta=beta, dcutoff=dcutoff)
+        self.filter_y = OneEuro(min_cutoff=min_cutoff, beta=beta, dcutoff=dcutoff)
+
+    @property
+    def min_cutoff(self):
+        return self.filter_x.min_cutoff
+
+    @min_cutoff.setter
+    def min_cutoff(self, value):
+        self.filter_x.min_cutoff = self.filter_y.min_cutoff = value
+
+    @property
+    def beta(self):
+        return self.filter_x.beta
+
+    @beta.setter
+    def beta(self, value):
+        self.filter_x.beta = self.filter_y.beta = value
+
+    def filter(self, x, t):
+        """
+        Args:
+            x: Par (x, y) actual
+            t: Timestamp actual
+
+        Returns:
+            Tupla (x, y) filtrada
+        """
+        return self.filter_x.filter(x[0], t), self.filter_y.filter(x[1], t)
+
+    def set_smoothing(self, factor: float):
+        """Ajusta la intensidad del suavizado (ver OneEuroBank.set_smoothing)"""
+        self.filter_x.set_smoothing(factor)
+        self.filter_y.set_smoothing(factor)
+
+    def reset(self):
+        """Resetea el filtro"""
+        self.filter_x.reset()
+        self.filter_y.reset()
+
+
+class OneEuroBank:
+    """
+    Banco de filtros One-Euro vectorizado: filtra N canales a la vez sobre
+    arrays de NumPy con un timestamp compartido (una actualización por frame)
+    """
+
+    TWO_PI = 2.0 * math.pi
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, dcutoff=1.0):
+        """
+        Args:
+            min_cutoff: Frecuencia de corte mínima (escalar o array por canal)
+            beta: Factor de adaptación a la velocidad (escalar o array por canal)
+            dcutoff: Frecuencia de corte para la derivada
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.dcutoff = dcutoff
+        self.smoothing = 1.0
+        self.x_prev = None
+        self.dx_prev = None
+        self.t_prev = None
+
+        # Buffers de trabajo reutilizados entre frames
+        self._dx = None
+        self._a = None
+
+    def filter(self, x, t):
+        """
+        Aplica el filtro a todos los canales
+
+        Args:
+            x: Array (de cualquier forma) con los valores actuales
+            t: Timestamp actual compartido por todos los canales
+
+        Returns:
+            Array filtrado con la misma forma que x
+        """
+        x = np.asarray(x, dtype=np.float64)
+
+        if self.t_prev is None or self.x_prev.shape != x.shape:
+            self.t_prev = t
+            self.x_prev = x.copy()
+            self.dx_prev = np.zeros_like(self.x_prev)
+            self._dx = np.empty_like(self.x_prev)
+            self._a = np.empty_like(self.x_prev)
+            return x.copy()
+
+        dt = max(1e-6, t - self.t_prev)
+        dx, a = self._dx, self._a
+
+        # Filtrar derivada (alpha escalar compartido)
+        np.subtract(x, self.x_prev, out=dx)
+        dx /= dt
+        w_d = self.TWO_PI * self.dcutoff * dt
+        a_d = w_d / (1.0 + w_d)
+        dx -= self.dx_prev
+        dx *= a_d
+        self.dx_prev += dx
+
+        # Corte adaptativo por canal: alpha = w / (1 + w), w = 2*pi*cutoff*dt
+        np.abs(self.dx_prev, out=a)
+        a *= self.beta
+        a += self.min_cutoff / self.smoothing
+        a *= self.TWO_PI * dt
+        np.divide(a, a + 1.0, out=a)
+
+        # Filtrar señal
+        np.subtract(x, self.x_prev, out=dx)
+        dx *= a
+        self.x_prev += dx
+        self.t_prev = t
+
+        return self.x_prev.copy()
+
+    def set_smoothing(self, factor: float):
+        """
+        Ajusta la intensidad del suavizado sin cambiar los parámetros base
+
+        Args:
+            factor: 1.0 = configurado, >1 más suave, <1 más responsivo
+        """
+        self.smoothing = max(1e-3, factor)
+
+    def reset(self):
+        """Resetea el filtro"""
+        self.x_prev = None
+        self.dx_prev = None
+        self.t_prev = None
+
+
+class KalmanPredictor:
+    """
+    Filtro de Kalman lineal de orden configurable con predicción hacia adelante.
+
+    Cada canal es independiente, pero como comparten modelo, ruido y timestamp
+    la covarianza es la misma para todos y se calcula una sola vez por frame
+    """
+
+    # Número de estados por canal (posición, velocidad, ...)
+    ORDER = 2
+
+    def __init__(self, process_noise=0.5, measurement_noise=2e-5, latency=0.0):
+        """
+        Args:
+            process_noise: Densidad espectral del ruido en la derivada más alta
+            measurement_noise: Varianza del ruido de medición
+            latency: Tiempo (s) a predecir hacia adelante para compensar latencia
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.latency = latency
+        self.smoothing = 1.0
+
+        self.x = None  # Estado (ORDER, canales)
+        self.P = None  # Covarianza compartida (ORDER, ORDER)
+        self.t_prev = None
+        self._shape = None
+
+        n = self.ORDER
+        self._powers = np.arange(n)
+        self._factorials = np.array([math.factorial(k) for k in range(2 * n)], dtype=np.float64)
+
+    def _transition(self, dt):
+        """Matriz de transición: F[i, j] = dt^(j-i) / (j-i)!"""
+        n = self.ORDER
+        k = self._powers[None, :] - self._powers[:, None]
+        F = np.zeros((n, n))
+        upper = k >= 0
+        F[upper] = dt ** k[upper] / self._factorials[k[upper]]
+        return F
+
+    def _process_cov(self, dt):
+        """Ruido de proceso para ruido blanco continuo en la derivada más alta"""
+        n = self.ORDER
+        i = self._powers[:, None]
+        j = self._powers[None, :]
+        p = 2 * n - 1 - i - j
+        denom = p * self._factorials[n - 1 - i] * self._factorials[n - 1 - j]
+        return (self.process_noise / self.smoothing) * dt ** p / denom
+
+    def _initialize(self, z):
+        """Inicializa el estado en la primera medición"""
+        self.x = np.zeros((self.ORDER, z.size))
+        self.x[0] = z
+        self.P = np.diag([self.measurement_noise] + [1.0] * (self.ORDER - 1))
+
+    def _predict(self, dt):
+        """Paso de predicción"""
+        F = self._transition(dt)
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + self._process_cov(dt)
+
+    def _update(self, z):
+        """
+        Paso de corrección con medición directa de la posición
+
+        Returns:
+            Tupla (innovación por canal, varianza de la innovación)
+        """
+        S = self.P[0, 0] + self.measurement_noise
+        K = self.P[:, 0] / S
+        y = z - self.x[0]
+        self.x += K[:, None] * y[None, :]
+        self.P = self.P - np.outer(K, self.P[0, :])
+        return y, S
+
+    def _extrapolate(self, x, horizon):
+        """Posición extrapolada `horizon` segundos hacia adelante"""
+        if horizon <= 0:
+            return x[0].copy()
+        coeffs = horizon ** self._powers / self._factorials[:self.ORDER]
+        return coeffs @ x
+
+    def filter(self, x, t):
+        """
+        Aplica el filtro y predice la posición actual compensando la latencia
+
+        Args:
+            x: Valor o array de valores medidos
+            t: Timestamp de la medición
+
+        Returns:
+            Valor/array filtrado y extrapolado `latency` segundos
+        """
+        z = np.asarray(x, dtype=np.float64)
+        shape = z.shape
+        z = z.reshape(-1)
+
+        if self.t_prev is None or shape != self._shape:
+            self._shape = shape
+            self.t_prev = t
+            self._initialize(z)
+            return z.reshape(shape)
+
+        dt = max(1e-6, t - self.t_prev)
+        self.t_prev = t
+        self._step(z, dt)
+
+        return self._extrapolate(self.x, self.latency).reshape(shape)
+
+    def _step(self, z, dt):
+        """Predicción + corrección"""
+        self._predict(dt)
+        return self._update(z)
+
+    def set_smoothing(self, factor: float):
+        """
+        Ajusta la intensidad del suavizado escalando el ruido de proceso
+
+        Args:
+            factor: 1.0 = configurado, >1 más suave, <1 más responsivo
+        """
+        self.smoothing = max(1e-3, factor)
+
+    def reset(self):
+        """Resetea el filtro"""
+        self.x = None
+        self.P = None
+        self.t_prev = None
+        self._shape = None
+
+
+class ConstantVelocityKalman(KalmanPredictor):
+    """Kalman de velocidad constante (estado: posición, velocidad)"""
+
+    ORDER = 2
+
+
+class ConstantAccelerationKalman(KalmanPredictor):
+    """Kalman de aceleración constante (estado: posición, velocidad, aceleración)"""
+
+    ORDER = 3
+
+    def __init__(self, process_noise=20.0, measurement_noise=2e-5, latency=0.0):
+        super().__init__(process_noise, measurement_noise, latency)
+
+
+class IMMPredictor:
+    """
+    Interacting Multiple Model con dos modelos de velocidad constante:
+    fijación (poco ruido de proceso) y sacada (mucho ruido de proceso).
+
+    La probabilidad de modo es común a todos los canales (la mirada x/y
+    fija o salta a la vez), lo que mantiene las covarianzas compartidas
+    """
+
+    def __init__(self, fixation_noise=0.1, saccade_noise=10.0,
+                 measurement_noise=2e-5, latency=0.0,
+                 switch_probabilities=(0.05, 0.2)):
+        """
+        Args:
+            fixation_noise: Ruido de proceso del modelo de fijación
+            saccade_noise: Ruido de proceso del modelo de sacada
+            measurement_noise: Varianza del ruido de medición
+            latency: Tiempo (s) a predecir hacia adelante
+            switch_probabilities: (P fijación->sacada, P sacada->fijación) por frame
+        """
+        self.models = [
+            ConstantVelocityKalman(fixation_noise, measurement_noise),
+            ConstantVelocityKalman(saccade_noise, measurement_noise)
+        ]
+        p_fs, p_sf = switch_probabilities
+        self.transition = np.array([[1.0 - p_fs, p_fs], [p_sf, 1.0 - p_sf]])
+        self.latency = latency
+        self.mode_probabilities = np.array([0.9, 0.1])
+        self.t_prev = None
+        self._shape = None
+
+    @property
+    def saccade_probability(self) -> float:
+        """Probabilidad actual del modelo de sacada"""
+        return float(self.mode_probabilities[1])
+
+    @property
+    def measurement_noise(self):
+        return self.models[0].measurement_noise
+
+    @measurement_noise.setter
+    def measurement_noise(self, value):
+        for model in self.models:
+            model.measurement_noise = value
+
+    def _mix(self):
+        """Mezcla los estados de los modelos según las probabilidades de transición"""
+        c = self.mode_probabilities @ self.transition
+        weights = self.transition * self.mode_probabilities[:, None] / c[None, :]
+
+        mixed = []
+        for j in range(len(self.models)):
+            x0 = sum(weights[i, j] * m.x for i, m in enumerate(self.models))
+            P0 = np.zeros_like(self.models[0].P)
+            for i, m in enumerate(self.models):
+                d = m.x - x0
+                # Dispersión promediada sobre canales para mantener P compartida
+                P0 += weights[i, j] * (m.P + (d @ d.T) / d.shape[1])
+            mixed.append((x0, P0))
+
+        for model, (x0, P0) in zip(self.models, mixed):
+            model.x, model.P = x0, P0
+        return c
+
+    def filter(self, x, t):
+        """
+        Aplica el filtro IMM y predice la posición actual
+
+        Args:
+            x: Valor o array de valores medidos
+            t: Timestamp de la medición
+
+        Returns:
+            Valor/array filtrado y extrapolado `latency` segundos
+        """
+        z = np.asarray(x, dtype=np.float64)
+        shape = z.shape
+        z = z.reshape(-1)
+
+        if self.t_prev is None or shape != self._shape:
+            self._shape = shape
+            self.t_prev = t
+            for model in self.models:
+                model._initialize(z)
+            return z.reshape(shape)
+
+        dt = max(1e-6, t - self.t_prev)
+        self.t_prev = t
+
+        c = self._mix()
+
+        # Log-verosimilitud conjunta de todos los canales por modelo
+        log_likelihood = np.empty(len(self.models))
+        for j, model in enumerate(self.models):
+            y, S = model._step(z, dt)
+            log_likelihood[j] = -0.5 * (np.dot(y, y) / S + y.size * math.log(2 * math.pi * S))
+
+        log_mu = np.log(c + 1e-300) + log_likelihood
+        log_mu -= log_mu.max()
+        mu = np.exp(log_mu)
+        self.mode_probabilities = mu / mu.sum()
+
+        x_comb = sum(p * m.x for p, m in zip(self.mode_probabilities, self.models))
+        return self.models[0]._extrapolate(x_comb, self.latency).reshape(shape)
+
+    def set_smoothing(self, factor: float):
+        """Ajusta la intensidad del suavizado de ambos modelos"""
+        for model in self.models:
+            model.set_smoothing(factor)
+
+    def reset(self):
+        """Resetea el filtro"""
+        for model in self.models:
+            model.reset()
+        self.mode_probabilities = np.array([0.9, 0.1])
+        self.t_prev = None
+        self._shape = None
+
+
+def create_gaze_filter(filter_type: str = 'one_euro', min_cutoff=1.0, beta=0.02,
+                       process_noise=None, measurement_noise=2e-5):
+    """
+    Crea el filtro de mirada configurado. Todos comparten la interfaz
+    filter(x, t) / reset()
+
+    Args:
+        filter_type: 'one_euro', 'kalman_cv', 'kalman_ca' o 'imm'
+        min_cutoff: Parámetro OneEuro
+        beta: Parámetro OneEuro
+        process_noise: Ruido de proceso de los filtros de Kalman (None = valor por
+            defecto de cada modelo)
+        measurement_noise: Ruido de medición de los filtros de Kalman
+
+    Returns:
+        Instancia del filtro
+    """
+    if filter_type == 'one_euro':
+        return OneEuroXY(min_cutoff=min_cutoff, beta=beta)
+
+    if filter_type == 'imm':
+        if process_noise is None:
+            return IMMPredictor(measurement_noise=measurement_noise)
+        return IMMPredictor(fixation_noise=process_noise / 10.0,
+                            saccade_noise=process_noise * 10.0,
+                            measurement_noise=measurement_noise)
+
+    kalman_types = {
+        'kalman_cv': ConstantVelocityKalman,
+        'kalman_ca': ConstantAccelerationKalman
+    }
+    if filter_type not in kalman_types:
+        raise ValueError(f"Tipo de filtro desconocido: '{filter_type}'")
+
+    kalman = kalman_types[filter_type](measurement_noise=measurement_noise)
+    if process_noise is not None:
+        kalman.process_noise = process_noise
+    return kalman
+
+
 class EMA:
     """Filtro de Media Móvil Exponencial (Exponential Moving Average)"""
 
@@ -0,0 +1,61 @@
+"""Preprocesado de frames de cámara en buffers reutilizados"""
+import logging
+import cv2 as cv
+import numpy as np
+from typing import Optional, Tuple
+
+
+class FramePreprocessor:
+    """
+    Voltea el frame y lo convierte a RGB una sola vez por frame, escribiendo
+    en buffers preasignados por resolución (dst=) en lugar de crear arrays nuevos.
+
+    El frame BGR volteado es el lienzo de la vista previa; el RGB se entrega
+    como vista de solo lectura a todos los consumidores (Face Mesh, autenticación)
+    """
+
+    def __init__(self, mirror: bool = True, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            mirror: Voltear horizontalmente (efecto espejo)
+        """
+        self.mirror = mirror
+        self.logger = logger
+
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._display: Optional[np.ndarray] = None
+        self._rgb: Optional[np.ndarray] = None
+        self._rgb_view: Optional[np.ndarray] = None
+
+    def _allocate(self, frame: np.ndarray):
+        """Reserva los buffers para una nueva resolución"""
+        self._shape = frame.shape
+        self._display = np.empty_like(frame)
+        self._rgb = np.empty(frame.shape[:2] + (3,), dtype=frame.dtype)
+        self._rgb_view = self._rgb.view()
+        self._rgb_view.flags.writeable = False
+        if self.logger:
+            self.logger.debug(f"Buffers de preprocesado reservados para {frame.shape[1]}x{frame.shape[0]}")
+
+    def process(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Prepara un frame de cámara
+
+        Args:
+            frame: Frame BGR tal como sale de la cámara
+
+        Returns:
+            Tupla (frame BGR volteado para dibujar, vista RGB de solo lectura).
+            Ambos buffers se sobrescriben en la siguiente llamada
+        """
+        if frame.shape != self._shape:
+            self._allocate(frame)
+
+        if self.mirror:
+            display = cv.flip(frame, 1, dst=self._display)
+        else:
+            # Sin espejo el frame de la cámara ya sirve de lienzo
+            display = frame
+
+        cv.cvtColor(display, cv.COLOR_BGR2RGB, dst=self._rgb)
+        return display, self._rgb_view
@@ -0,0 +1,70 @@
+"""Grabación de trazas de mirada crudas para análisis y autoajuste offline"""
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class GazeTraceRecorder:
+    """Acumula muestras (t, x, y) sin filtrar durante una sesión"""
+
+    def __init__(self, max_samples: int = 200000):
+        """
+        Args:
+            max_samples: Límite de muestras (~1.8 h a 30 FPS)
+        """
+        self.max_samples = max_samples
+        self.samples: List[Tuple[float, float, float]] = []
+
+    def add(self, t: float, x: float, y: float):
+        """Añade una muestra si no se ha alcanzado el límite"""
+        if len(self.samples) < self.max_samples:
+            self.samples.append((t, x, y))
+
+    def save(self, trace_dir: str = "data/traces", user_id: Optional[int] = None,
+             space: str = "iris") -> Optional[Path]:
+        """
+        Guarda la traza en un archivo .npz
+
+        Args:
+            trace_dir: Directorio de trazas
+            user_id: Usuario al que pertenece la traza
+            space: Espacio de coordenadas de las muestras ('iris' o 'screen')
+
+        Returns:
+            Ruta del archivo o None si no hay muestras
+        """
+        if not self.samples:
+            return None
+
+        path = Path(trace_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        prefix = f"user_{user_id}" if user_id is not None else "trace"
+        file_path = path / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+
+        data = np.asarray(self.samples, dtype=np.float64)
+        np.savez_compressed(file_path, t=data[:, 0], x=data[:, 1], y=data[:, 2],
+                            space=np.array(space))
+        return file_path
+
+    def clear(self):
+        """Descarta las muestras acumuladas"""
+        self.samples.clear()
+
+
+def load_gaze_trace(file_path) -> Tuple[np.ndarray, str]:
+    """
+    Carga una traza guardada
+
+    Returns:
+        Tupla (array (N, 3) con columnas (t, x, y), espacio de coordenadas
+        'iris' o 'screen'; las trazas antiguas sin espacio son 'iris')
+    """
+    with np.load(file_path) as data:
+        space = str(data['space']) if 'space' in data.files else "iris"
+        return np.column_stack((data['t'], data['x'], data['y'])), space
+
+
+def find_user_traces(user_id: int, trace_dir: str = "data/traces") -> List[Path]:
+    """Lista las trazas grabadas de un usuario, de la más antigua a la más reciente"""
+    return sorted(Path(trace_dir).glob(f"user_{user_id}_*.npz"))
@@ -4,8 +4,15 @@ import logging
 import numpy as np
 from typing import Optional, Tuple
 from .face_detector import FaceDetector
-from .filters import OneEuro, DeadzoneFilter
+from .filters import OneEuroBank, OneEuroXY, DeadzoneFilter, create_gaze_filter
 from .calibration import Calibration
+from .head_pose import HeadPoseEstimator
+from .eye_events import EyeEventClassifier
+from .ear_model import AdaptiveEarThresholds
+from .ear_classifier import EarSequenceClassifier
+from .gaze_trace import GazeTraceRecorder
+from .targets import TargetSnapper
+from ..utils.profiler import FrameProfiler
 
 
 class GazeTracker:
@@ -14,6 +21,23 @@ class GazeTracker:
     def __init__(self, screen_width: int, screen_height: int,
                  gain: float = 1.2, deadzone: float = 0.015,
                  filter_min_cutoff: float = 1.2, filter_beta: float = 0.04,
+                 head_pose_compensation: bool = True,
+                 smooth_landmarks: bool = False,
+                 filter_type: str = 'one_euro',
+                 process_noise: Optional[float] = None,
+                 measurement_noise: float = 2e-5,
+                 prediction_extra_latency: float = 0.0,
+                 pipeline_latency: Optional[float] = None,
+                 saccade_velocity_threshold: float = 1.0,
+                 fixation_dispersion_threshold: float = 0.03,
+                 fixation_smoothing: float = 1.5, saccade_smoothing: float = 0.3,
+                 blink_threshold: float = 0.15,
+                 wink_threshold: float = 0.20, adaptive_ear: bool = True,
+                 ear_hysteresis: float = 0.10, ear_classifier: bool = True,
+                 ear_classifier_model: Optional[str] = None, ear_classifier_window: float = 0.3,
+                 target_snapping: bool = True, snap_radius: float = 60.0,
+                 snap_strength: float = 0.6,
+                 profiler: Optional[FrameProfiler] = None,
                  logger: Optional[logging.Logger] = None):
         """
         Args:
@@ -23,109 +47,321 @@ class GazeTracker:
             deadzone: Umbral de zona muerta
             filter_min_cutoff: Parámetro del filtro OneEuro
             filter_beta: Parámetro del filtro OneEuro
+            head_pose_compensation: Usar características compensadas por pose de cabeza
+            smooth_landmarks: Filtrar todos los landmarks antes de detectar gestos
+            filter_type: Filtro de mirada ('one_euro', 'kalman_cv', 'kalman_ca', 'imm')
+            process_noise: Ruido de proceso de los filtros predictivos (None = por defecto)
+            measurement_noise: Ruido de medición de los filtros predictivos
+            prediction_extra_latency: Latencia (s) no medible a sumar a la predicción
+                (exposición de cámara, refresco de pantalla)
+            pipeline_latency: Latencia fija (s) del pipeline para la predicción
+                (None = medirla en cada frame). Al reproducir una grabación la
+                latencia medida dependería de la velocidad de la máquina
+            saccade_velocity_threshold: Velocidad mínima de una sacada (I-VT)
+            fixation_dispersion_threshold: Dispersión máxima de una fijación (I-DT)
+            fixation_smoothing: Factor de suavizado durante fijaciones
+            saccade_smoothing: Factor de suavizado durante sacadas
+            blink_threshold: EAR bajo el cual ambos ojos se consideran cerrados
+            wink_threshold: Umbral EAR de partida para considerar un ojo cerrado
+            adaptive_ear: Adaptar el umbral de cada ojo a las estadísticas del usuario
+            ear_hysteresis: Ancho de la banda de histéresis relativo al umbral
+            ear_classifier: Clasificar guiño/parpadeo/entrecerrado con la serie temporal
+                de EAR en lugar de comparar cada frame con el umbral
+            ear_classifier_model: Modelo entrenado del clasificador (.npz)
+            ear_classifier_window: Duración (s) de la ventana del clasificador
+            target_snapping: Atraer el cursor hacia los objetivos cargados
+            snap_radius: Distancia (px) a la que un objetivo atrae el cursor
+            snap_strength: Intensidad del magnetismo dentro del objetivo (0-1)
+            profiler: Perfilador por etapas compartido con el loop principal
         """
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.gain = gain
         self.logger = logger
+        self.profiler = profiler or FrameProfiler(capacity=1)
 
         # Componentes
-        self.face_detector = FaceDetector(logger=logger)
-        self.calibration = Calibration(screen_width, screen_height, logger=logger)
+        self.face_detector = FaceDetector(profiler=self.profiler, logger=logger)
+        self.calibration = Calibration(screen_width, screen_height,
+                                       min_feature_std=HeadPoseEstimator.FEATURE_MIN_STD,
+                                       logger=logger)
+        self.head_pose_compensation = head_pose_compensation
+        self.head_pose = HeadPoseEstimator(logger=logger)
 
-        # Filtros
-        self.filter_x = OneEuro(min_cutoff=filter_min_cutoff, beta=filter_beta)
-        self.filter_y = OneEuro(min_cutoff=filter_min_cutoff, beta=filter_beta)
+        # Filtros: x, y con filtros escalares; los landmarks con el banco vectorizado
+        self.filter_type = filter_type
+        self.gaze_filter = create_gaze_filter(
+            filter_type, min_cutoff=filter_min_cutoff, beta=filter_beta,
+            process_noise=process_noise, measurement_noise=measurement_noise
+        )
+        self.predictive_filter = hasattr(self.gaze_filter, 'latency')
+        self.landmark_filter: Optional[OneEuroBank] = None
+        if smooth_landmarks:
+            self.landmark_filter = OneEuroBank(min_cutoff=filter_min_cutoff, beta=filter_beta)
         self.deadzone_filter = DeadzoneFilter(threshold=deadzone)
 
+        # Clasificación fijación/sacada/parpadeo para adaptar el suavizado
+        self.event_classifier = EyeEventClassifier(
+            velocity_threshold=saccade_velocity_threshold,
+            dispersion_threshold=fixation_dispersion_threshold,
+            logger=logger
+        )
+        self.fixation_smoothing = fixation_smoothing
+        self.saccade_smoothing = saccade_smoothing
+        self.blink_threshold = blink_threshold
+
+        # Ojo abierto/cerrado con umbral adaptado al usuario e histéresis
+        self.ear_model = AdaptiveEarThresholds(
+            base_threshold=wink_threshold, hysteresis=ear_hysteresis,
+            enabled=adaptive_ear, logger=logger
+        )
+        self.ear_classifier: Optional[EarSequenceClassifier] = None
+        if ear_classifier:
+            self.ear_classifier = EarSequenceClassifier(
+                window=ear_classifier_window, model_path=ear_classifier_model, logger=logger
+            )
+
+        # Magnetismo hacia objetivos de la interfaz (sin objetivos no hace nada)
+        self.target_snapper = TargetSnapper(
+            radius=snap_radius, strength=snap_strength, enabled=target_snapping, logger=logger
+        )
+
+        # Latencia del pipeline (captura -> cursor) para compensar con predicción
+        self.prediction_extra_latency = prediction_extra_latency
+        self.measure_latency = pipeline_latency is None
+        self.pipeline_latency = 0.0 if pipeline_latency is None else pipeline_latency
+        self.latency_smooth = 0.9
+
         # Estado
         self.last_gaze_position: Optional[Tuple[float, float]] = None
+        self.last_screen_position: Optional[Tuple[int, int]] = None
+        self.last_gaze_event: Optional[str] = None
 
-    def process_frame(self, frame) -> Optional[Tuple[int, int]]:
+        # Grabación opcional de muestras crudas para autoajuste offline
+        self.trace_recorder: Optional[GazeTraceRecorder] = None
+
+    def process_frame(self, frame, timestamp: Optional[float] = None,
+                      rgb=None) -> Optional[Tuple[int, int]]:
         """
         Procesa un frame y retorna la posición del cursor
 
         Args:
             frame: Frame BGR de la cámara
+            timestamp: Instante de captura del frame (time.time()); permite medir
+                la latencia del pipeline
+            rgb: Frame RGB ya preparado por FramePreprocessor (opcional)
 
         Returns:
             Tupla (x, y) de coordenadas de pantalla o None
         """
         # Detectar rostro
-        results = self.face_detector.detect(frame)
+        results = self.face_detector.detect(frame, rgb)
         if not results:
             return None
 
-        # Obtener posición de iris
-        iris_pos = self.face_detector.get_iris_position(results)
-        if not iris_pos:
-            return None
+        # Con calibración de pose de cabeza, mapear características directamente
+        head_pose_mapped = self._uses_head_pose_calibration()
+        if head_pose_mapped:
+            h, w = frame.shape[:2]
+            t = self.profiler.start()
+            features = self.head_pose.get_gaze_features(results, w, h)
+            if not features:
+                # La estimación de pose se hizo: contarla aunque no haya mirada
+                self.profiler.stop('mapping', t)
+                return None
+            cx, cy = self.calibration.map_features_to_screen(features)
+            self.profiler.stop('mapping', t)
+        else:
+            # Obtener posición de iris
+            iris_pos = self.face_detector.get_iris_position(results)
+            if not iris_pos:
+                return None
+            cx, cy = iris_pos
+
+        now = timestamp if timestamp is not None else time.time()
 
-        cx, cy = iris_pos
-        now = time.time()
+        if self.trace_recorder is not None:
+            self.trace_recorder.add(now, cx, cy)
 
-        # Aplicar zona muerta
-        cx, cy = self.deadzone_filter.filter(cx, cy)
+        # Clasificar la muestra en espacio normalizado de pantalla
+        t = self.profiler.start()
+        ear_values = self.face_detector.get_eye_aspect_ratios(results)
+        eyes_closed = bool(ear_values) and max(ear_values) < self.blink_threshold
+        scale = 1.0 if head_pose_mapped else self.gain
+        event = self.event_classifier.classify(cx * scale, cy * scale, now, eyes_closed)
+        self.last_gaze_event = event
+
+        if event == EyeEventClassifier.BLINK:
+            # El iris no es fiable durante el parpadeo: mantener el cursor
+            self.profiler.stop('filtering', t)
+            return self.last_screen_position
+
+        if event == EyeEventClassifier.FIXATION:
+            self.gaze_filter.set_smoothing(self.fixation_smoothing)
+        else:
+            self.gaze_filter.set_smoothing(self.saccade_smoothing)
+
+        if self.predictive_filter:
+            # Predecir hasta el instante en que el cursor llega a pantalla. La zona
+            # muerta va después para no falsear la velocidad estimada
+            self.gaze_filter.latency = self.pipeline_latency + self.prediction_extra_latency
+            fx, fy = self.gaze_filter.filter((cx, cy), now)
+            fx, fy = self.deadzone_filter.filter(fx, fy)
+        else:
+            # Aplicar zona muerta
+            cx, cy = self.deadzone_filter.filter(cx, cy)
 
-        # Aplicar filtro OneEuro
-        fx = self.filter_x.filter(cx, now)
-        fy = self.filter_y.filter(cy, now)
+            # Aplicar filtro OneEuro
+            fx, fy = self.gaze_filter.filter((cx, cy), now)
+        self.profiler.stop('filtering', t)
 
-        # Aplicar ganancia y limitar
-        gx = float(np.clip(fx * self.gain, 0.0, 1.0))
-        gy = float(np.clip(fy * self.gain, 0.0, 1.0))
+        t = self.profiler.start()
+        if head_pose_mapped:
+            # La calibración ya produce coordenadas de pantalla normalizadas; la
+            # ganancia no se aplica (ver set_gain)
+            gx = float(np.clip(fx, 0.0, 1.0))
+            gy = float(np.clip(fy, 0.0, 1.0))
+            screen_x = min(int(gx * self.screen_width), self.screen_width - 1)
+            screen_y = min(int(gy * self.screen_height), self.screen_height - 1)
+        else:
+            # Aplicar ganancia y limitar
+            gx = float(np.clip(fx * self.gain, 0.0, 1.0))
+            gy = float(np.clip(fy * self.gain, 0.0, 1.0))
 
-        # Mapear a coordenadas de pantalla
-        screen_x, screen_y = self.calibration.map_to_screen(gx, gy)
+            # Mapear a coordenadas de pantalla
+            screen_x, screen_y = self.calibration.map_to_screen(gx, gy)
+
+        if len(self.target_snapper.index):
+            screen_x, screen_y = self.target_snapper.update(screen_x, screen_y, event)
+            screen_x = min(max(screen_x, 0), self.screen_width - 1)
+            screen_y = min(max(screen_y, 0), self.screen_height - 1)
+        self.profiler.stop('mapping', t)
 
         self.last_gaze_position = (gx, gy)
+        self.last_screen_position = (screen_x, screen_y)
+
+        if timestamp is not None and self.measure_latency:
+            latency = max(0.0, time.time() - timestamp)
+            self.pipeline_latency = (self.latency_smooth * self.pipeline_latency +
+                                     (1 - self.latency_smooth) * latency)
+
         return screen_x, screen_y
 
-    def get_raw_gaze_position(self, frame) -> Optional[Tuple[float, float]]:
+    def get_raw_gaze_position(self, frame, rgb=None) -> Optional[Tuple[float, float]]:
         """
         Obtiene la posición de mirada sin filtrar
 
         Returns:
             Tupla (cx, cy) normalizada o None
         """
-        results = self.face_detector.detect(frame)
+        results = self.face_detector.detect(frame, rgb)
         if not results:
             return None
 
         return self.face_detector.get_iris_position(results)
 
-    def detect_gestures(self, frame) -> dict:
+    def get_calibration_features(self, frame, rgb=None) -> Optional[Tuple[float, ...]]:
+        """
+        Obtiene las características de mirada que se usan para calibrar
+
+        Con compensación de pose de cabeza son (offset_x, offset_y, yaw, pitch),
+        en caso contrario la posición 2D del iris
+
+        Returns:
+            Tupla de características o None
+        """
+        if not self.head_pose_compensation:
+            return self.get_raw_gaze_position(frame, rgb)
+
+        results = self.face_detector.detect(frame, rgb)
+        if not results:
+            return None
+
+        h, w = frame.shape[:2]
+        return self.head_pose.get_gaze_features(results, w, h)
+
+    def _uses_head_pose_calibration(self) -> bool:
+        """Indica si la calibración activa usa características de pose de cabeza"""
+        return (self.head_pose_compensation and
+                self.calibration.feature_dim == HeadPoseEstimator.FEATURE_DIM)
+
+    def detect_gestures(self, frame, rgb=None, timestamp: Optional[float] = None) -> dict:
         """
         Detecta gestos (guiños) en el frame
 
+        Args:
+            frame: Frame BGR
+            rgb: Vista RGB del frame ya convertida (None = convertir aquí)
+            timestamp: Instante del frame en segundos (None = time.monotonic())
+
         Returns:
             Diccionario con información de gestos
         """
-        results = self.face_detector.detect(frame)
+        results = self.face_detector.detect(frame, rgb)
         if not results:
             return {'left_wink': False, 'right_wink': False}
 
-        ear_values = self.face_detector.get_eye_aspect_ratios(results)
-        if not ear_values:
-            return {'left_wink': False, 'right_wink': False}
+        now = time.monotonic() if timestamp is None else timestamp
+
+        if self.landmark_filter is not None:
+            # Gestos sobre landmarks suavizados (478 canales en una llamada)
+            points = self.face_detector.get_landmark_array(results)
+            if points is None:
+                return {'left_wink': False, 'right_wink': False}
+            points = self.landmark_filter.filter(points, now)
+            ear_values = self.face_detector.get_eye_aspect_ratios_from_array(points)
+        else:
+            ear_values = self.face_detector.get_eye_aspect_ratios(results)
+            if not ear_values:
+                return {'left_wink': False, 'right_wink': False}
 
         ear_left, ear_right = ear_values
+        left_closed, right_closed = self.ear_model.update(ear_left, ear_right)
 
-        # Umbrales para detectar guiños
-        WINK_THRESHOLD = 0.20
+        eye_state = None
+        if self.ear_classifier is not None:
+            # Guiño voluntario / parpadeo / entrecerrado a partir de la serie reciente
+            closure_left, closure_right = self.ear_model.closures(ear_left, ear_right)
+            eye_state = self.ear_classifier.update(closure_left, closure_right, now)
+            left_closed, right_closed = self.ear_classifier.closed_flags(eye_state)
 
         return {
-            'left_wink': ear_left < WINK_THRESHOLD and ear_right >= WINK_THRESHOLD,
-            'right_wink': ear_right < WINK_THRESHOLD and ear_left >= WINK_THRESHOLD,
+            'left_wink': left_closed and not right_closed,
+            'right_wink': right_closed and not left_closed,
+            'left_closed': left_closed,
+            'right_closed': right_closed,
+            'eye_state': eye_state,
             'ear_left': ear_left,
             'ear_right': ear_right
         }
 
-    def set_gain(self, gain: float):
-        """Ajusta la ganancia/sensibilidad"""
+    @property
+    def gain_applies(self) -> bool:
+        """
+        Indica si la ganancia afecta al cursor: con calibración de pose de
+        cabeza el mapeo a pantalla lo fija la calibración y la ganancia no se usa
+        """
+        return not self._uses_head_pose_calibration()
+
+    def set_gain(self, gain: float) -> bool:
+        """
+        Ajusta la ganancia/sensibilidad
+
+        Returns:
+            True si la ganancia se aplica; False si se guarda pero la
+            calibración de pose de cabeza activa la ignora
+        """
         self.gain = max(0.5, min(2.5, gain))
+        if not self.gain_applies:
+            if self.logger:
+                self.logger.warning(
+                    f"Ganancia {self.gain:.2f} guardada, pero no se aplica con la calibración "
+                    f"de pose de cabeza: recalibra (c) o resetea la calibración (r)"
+                )
+            return False
         if self.logger:
             self.logger.info(f"Ganancia ajustada a {self.gain:.2f}")
+        return True
 
     def set_deadzone(self, deadzone: float):
         """Ajusta el umbral de zona muerta"""
@@ -133,11 +369,68 @@ class GazeTracker:
         if self.logger:
             self.logger.info(f"Zona muerta ajustada a {deadzone:.3f}")
 
+    @property
+    def filter_params_apply(self) -> bool:
+        """
+        Indica si min_cutoff/beta afectan al filtro de mirada: los filtros de
+        Kalman (kalman_cv, kalman_ca, imm) no los usan
+        """
+        return isinstance(self.gaze_filter, OneEuroXY)
+
+    def set_filter_params(self, min_cutoff: float, beta: float) -> bool:
+        """
+        Ajusta los parámetros del filtro OneEuro
+
+        Returns:
+            True si se aplican al filtro de mirada; False si el filtro activo
+            los ignora (solo se ajusta el suavizado de landmarks, si existe)
+        """
+        if self.landmark_filter is not None:
+            self.landmark_filter.min_cutoff = min_cutoff
+            self.landmark_filter.beta = beta
+        if not self.filter_params_apply:
+            if self.logger:
+                self.logger.warning(
+                    f"min_cutoff/beta no se aplican al filtro de mirada "
+                    f"'{self.filter_type}': usa filter_type='one_euro'"
+                )
+            return False
+        self.gaze_filter.min_cutoff = min_cutoff
+        self.gaze_filter.beta = beta
+        if self.logger:
+            self.logger.info(f"Filtro ajustado: min_cutoff={min_cutoff:.2f}, beta={beta:.3f}")
+        return True
+
+    def start_trace_recording(self):
+        """Empieza a grabar las muestras crudas de mirada"""
+        if self.trace_recorder is None:
+            self.trace_recorder = GazeTraceRecorder()
+
+    def stop_trace_recording(self, user_id: Optional[int] = None):
+        """
+        Detiene la grabación y guarda la traza
+
+        Returns:
+            Ruta del archivo guardado o None
+        """
+        if self.trace_recorder is None:
+            return None
+
+        space = "screen" if self._uses_head_pose_calibration() else "iris"
+        path = self.trace_recorder.save(user_id=user_id, space=space)
+        self.trace_recorder = None
+        if path and self.logger:
+            self.logger.info(f"Traza de mirada guardada en {path}")
+        return path
+
     def reset_filters(self):
         """Resetea todos los filtros"""
-        self.filter_x.reset()
-        self.filter_y.reset()
+        self.gaze_filter.reset()
+        if self.landmark_filter is not None:
+            self.landmark_filter.reset()
         self.deadzone_filter.reset()
+        self.head_pose.reset()
+        self.event_classifier.reset()
         if self.logger:
             self.logger.info("Filtros reseteados")
 
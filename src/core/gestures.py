@@ -0,0 +1,317 @@
+"""Motor de gestos: máquinas de estado declarativas con umbrales en segundos"""
+import copy
+import time
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+
+# Tabla por defecto. Equivale a los contadores de frames anteriores medidos a
+# 30 FPS (2 frames ≈ 0.066 s, 15 frames = 0.5 s, 10 frames ≈ 0.33 s, ...)
+DEFAULT_GESTURE_TABLE: List[dict] = [
+    # Guiño izquierdo corto = click
+    {'name': 'left_click', 'type': 'wink', 'eye': 'left',
+     'min_duration': 0.066, 'max_duration': 0.5, 'action': 'click'},
+    # Ojo izquierdo cerrado sostenido = click derecho
+    {'name': 'right_click', 'type': 'hold', 'eye': 'left',
+     'hold_duration': 0.5, 'action': 'right_click'},
+    # Dos guiños izquierdos dentro de la ventana = página adelante
+    {'name': 'page_forward', 'type': 'double_wink', 'eye': 'left',
+     'min_duration': 0.066, 'max_duration': 0.5, 'window': 0.60, 'action': 'page_forward'},
+    # Guiño derecho corto = página atrás
+    {'name': 'page_back', 'type': 'wink', 'eye': 'right',
+     'min_duration': 0.066, 'max_duration': 0.333, 'action': 'page_back'},
+    # Ojo derecho cerrado + mirada horizontal = cambio de pestaña
+    {'name': 'tab_switch', 'type': 'drag', 'eye': 'right', 'arm_duration': 0.167,
+     'threshold': 0.15, 'action_positive': 'tab_next', 'action_negative': 'tab_prev'}
+]
+
+
+def default_gesture_table(wink_min_duration: Optional[float] = None,
+                          double_wink_window: Optional[float] = None) -> List[dict]:
+    """
+    Copia de la tabla por defecto con los parámetros globales aplicados
+
+    Args:
+        wink_min_duration: Duración mínima de un guiño (s)
+        double_wink_window: Ventana del doble guiño (s)
+
+    Returns:
+        Lista de especificaciones de gestos
+    """
+    table = copy.deepcopy(DEFAULT_GESTURE_TABLE)
+    for spec in table:
+        if wink_min_duration is not None and 'min_duration' in spec:
+            spec['min_duration'] = wink_min_duration
+        if double_wink_window is not None and spec['type'] == 'double_wink':
+            spec['window'] = double_wink_window
+    return table
+
+
+class GestureFeatures:
+    """Vector de características de un frame, compartido por todos los gestos"""
+
+    __slots__ = ('t', 'ear_left', 'ear_right', 'gaze_x')
+
+    def __init__(self):
+        self.t = 0.0
+        self.ear_left = 1.0
+        self.ear_right = 1.0
+        self.gaze_x: Optional[float] = None
+
+
+class EyeState:
+    """
+    Estado de cierre de un ojo (cerrado solo este ojo, con el otro abierto)
+    con flancos y duración medidos en tiempo, no en frames
+    """
+
+    __slots__ = ('closed', 'since', 'just_closed', 'just_opened', 'duration')
+
+    def __init__(self):
+        self.closed = False
+        self.since = 0.0
+        self.just_closed = False
+        self.just_opened = False
+        self.duration = 0.0
+
+    def update(self, closed: bool, t: float):
+        self.just_closed = closed and not self.closed
+        self.just_opened = self.closed and not closed
+        if self.just_closed:
+            self.since = t
+        if self.just_opened:
+            # Duración del cierre recién terminado
+            self.duration = t - self.since
+        self.closed = closed
+
+    def closed_for(self, t: float) -> float:
+        """Segundos que lleva cerrado (0 si está abierto)"""
+        return t - self.since if self.closed else 0.0
+
+
+class Gesture:
+    """
+    Máquina de estado de un gesto. Cada frame recibe el estado ya calculado
+    de su ojo y las características compartidas, y retorna la acción
+    disparada (o None)
+    """
+
+    def __init__(self, spec: dict):
+        self.name = spec.get('name', spec['type'])
+        self.eye = spec['eye']
+        if self.eye not in ('left', 'right'):
+            raise ValueError(f"Gesto '{self.name}': ojo inválido '{self.eye}'")
+        self.spec = spec
+
+    def update(self, eye: EyeState, features: GestureFeatures) -> Optional[str]:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+
+class WinkGesture(Gesture):
+    """Cierre de un ojo con duración en [min_duration, max_duration)"""
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.min_duration = float(spec.get('min_duration', 0.066))
+        self.max_duration = float(spec.get('max_duration', 0.5))
+        self.action = spec['action']
+
+    def update(self, eye: EyeState, features: GestureFeatures) -> Optional[str]:
+        if eye.just_opened and self.min_duration <= eye.duration < self.max_duration:
+            return self.action
+        return None
+
+
+class HoldGesture(Gesture):
+    """Ojo cerrado al menos hold_duration; dispara una vez por cierre"""
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.hold_duration = float(spec.get('hold_duration', 0.5))
+        self.action = spec['action']
+        self.fired = False
+
+    def update(self, eye: EyeState, features: GestureFeatures) -> Optional[str]:
+        if not eye.closed:
+            self.fired = False
+            return None
+        if not self.fired and eye.closed_for(features.t) >= self.hold_duration:
+            self.fired = True
+            return self.action
+        return None
+
+    def reset(self):
+        self.fired = False
+
+
+class DoubleWinkGesture(WinkGesture):
+    """Dos guiños válidos del mismo ojo separados como mucho por `window` segundos"""
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.window = float(spec.get('window', 0.60))
+        self.winks: deque = deque()
+
+    def update(self, eye: EyeState, features: GestureFeatures) -> Optional[str]:
+        if super().update(eye, features) is None:
+            return None
+
+        now = features.t
+        self.winks.append(now)
+        while self.winks and now - self.winks[0] > self.window:
+            self.winks.popleft()
+        if len(self.winks) >= 2:
+            self.winks.clear()
+            return self.action
+        return None
+
+    def reset(self):
+        self.winks.clear()
+
+
+class DragGesture(Gesture):
+    """
+    Ojo cerrado + desplazamiento horizontal de la mirada. Tras arm_duration
+    segundos cerrado, cada desplazamiento mayor que `threshold` desde el
+    último punto de referencia dispara la acción de su sentido
+    """
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.arm_duration = float(spec.get('arm_duration', 0.167))
+        self.threshold = float(spec.get('threshold', 0.15))
+        self.action_positive = spec.get('action_positive')
+        self.action_negative = spec.get('action_negative')
+        self.start_x: Optional[float] = None
+
+    def update(self, eye: EyeState, features: GestureFeatures) -> Optional[str]:
+        if not eye.closed:
+            self.start_x = None
+            return None
+
+        gaze_x = features.gaze_x
+        if gaze_x is None:
+            return None
+        if self.start_x is None:
+            # Referencia: primera posición conocida con el ojo cerrado
+            self.start_x = gaze_x
+            return None
+        if eye.closed_for(features.t) <= self.arm_duration:
+            return None
+
+        movement = gaze_x - self.start_x
+        if movement > self.threshold:
+            self.start_x = gaze_x
+            return self.action_positive
+        if movement < -self.threshold:
+            self.start_x = gaze_x
+            return self.action_negative
+        return None
+
+    def reset(self):
+        self.start_x = None
+
+
+# Tipos de gesto disponibles en la tabla
+GESTURE_TYPES: Dict[str, type] = {
+    'wink': WinkGesture,
+    'hold': HoldGesture,
+    'double_wink': DoubleWinkGesture,
+    'drag': DragGesture
+}
+
+
+class GestureEngine:
+    """
+    Evalúa una tabla declarativa de gestos en una sola pasada por frame.
+
+    Los umbrales son duraciones en segundos medidas con timestamps monótonos,
+    así que el comportamiento no depende de los FPS de la cámara
+    """
+
+    def __init__(self, table: Optional[List[dict]] = None, wink_threshold: float = 0.20,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            table: Lista de especificaciones de gestos (None = tabla por defecto)
+            wink_threshold: Umbral EAR por debajo del cual un ojo está cerrado
+        """
+        self.wink_threshold = wink_threshold
+        self.logger = logger
+
+        self.features = GestureFeatures()
+        self.eyes = {'left': EyeState(), 'right': EyeState()}
+        self.gestures: List[Gesture] = []
+        self.set_table(table if table is not None else default_gesture_table())
+
+    def set_table(self, table: List[dict]):
+        """
+        Reemplaza la tabla de gestos
+
+        Args:
+            table: Lista de especificaciones {'type', 'eye', 'action', ...}
+
+        Raises:
+            ValueError: Si alguna especificación es inválida
+        """
+        gestures = []
+        for spec in table:
+            gesture_type = GESTURE_TYPES.get(spec.get('type'))
+            if gesture_type is None:
+                raise ValueError(f"Tipo de gesto desconocido: {spec.get('type')}")
+            try:
+                gestures.append(gesture_type(spec))
+            except KeyError as e:
+                raise ValueError(f"Gesto '{spec.get('name', spec['type'])}' sin campo {e}")
+        self.gestures = gestures
+        self.table = table
+        if self.logger:
+            self.logger.debug(f"Tabla de gestos cargada: {[g.name for g in gestures]}")
+
+    def reset(self):
+        """Olvida el estado en curso (p. ej. tras perder el rostro)"""
+        self.eyes = {'left': EyeState(), 'right': EyeState()}
+        for gesture in self.gestures:
+            gesture.reset()
+
+    def update(self, ear_left: float, ear_right: float, gaze_x: Optional[float] = None,
+               timestamp: Optional[float] = None, left_closed: Optional[bool] = None,
+               right_closed: Optional[bool] = None) -> List[str]:
+        """
+        Procesa un frame
+
+        Args:
+            ear_left: EAR del ojo izquierdo
+            ear_right: EAR del ojo derecho
+            gaze_x: Posición x normalizada de la mirada (0-1)
+            timestamp: Instante del frame en segundos (None = time.monotonic())
+            left_closed: Ojo izquierdo cerrado según el detector (None = comparar
+                ear_left con wink_threshold)
+            right_closed: Ídem para el ojo derecho
+
+        Returns:
+            Acciones disparadas en este frame, en orden de la tabla
+        """
+        features = self.features
+        features.t = time.monotonic() if timestamp is None else timestamp
+        features.ear_left = ear_left
+        features.ear_right = ear_right
+        features.gaze_x = gaze_x
+
+        if left_closed is None:
+            left_closed = ear_left < self.wink_threshold
+        if right_closed is None:
+            right_closed = ear_right < self.wink_threshold
+        self.eyes['left'].update(left_closed and not right_closed, features.t)
+        self.eyes['right'].update(right_closed and not left_closed, features.t)
+
+        actions = []
+        for gesture in self.gestures:
+            action = gesture.update(self.eyes[gesture.eye], features)
+            if action:
+                actions.append(action)
+        return actions
@@ -0,0 +1,190 @@
+"""Estimación de pose de cabeza y características de mirada compensadas"""
+import cv2 as cv
+import numpy as np
+from typing import Optional, Tuple
+import logging
+
+
+class HeadPoseEstimator:
+    """
+    Resuelve la pose de la cabeza con solvePnP sobre landmarks estables de
+    Face Mesh y expresa la posición de los iris en coordenadas fijas a la cabeza
+    """
+
+    # Landmarks estables de Face Mesh usados para solvePnP
+    POSE_LANDMARKS = [1, 152, 33, 263, 61, 291]
+
+    # Modelo 3D canónico del rostro (mm, convención de cámara OpenCV:
+    # x derecha, y abajo, z alejándose de la cámara). Mismo orden que POSE_LANDMARKS
+    MODEL_POINTS = np.array([
+        (0.0, 0.0, 0.0),          # Punta de la nariz
+        (0.0, 330.0, 65.0),       # Mentón
+        (-225.0, -170.0, 135.0),  # Esquina externa ojo izquierdo (imagen)
+        (225.0, -170.0, 135.0),   # Esquina externa ojo derecho (imagen)
+        (-150.0, 150.0, 125.0),   # Comisura izquierda
+        (150.0, 150.0, 125.0)     # Comisura derecha
+    ], dtype=np.float64)
+
+    # Esquinas (externa, interna) e iris de cada ojo
+    LEFT_EYE_CORNERS = (33, 133)
+    RIGHT_EYE_CORNERS = (263, 362)
+    LEFT_IRIS_CENTER = 468
+    RIGHT_IRIS_CENTER = 473
+
+    # Características: (offset_x, offset_y, yaw, pitch)
+    FEATURE_DIM = 4
+    # Variación mínima de cada característica durante la calibración para
+    # ajustarla: la pose (radianes) debe variar al menos ~2° o se ignora
+    FEATURE_MIN_STD = (1e-3, 1e-3, 0.035, 0.035)
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger
+
+        self._camera_matrix: Optional[np.ndarray] = None
+        self._frame_size: Optional[Tuple[int, int]] = None
+        self._dist_coeffs = np.zeros((4, 1))
+        self._rvec: Optional[np.ndarray] = None
+        self._tvec: Optional[np.ndarray] = None
+
+        self.last_rotation: Optional[np.ndarray] = None
+        self.last_angles: Optional[Tuple[float, float, float]] = None
+
+    def _get_camera_matrix(self, frame_w: int, frame_h: int) -> np.ndarray:
+        """Matriz de cámara aproximada (focal = ancho de imagen), cacheada por resolución"""
+        if self._frame_size != (frame_w, frame_h):
+            focal = float(frame_w)
+            self._camera_matrix = np.array([
+                [focal, 0.0, frame_w / 2.0],
+                [0.0, focal, frame_h / 2.0],
+                [0.0, 0.0, 1.0]
+            ], dtype=np.float64)
+            self._frame_size = (frame_w, frame_h)
+            self._rvec = None
+            self._tvec = None
+        return self._camera_matrix
+
+    def estimate_pose(self, landmarks, frame_w: int, frame_h: int) -> Optional[np.ndarray]:
+        """
+        Resuelve la rotación de la cabeza respecto a la cámara
+
+        Args:
+            landmarks: Landmarks de MediaPipe
+            frame_w: Ancho del frame en píxeles
+            frame_h: Alto del frame en píxeles
+
+        Returns:
+            Matriz de rotación 3x3 (modelo -> cámara) o None
+        """
+        camera_matrix = self._get_camera_matrix(frame_w, frame_h)
+        image_points = np.array(
+            [(landmarks[i].x * frame_w, landmarks[i].y * frame_h) for i in self.POSE_LANDMARKS],
+            dtype=np.float64
+        )
+
+        try:
+            # Reutilizar la pose anterior como estimación inicial
+            use_guess = self._rvec is not None
+            ok, rvec, tvec = cv.solvePnP(
+                self.MODEL_POINTS, image_points, camera_matrix, self._dist_coeffs,
+                rvec=self._rvec, tvec=self._tvec,
+                useExtrinsicGuess=use_guess, flags=cv.SOLVEPNP_ITERATIVE
+            )
+        except cv.error as e:
+            if self.logger:
+                self.logger.error(f"Error en solvePnP: {e}")
+            return None
+
+        if not ok:
+            self._rvec = None
+            self._tvec = None
+            return None
+
+        self._rvec, self._tvec = rvec, tvec
+        rotation, _ = cv.Rodrigues(rvec)
+        self.last_rotation = rotation
+        self.last_angles = self.rotation_to_euler(rotation)
+        return rotation
+
+    @staticmethod
+    def rotation_to_euler(rotation: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Convierte una matriz de rotación en ángulos (yaw, pitch, roll) en radianes
+        """
+        sy = np.hypot(rotation[2, 1], rotation[2, 2])
+        pitch = float(np.arctan2(rotation[2, 1], rotation[2, 2]))
+        yaw = float(np.arctan2(-rotation[2, 0], sy))
+        roll = float(np.arctan2(rotation[1, 0], rotation[0, 0]))
+        return yaw, pitch, roll
+
+    def _eye_offset(self, points: dict, rotation_t: np.ndarray,
+                    corners: Tuple[int, int], iris_idx: int) -> Tuple[float, float]:
+        """
+        Offset del iris respecto al centro entre las esquinas del ojo, expresado
+        en coordenadas de la cabeza y normalizado por el ancho del ojo
+        """
+        outer = points[corners[0]]
+        inner = points[corners[1]]
+        center = (outer + inner) / 2.0
+
+        # Llevar los vectores al sistema de referencia de la cabeza
+        axis = rotation_t @ (inner - outer)
+        iris = rotation_t @ (points[iris_idx] - center)
+
+        width = np.hypot(axis[0], axis[1])
+        if width < 1e-6:
+            return 0.0, 0.0
+
+        # Eje x del ojo siempre hacia la derecha de la imagen
+        ux, uy = axis[0] / width, axis[1] / width
+        if ux < 0:
+            ux, uy = -ux, -uy
+
+        offset_x = (iris[0] * ux + iris[1] * uy) / width
+        offset_y = (-iris[0] * uy + iris[1] * ux) / width
+        return float(offset_x), float(offset_y)
+
+    def get_gaze_features(self, results, frame_w: int,
+                          frame_h: int) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Calcula las características de mirada compensadas por pose de cabeza
+
+        Args:
+            results: Resultado de MediaPipe
+            frame_w: Ancho del frame en píxeles
+            frame_h: Alto del frame en píxeles
+
+        Returns:
+            Tupla (offset_x, offset_y, yaw, pitch) o None
+        """
+        if not results or not results.multi_face_landmarks:
+            return None
+
+        landmarks = results.multi_face_landmarks[0].landmark
+        if len(landmarks) <= max(self.LEFT_IRIS_CENTER, self.RIGHT_IRIS_CENTER):
+            return None
+
+        rotation = self.estimate_pose(landmarks, frame_w, frame_h)
+        if rotation is None:
+            return None
+
+        # Solo se necesitan las esquinas y los iris en 3D (z de MediaPipe en escala de x)
+        indices = (self.LEFT_EYE_CORNERS + self.RIGHT_EYE_CORNERS +
+                   (self.LEFT_IRIS_CENTER, self.RIGHT_IRIS_CENTER))
+        points = {
+            i: np.array([landmarks[i].x * frame_w, landmarks[i].y * frame_h, landmarks[i].z * frame_w])
+            for i in indices
+        }
+
+        rotation_t = rotation.T
+        lx, ly = self._eye_offset(points, rotation_t, self.LEFT_EYE_CORNERS, self.LEFT_IRIS_CENTER)
+        rx, ry = self._eye_offset(points, rotation_t, self.RIGHT_EYE_CORNERS, self.RIGHT_IRIS_CENTER)
+
+        yaw, pitch, _roll = self.last_angles
+        return (lx + rx) / 2.0, (ly + ry) / 2.0, yaw, pitch
+
+    def reset(self):
+        """Descarta la pose previa usada como estimación inicial"""
+        self._rvec = None
+        self._tvec = None
+        self.last_rotation = None
+        self.last_angles = None
@@ -0,0 +1,239 @@
+"""Backends de entrada del sistema operativo (mouse y teclado)"""
+import os
+import time
+import logging
+import platform
+from typing import List, Optional, Tuple
+
+
+class InputBackend:
+    """
+    Interfaz común de los backends. Las implementaciones pueden acumular los
+    eventos de un frame y enviarlos juntos en flush(), que el loop principal
+    llama una vez por frame
+    """
+
+    name = 'base'
+
+    def move_to(self, x: int, y: int):
+        raise NotImplementedError
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = 'left'):
+        raise NotImplementedError
+
+    def scroll(self, amount: int):
+        raise NotImplementedError
+
+    def hotkey(self, *keys: str):
+        raise NotImplementedError
+
+    def size(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def flush(self):
+        """Envía los eventos pendientes (no-op si el backend no agrupa)"""
+
+    def close(self):
+        """Libera los recursos del backend"""
+
+
+class PyAutoGuiBackend(InputBackend):
+    """Backend portable basado en pyautogui (Windows, macOS y Linux)"""
+
+    name = 'pyautogui'
+
+    def __init__(self, failsafe: bool = True):
+        """
+        Args:
+            failsafe: Abortar si el cursor está en una esquina (pyautogui.FAILSAFE)
+        """
+        import pyautogui
+        self._gui = pyautogui
+        pyautogui.FAILSAFE = failsafe
+
+    def move_to(self, x: int, y: int):
+        self._gui.moveTo(x, y, _pause=False)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = 'left'):
+        # Sin la pausa de pyautogui (0.1 s) que bloquearía el loop de frames
+        if x is not None and y is not None:
+            self._gui.click(x, y, button=button, _pause=False)
+        else:
+            self._gui.click(button=button, _pause=False)
+
+    def scroll(self, amount: int):
+        self._gui.scroll(amount, _pause=False)
+
+    def hotkey(self, *keys: str):
+        self._gui.hotkey(*keys, _pause=False)
+
+    def size(self) -> Tuple[int, int]:
+        width, height = self._gui.size()
+        return int(width), int(height)
+
+
+class XTestBackend(InputBackend):
+    """
+    Backend de baja latencia para Linux/X11 mediante la extensión XTest
+    (python-xlib). Los eventos se escriben en el buffer de la conexión y se
+    envían todos juntos en flush(), sin un round-trip por llamada
+    """
+
+    name = 'xtest'
+
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    SCROLL_UP, SCROLL_DOWN = 4, 5
+
+    # Nombres de tecla de pyautogui -> keysyms de X11
+    KEYSYMS = {
+        'alt': 'Alt_L', 'ctrl': 'Control_L', 'shift': 'Shift_L', 'command': 'Super_L',
+        'win': 'Super_L', 'tab': 'Tab', 'left': 'Left', 'right': 'Right', 'up': 'Up',
+        'down': 'Down', 'enter': 'Return', 'esc': 'Escape', 'space': 'space'
+    }
+
+    def __init__(self, display_name: Optional[str] = None):
+        """
+        Args:
+            display_name: Display X11 (None = variable DISPLAY)
+
+        Raises:
+            RuntimeError: Si python-xlib no está instalado o no hay display/XTest
+        """
+        try:
+            from Xlib import X, XK, display
+            from Xlib.ext import xtest
+        except ImportError:
+            raise RuntimeError("python-xlib no está instalado (pip install python-xlib)")
+
+        try:
+            self._display = display.Display(display_name)
+        except Exception as e:
+            raise RuntimeError(f"No se pudo abrir el display X11: {e}")
+        if not self._display.has_extension('XTEST'):
+            self._display.close()
+            raise RuntimeError("El servidor X no tiene la extensión XTEST")
+
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        screen = self._display.screen()
+        self._size = (screen.width_in_pixels, screen.height_in_pixels)
+        self._keycodes = {}
+
+    def _fake(self, event_type, detail: int = 0, x: int = 0, y: int = 0):
+        self._xtest.fake_input(self._display, event_type, detail, x=x, y=y)
+
+    def move_to(self, x: int, y: int):
+        self._fake(self._X.MotionNotify, x=int(x), y=int(y))
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = 'left'):
+        if x is not None and y is not None:
+            self.move_to(x, y)
+        detail = self.BUTTONS[button]
+        self._fake(self._X.ButtonPress, detail)
+        self._fake(self._X.ButtonRelease, detail)
+
+    def scroll(self, amount: int):
+        # Igual que pyautogui en X11: una pulsación de rueda por unidad
+        detail = self.SCROLL_UP if amount > 0 else self.SCROLL_DOWN
+        for _ in range(abs(int(amount))):
+            self._fake(self._X.ButtonPress, detail)
+            self._fake(self._X.ButtonRelease, detail)
+
+    def _keycode(self, key: str) -> int:
+        keycode = self._keycodes.get(key)
+        if keycode is None:
+            keysym = self._XK.string_to_keysym(self.KEYSYMS.get(key, key))
+            keycode = self._display.keysym_to_keycode(keysym)
+            if not keycode:
+                raise ValueError(f"Tecla desconocida: '{key}'")
+            self._keycodes[key] = keycode
+        return keycode
+
+    def hotkey(self, *keys: str):
+        keycodes = [self._keycode(key) for key in keys]
+        for keycode in keycodes:
+            self._fake(self._X.KeyPress, keycode)
+        for keycode in reversed(keycodes):
+            self._fake(self._X.KeyRelease, keycode)
+        # Los atajos se envían en el acto (el orden respecto a otros eventos importa)
+        self.flush()
+
+    def size(self) -> Tuple[int, int]:
+        return self._size
+
+    def flush(self):
+        self._display.flush()
+
+    def close(self):
+        self._display.close()
+
+
+class RecordingBackend(InputBackend):
+    """Backend nulo que registra los eventos en memoria (pruebas y reproducción)"""
+
+    name = 'null'
+
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080)):
+        self.screen_size = screen_size
+        self.events: List[tuple] = []
+        self.flushes = 0
+
+    def move_to(self, x: int, y: int):
+        self.events.append((time.monotonic(), 'move', x, y))
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = 'left'):
+        self.events.append((time.monotonic(), 'click', x, y, button))
+
+    def scroll(self, amount: int):
+        self.events.append((time.monotonic(), 'scroll', amount))
+
+    def hotkey(self, *keys: str):
+        self.events.append((time.monotonic(), 'hotkey') + keys)
+
+    def size(self) -> Tuple[int, int]:
+        return self.screen_size
+
+    def flush(self):
+        self.flushes += 1
+
+
+def create_input_backend(name: str = 'auto', failsafe: bool = True,
+                         screen_size: Tuple[int, int] = (1920, 1080),
+                         logger: Optional[logging.Logger] = None) -> InputBackend:
+    """
+    Crea el backend de entrada configurado
+
+    Args:
+        name: 'auto', 'pyautogui', 'xtest' o 'null'. 'auto' usa XTest en
+            Linux/X11 si python-xlib está disponible y pyautogui en otro caso
+        failsafe: FAILSAFE de pyautogui (esquina de la pantalla = abortar)
+        screen_size: Resolución que declara el backend 'null'
+
+    Returns:
+        Instancia del backend
+
+    Raises:
+        ValueError: Si el nombre es desconocido
+        RuntimeError: Si se pide 'xtest' explícitamente y no está disponible
+    """
+    if name == 'auto':
+        if platform.system() == "Linux" and os.environ.get('DISPLAY'):
+            try:
+                backend = XTestBackend()
+            except RuntimeError as e:
+                if logger:
+                    logger.info(f"XTest no disponible ({e}), se usa pyautogui")
+            else:
+                if logger:
+                    logger.info("Backend de entrada: XTest")
+                return backend
+        name = 'pyautogui'
+
+    if name == 'pyautogui':
+        return PyAutoGuiBackend(failsafe=failsafe)
+    if name == 'xtest':
+        return XTestBackend()
+    if name == 'null':
+        return RecordingBackend(screen_size)
+    raise ValueError(f"Backend de entrada desconocido: '{name}'")
@@ -1,56 +1,134 @@
 """Controlador del mouse con gestos"""
-import pyautogui
 import platform
 import time
 import logging
-from collections import deque
-from typing import Optional
+import threading
+from typing import Callable, Dict, List, Optional
+from .gestures import GestureEngine, default_gesture_table
+from .dwell import DwellEngine
+from .scroll import ScrollEngine
+from .input_backend import InputBackend, create_input_backend
+from .actions import ActionRegistry, ActionWorker
 
 
 class MouseController:
     """Controla el mouse y ejecuta acciones basadas en gestos"""
 
-    def __init__(self, wink_threshold: float = 0.20, wink_min_frames: int = 2,
+    # Acciones que puede disparar un gesto de la tabla
+    GESTURE_ACTIONS = ('click', 'right_click', 'page_forward', 'page_back', 'tab_next',
+                       'tab_prev', 'window_next', 'scroll_up', 'scroll_down', 'toggle_dwell')
+
+    def __init__(self, wink_threshold: float = 0.20, wink_min_duration: float = 0.066,
                  double_wink_window: float = 0.60, dwell_time: float = 0.70,
                  scroll_band: float = 0.08, scroll_step: int = 80,
+                 gesture_table: Optional[List[dict]] = None,
+                 dwell_cell_size: float = 0.01, dwell_refractory: float = 1.0,
+                 dwell_snap: bool = True, scroll_speed: float = 1200.0,
+                 scroll_rate: float = 15.0, scroll_dead_time: float = 0.3,
+                 backend: Optional[InputBackend] = None,
+                 actions: Optional[Dict[str, dict]] = None, action_queue_size: int = 8,
                  logger: Optional[logging.Logger] = None):
         """
         Args:
             wink_threshold: Umbral EAR para detectar guiño
-            wink_min_frames: Frames mínimos para confirmar guiño
+            wink_min_duration: Duración mínima de un guiño (segundos)
             double_wink_window: Ventana de tiempo para doble guiño (segundos)
             dwell_time: Tiempo para dwell click (segundos)
             scroll_band: Tamaño de banda para scroll automático (0-1)
-            scroll_step: Pasos de scroll
+            scroll_step: Pasos de scroll de las acciones scroll_up / scroll_down
+            gesture_table: Tabla de gestos (None = tabla por defecto)
+            dwell_cell_size: Celda del hash espacial del dwell (coordenadas normalizadas)
+            dwell_refractory: Segundos sin dwell tras un dwell click
+            dwell_snap: Hacer el dwell click en el centroide de la fijación
+            scroll_speed: Velocidad del scroll automático en el borde (unidades/s)
+            scroll_rate: Eventos de scroll automático por segundo como máximo
+            scroll_dead_time: Segundos en la banda antes de empezar el scroll
+            backend: Backend de entrada del sistema (None = create_input_backend('auto'))
+            actions: Acciones de teclado y macros del usuario (nombre -> especificación)
+            action_queue_size: Acciones pendientes como máximo en el hilo de acciones
         """
-        self.wink_threshold = wink_threshold
-        self.wink_min_frames = wink_min_frames
+        self.wink_min_duration = wink_min_duration
         self.double_wink_window = double_wink_window
-        self.dwell_time = dwell_time
-        self.scroll_band = scroll_band
         self.scroll_step = scroll_step
         self.logger = logger
 
-        # Configurar pyautogui
-        pyautogui.FAILSAFE = True
+        # Backend de entrada del sistema operativo
+        self.backend = backend if backend is not None else create_input_backend(logger=logger)
         self.is_mac = platform.system() == "Darwin"
-
-        # Estado de gestos
-        self.left_wink_frames = 0
-        self.right_wink_frames = 0
-        self.last_left_winks = deque()
-
-        # Nuevos gestos avanzados
-        self.left_closed_frames = 0  # Para click derecho
-        self.right_closed_frames = 0  # Para cambio de pestañas
-        self.right_closed_start_x = None  # Posición inicial cuando se cierra ojo derecho
-        self.tab_switch_threshold = 0.15  # Umbral de movimiento para cambiar pestaña
-        self.right_click_hold_time = 15  # Frames sostenidos para click derecho (~0.5s)
+        # El hilo de acciones y el loop principal comparten el backend
+        self._input_lock = threading.Lock()
+
+        # Acciones de teclado y macros, ejecutadas fuera del loop de frames
+        self.actions = ActionRegistry(self.is_mac, logger=logger)
+        if actions is not None:
+            self.actions.set_actions(actions)
+        self.action_worker = ActionWorker(
+            self.backend, self._input_lock, max_pending=action_queue_size, logger=logger
+        )
+
+        # Gestos: máquinas de estado con umbrales en segundos
+        self.gesture_engine = GestureEngine(
+            default_gesture_table(wink_min_duration, double_wink_window),
+            wink_threshold=wink_threshold, logger=logger
+        )
+        if gesture_table is not None:
+            self.set_gesture_table(gesture_table)
 
         # Dwell click
         self.dwell_enabled = False
-        self.dwell_start_time: Optional[float] = None
-        self.dwell_ref_position: Optional[tuple] = None
+        self.dwell_engine = DwellEngine(
+            dwell_time=dwell_time, cell_size=dwell_cell_size,
+            refractory_period=dwell_refractory, snap_to_centroid=dwell_snap, logger=logger
+        )
+
+        # Scroll automático continuo con eventos agrupados
+        self.scroll_engine = ScrollEngine(
+            band=scroll_band, max_speed=scroll_speed, max_rate=scroll_rate,
+            dead_time=scroll_dead_time, logger=logger
+        )
+
+        # Callbacks opcionales con cada acción ejecutada y su latencia (métricas)
+        self.on_action: Optional[Callable[[str], None]] = None
+        self.on_action_latency: Optional[Callable[[str, float], None]] = None
+        self.action_latency: Dict[str, float] = {}
+
+    @property
+    def wink_threshold(self) -> float:
+        """Umbral EAR para detectar guiño"""
+        return self.gesture_engine.wink_threshold
+
+    @wink_threshold.setter
+    def wink_threshold(self, value: float):
+        self.gesture_engine.wink_threshold = value
+
+    @property
+    def dwell_time(self) -> float:
+        """Tiempo para dwell click (segundos)"""
+        return self.dwell_engine.dwell_time
+
+    @dwell_time.setter
+    def dwell_time(self, value: float):
+        self.dwell_engine.dwell_time = value
+
+    @property
+    def scroll_band(self) -> float:
+        """Tamaño de banda para scroll automático (0-1)"""
+        return self.scroll_engine.band
+
+    @scroll_band.setter
+    def scroll_band(self, value: float):
+        self.scroll_engine.band = value
+
+    def _notify_action(self, action: str):
+        """Notifica una acción ejecutada"""
+        if self.on_action is not None:
+            self.on_action(action)
+
+    def _notify_latency(self, action: str, seconds: float):
+        """Registra la latencia de una acción (desde que se pide hasta que termina)"""
+        self.action_latency[action] = seconds
+        if self.on_action_latency is not None:
+            self.on_action_latency(action, seconds)
 
     def move_to(self, x: int, y: int):
         """
@@ -61,7 +139,8 @@ class MouseController:
             y: Coordenada y
         """
         try:
-            pyautogui.moveTo(x, y, _pause=False)
+            with self._input_lock:
+                self.backend.move_to(x, y)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error moviendo mouse: {e}")
@@ -76,10 +155,11 @@ class MouseController:
             button: Botón del mouse ('left' o 'right')
         """
         try:
-            if x is not None and y is not None:
-                pyautogui.click(x, y, button=button)
-            else:
-                pyautogui.click(button=button)
+            start = time.perf_counter()
+            with self._input_lock:
+                self.backend.click(x, y, button)
+            self._notify_latency(f'click_{button}', time.perf_counter() - start)
+            self._notify_action(f'click_{button}')
 
             if self.logger:
                 self.logger.debug(f"Click {button} en ({x}, {y})")
@@ -101,60 +181,41 @@ class MouseController:
 
     def page_forward(self):
         """Navega hacia adelante en el navegador"""
-        try:
-            key = "command" if self.is_mac else "alt"
-            pyautogui.hotkey(key, "right")
-            if self.logger:
-                self.logger.debug("Página adelante")
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error en página adelante: {e}")
+        self.run_action('page_forward')
 
     def page_back(self):
         """Navega hacia atrás en el navegador"""
-        try:
-            key = "command" if self.is_mac else "alt"
-            pyautogui.hotkey(key, "left")
-            if self.logger:
-                self.logger.debug("Página atrás")
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error en página atrás: {e}")
+        self.run_action('page_back')
 
     def switch_tab_next(self):
         """Cambia a la siguiente pestaña del navegador"""
-        try:
-            key = "command" if self.is_mac else "ctrl"
-            pyautogui.hotkey(key, "tab")
-            if self.logger:
-                self.logger.debug("Cambio a siguiente pestaña")
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error cambiando pestaña: {e}")
+        self.run_action('tab_next')
 
     def switch_tab_prev(self):
         """Cambia a la pestaña anterior del navegador"""
-        try:
-            key = "command" if self.is_mac else "ctrl"
-            pyautogui.hotkey(key, "shift", "tab")
-            if self.logger:
-                self.logger.debug("Cambio a pestaña anterior")
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error cambiando pestaña: {e}")
+        self.run_action('tab_prev')
 
     def switch_window_next(self):
         """Cambia a la siguiente ventana/aplicación"""
-        try:
-            if self.is_mac:
-                pyautogui.hotkey("command", "tab")
-            else:
-                pyautogui.hotkey("alt", "tab")
-            if self.logger:
-                self.logger.debug("Cambio a siguiente ventana")
-        except Exception as e:
+        self.run_action('window_next')
+
+    def run_action(self, name: str):
+        """
+        Ejecuta una acción de teclado o macro del registro en segundo plano
+
+        Args:
+            name: Nombre de la acción (por defecto o definida por el usuario)
+
+        Raises:
+            ValueError: Si la acción no existe
+        """
+        steps = self.actions.get(name)
+        if steps is None:
+            raise ValueError(f"Acción desconocida: {name}")
+        if self.action_worker.submit(name, steps):
+            self._notify_action(name)
             if self.logger:
-                self.logger.error(f"Error cambiando ventana: {e}")
+                self.logger.debug(f"Acción '{name}' en cola")
 
     def scroll(self, amount: int):
         """
@@ -164,97 +225,131 @@ class MouseController:
             amount: Cantidad de scroll (positivo = arriba, negativo = abajo)
         """
         try:
-            pyautogui.scroll(amount)
+            start = time.perf_counter()
+            with self._input_lock:
+                self.backend.scroll(amount)
+            self._notify_latency('scroll', time.perf_counter() - start)
+            self._notify_action('scroll')
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error en scroll: {e}")
 
-    def process_gestures(self, gestures: dict, x: int, y: int, gaze_x: Optional[float] = None):
+    def flush(self):
         """
-        Procesa gestos y ejecuta acciones
+        Envía al sistema los eventos de entrada acumulados en el frame y
+        recoge las latencias de las acciones terminadas en segundo plano
+        """
+        try:
+            with self._input_lock:
+                self.backend.flush()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error enviando eventos de entrada: {e}")
+
+        for action, seconds in self.action_worker.completed():
+            self._notify_latency(action, seconds)
+
+    def set_actions(self, actions: Optional[Dict[str, dict]]):
+        """
+        Reemplaza las acciones de teclado y macros del usuario
 
         Args:
-            gestures: Diccionario con información de gestos
+            actions: Diccionario nombre -> especificación (None = solo las de por defecto)
+
+        Raises:
+            ValueError: Si alguna acción es inválida o falta una que usa la tabla de gestos
+        """
+        required = [spec[key] for spec in self.gesture_engine.table
+                    for key in ('action', 'action_positive', 'action_negative')
+                    if spec.get(key) is not None and spec[key] not in self.GESTURE_ACTIONS]
+        self.actions.set_actions(actions, required)
+
+    def close(self):
+        """Termina las acciones en cola y detiene el hilo de acciones"""
+        self.action_worker.stop()
+
+    def execute_action(self, action: str, x: Optional[int] = None, y: Optional[int] = None):
+        """
+        Ejecuta una acción por nombre (las que puede referenciar la tabla de gestos)
+
+        Args:
+            action: Nombre de la acción (GESTURE_ACTIONS o del registro de acciones)
             x: Posición x actual del cursor
             y: Posición y actual del cursor
-            gaze_x: Posición x normalizada de la mirada (0-1) para detectar movimiento horizontal
         """
-        ear_left = gestures.get('ear_left', 1.0)
-        ear_right = gestures.get('ear_right', 1.0)
+        if action == 'click':
+            self.click(x, y)
+        elif action == 'right_click':
+            self.right_click(x, y)
+            if self.logger:
+                self.logger.info("Click derecho activado (ojo izquierdo sostenido)")
+        elif action == 'page_forward':
+            self.page_forward()
+        elif action == 'page_back':
+            self.page_back()
+        elif action == 'tab_next':
+            self.switch_tab_next()
+            if self.logger:
+                self.logger.info("Cambio a siguiente pestaña (ojo derecho + derecha)")
+        elif action == 'tab_prev':
+            self.switch_tab_prev()
+            if self.logger:
+                self.logger.info("Cambio a pestaña anterior (ojo derecho + izquierda)")
+        elif action == 'window_next':
+            self.switch_window_next()
+        elif action == 'scroll_up':
+            self.scroll(self.scroll_step)
+        elif action == 'scroll_down':
+            self.scroll(-self.scroll_step)
+        elif action == 'toggle_dwell':
+            self.toggle_dwell()
+        elif action in self.actions:
+            self.run_action(action)
+        else:
+            raise ValueError(f"Acción desconocida: {action}")
 
-        # ===== NUEVO: Ojo izquierdo cerrado sostenido = Click derecho =====
-        if ear_left < self.wink_threshold and ear_right >= self.wink_threshold:
-            self.left_closed_frames += 1
+    def set_gesture_table(self, table: Optional[List[dict]]):
+        """
+        Reemplaza la tabla de gestos (p. ej. la guardada para el usuario)
 
-            # Click derecho si se mantiene cerrado suficiente tiempo
-            if self.left_closed_frames == self.right_click_hold_time:
-                self.right_click(x, y)
-                if self.logger:
-                    self.logger.info("Click derecho activado (ojo izquierdo sostenido)")
+        Args:
+            table: Lista de especificaciones de gestos (None = tabla por defecto)
 
-            # Click izquierdo normal para guiños cortos
-            self.left_wink_frames += 1
-        else:
-            # Guiño corto = Click izquierdo
-            if self.wink_min_frames <= self.left_wink_frames < self.right_click_hold_time:
-                self.click(x, y)
-
-                # Registrar para doble guiño
-                now = time.time()
-                self.last_left_winks.append(now)
-
-                # Limpiar ventana de tiempo
-                while (self.last_left_winks and
-                       now - self.last_left_winks[0] > self.double_wink_window):
-                    self.last_left_winks.popleft()
-
-                # Detectar doble guiño = Página adelante
-                if len(self.last_left_winks) >= 2:
-                    self.page_forward()
-                    self.last_left_winks.clear()
-
-            self.left_wink_frames = 0
-            self.left_closed_frames = 0
-
-        # ===== NUEVO: Ojo derecho cerrado + movimiento = Cambio de pestañas =====
-        if ear_right < self.wink_threshold and ear_left >= self.wink_threshold:
-            self.right_closed_frames += 1
-
-            # Guardar posición inicial cuando se cierra el ojo
-            if self.right_closed_frames == 1 and gaze_x is not None:
-                self.right_closed_start_x = gaze_x
-
-            # Detectar movimiento horizontal con ojo cerrado
-            elif self.right_closed_frames > 5 and gaze_x is not None and self.right_closed_start_x is not None:
-                movement = gaze_x - self.right_closed_start_x
-
-                # Movimiento a la derecha = Siguiente pestaña
-                if movement > self.tab_switch_threshold:
-                    self.switch_tab_next()
-                    self.right_closed_start_x = gaze_x  # Reset para evitar múltiples cambios
-                    if self.logger:
-                        self.logger.info("Cambio a siguiente pestaña (ojo derecho + derecha)")
-
-                # Movimiento a la izquierda = Pestaña anterior
-                elif movement < -self.tab_switch_threshold:
-                    self.switch_tab_prev()
-                    self.right_closed_start_x = gaze_x  # Reset
-                    if self.logger:
-                        self.logger.info("Cambio a pestaña anterior (ojo derecho + izquierda)")
-
-            # Guiño corto tradicional
-            self.right_wink_frames += 1
-        else:
-            # Guiño derecho corto = Página atrás (comportamiento original)
-            if self.wink_min_frames <= self.right_wink_frames < 10:
-                self.page_back()
+        Raises:
+            ValueError: Si algún gesto es inválido o usa una acción desconocida
+        """
+        if table is None:
+            table = default_gesture_table(self.wink_min_duration, self.double_wink_window)
+        for spec in table:
+            for key in ('action', 'action_positive', 'action_negative'):
+                if (spec.get(key) is not None and spec[key] not in self.GESTURE_ACTIONS and
+                        spec[key] not in self.actions):
+                    raise ValueError(f"Acción desconocida en gesto '{spec.get('name')}': {spec[key]}")
+        self.gesture_engine.set_table(table)
+
+    def process_gestures(self, gestures: dict, x: int, y: int, gaze_x: Optional[float] = None,
+                         timestamp: Optional[float] = None):
+        """
+        Procesa gestos y ejecuta acciones
 
-            self.right_wink_frames = 0
-            self.right_closed_frames = 0
-            self.right_closed_start_x = None
+        Args:
+            gestures: Diccionario con información de gestos
+            x: Posición x actual del cursor
+            y: Posición y actual del cursor
+            gaze_x: Posición x normalizada de la mirada (0-1) para detectar movimiento horizontal
+            timestamp: Instante del frame en segundos (None = time.monotonic())
+        """
+        actions = self.gesture_engine.update(
+            gestures.get('ear_left', 1.0), gestures.get('ear_right', 1.0), gaze_x, timestamp,
+            left_closed=gestures.get('left_closed'), right_closed=gestures.get('right_closed')
+        )
+        for action in actions:
+            self.execute_action(action, x, y)
 
     def process_dwell_click(self, gaze_x: float, gaze_y: float,
-                           screen_x: int, screen_y: int):
+                           screen_x: int, screen_y: int,
+                           gaze_event: Optional[str] = None,
+                           timestamp: Optional[float] = None):
         """
         Procesa dwell click (click por mirada sostenida)
 
@@ -263,50 +358,38 @@ class MouseController:
             gaze_y: Coordenada y de mirada normalizada
             screen_x: Coordenada x de pantalla
             screen_y: Coordenada y de pantalla
+            gaze_event: Evento ocular de la muestra ('fixation', 'saccade', 'blink').
+                Las sacadas cancelan el dwell y los parpadeos no lo interrumpen
+            timestamp: Instante de la muestra en segundos (None = time.monotonic())
         """
         if not self.dwell_enabled:
-            self.dwell_start_time = None
-            self.dwell_ref_position = None
             return
 
-        now = time.time()
-        current_pos = (gaze_x, gaze_y)
-
-        if self.dwell_start_time is None:
-            self.dwell_start_time = now
-            self.dwell_ref_position = current_pos
-        else:
-            # Verificar si se mantiene en la misma posición
-            dx = abs(current_pos[0] - self.dwell_ref_position[0])
-            dy = abs(current_pos[1] - self.dwell_ref_position[1])
-
-            deadzone = 0.02  # Zona muerta para dwell
+        point = self.dwell_engine.update(gaze_x, gaze_y, screen_x, screen_y, gaze_event, timestamp)
+        if point is not None:
+            self.click(*point)
 
-            if dx < deadzone and dy < deadzone:
-                if now - self.dwell_start_time > self.dwell_time:
-                    self.click(screen_x, screen_y)
-                    self.dwell_start_time = now
-            else:
-                self.dwell_start_time = now
-                self.dwell_ref_position = current_pos
+    @property
+    def dwell_progress(self) -> float:
+        """Progreso del dwell en curso (0-1) para el HUD"""
+        return self.dwell_engine.progress if self.dwell_enabled else 0.0
 
-    def process_auto_scroll(self, gaze_y: float):
+    def process_auto_scroll(self, gaze_y: float, timestamp: Optional[float] = None):
         """
         Procesa scroll automático en los bordes de la pantalla
 
         Args:
             gaze_y: Coordenada y de mirada normalizada (0-1)
+            timestamp: Instante de la muestra en segundos (None = time.monotonic())
         """
-        if gaze_y < self.scroll_band:
-            # Scroll hacia arriba
-            self.scroll(self.scroll_step)
-        elif gaze_y > 1.0 - self.scroll_band:
-            # Scroll hacia abajo
-            self.scroll(-self.scroll_step)
+        amount = self.scroll_engine.update(gaze_y, timestamp)
+        if amount:
+            self.scroll(amount)
 
     def toggle_dwell(self):
         """Activa/desactiva dwell click"""
         self.dwell_enabled = not self.dwell_enabled
+        self.dwell_engine.reset()
         if self.logger:
             state = "activado" if self.dwell_enabled else "desactivado"
             self.logger.info(f"Dwell click {state}")
@@ -0,0 +1,153 @@
+"""Localización de la pupila por medias de gradientes (Timm y Barth, 2011)"""
+import cv2 as cv
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+class PupilLocalizer:
+    """
+    Estima el centro de la pupila en la región de un ojo como el punto hacia
+    el que apuntan (en sentido contrario) los gradientes de intensidad del
+    borde iris/esclerótica: el centro c maximiza la media de (d_i · g_i)²,
+    con d_i el vector unitario de c a cada píxel de borde y g_i su gradiente
+    normalizado, ponderada por lo oscuro que es c.
+
+    Todo el cálculo es una operación matricial candidatos x píxeles de borde
+    sobre el ojo reducido a `roi_width` píxeles, y el máximo se refina a
+    nivel de subpíxel con una parábola.
+
+    La apertura se mide como la altura de la franja oscura (iris visible)
+    que contiene a la pupila, relativa al ancho del ojo: con el párpado
+    cerrado solo quedan las pestañas y la apertura cae casi a cero
+    """
+
+    def __init__(self, roi_width: int = 48, gradient_threshold: float = 0.3,
+                 candidate_fraction: float = 0.3, crop: Tuple[float, float] = (0.2, 0.9)):
+        """
+        Args:
+            roi_width: Ancho (px) al que se reduce la región del ojo
+            gradient_threshold: Umbral de magnitud del gradiente, en desviaciones
+                típicas sobre la media (0.3 en el artículo original)
+            candidate_fraction: Fracción más oscura de píxeles evaluados como centro
+            crop: Franja vertical (fracciones del alto) de la caja del ojo que se
+                analiza; descarta la ceja en la parte superior
+        """
+        self.roi_width = roi_width
+        self.gradient_threshold = gradient_threshold
+        self.candidate_fraction = candidate_fraction
+        self.crop = crop
+
+        # Rejillas de coordenadas por tamaño de región
+        self._grids: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _grid(self, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        grid = self._grids.get(shape)
+        if grid is None:
+            ys, xs = np.mgrid[0:shape[0], 0:shape[1]].astype(np.float32)
+            grid = (xs.ravel(), ys.ravel())
+            self._grids[shape] = grid
+        return grid
+
+    def locate(self, gray: np.ndarray,
+               eye_rect: Tuple[int, int, int, int]) -> Optional[Tuple[float, float, float]]:
+        """
+        Localiza la pupila de un ojo
+
+        Args:
+            gray: Frame en escala de grises
+            eye_rect: Caja del ojo (x, y, w, h) en el frame
+
+        Returns:
+            Tupla (x, y, apertura) con el centro en píxeles del frame (subpíxel)
+            y la apertura (~0 cerrado), o None si la región no es válida
+        """
+        x, y, w, h = eye_rect
+        top = y + int(self.crop[0] * h)
+        bottom = y + int(self.crop[1] * h)
+        roi = gray[max(0, top):bottom, max(0, x):x + w]
+        if roi.shape[0] < 4 or roi.shape[1] < 4:
+            return None
+        top, left = max(0, top), max(0, x)
+
+        scale = self.roi_width / roi.shape[1]
+        eye = cv.resize(roi, (self.roi_width, max(4, int(round(roi.shape[0] * scale)))),
+                        interpolation=cv.INTER_AREA).astype(np.float32)
+        scale_y = eye.shape[0] / roi.shape[0]
+
+        cx, cy = self._center(eye)
+        openness = self._openness(eye, cx, cy)
+        return left + (cx + 0.5) / scale - 0.5, top + (cy + 0.5) / scale_y - 0.5, openness
+
+    def _center(self, eye: np.ndarray) -> Tuple[float, float]:
+        """Centro de medias de gradientes en coordenadas de la región reducida"""
+        rows, cols = eye.shape
+        gy, gx = np.gradient(eye)
+        magnitude = np.hypot(gx, gy)
+        threshold = magnitude.mean() + self.gradient_threshold * magnitude.std()
+        edges = magnitude > threshold
+        if not edges.any():
+            return (cols - 1) / 2.0, (rows - 1) / 2.0
+
+        xs_grid, ys_grid = self._grid(eye.shape)
+        edge_mask = edges.ravel()
+        edge_x = xs_grid[edge_mask]
+        edge_y = ys_grid[edge_mask]
+        inv = 1.0 / magnitude.ravel()[edge_mask]
+        grad_x = gx.ravel()[edge_mask] * inv
+        grad_y = gy.ravel()[edge_mask] * inv
+
+        # Candidatos: los píxeles más oscuros (la pupila es oscura), con peso
+        # proporcional a lo oscuros que son en la imagen suavizada
+        darkness = 255.0 - cv.GaussianBlur(eye, (0, 0), 1.0).ravel()
+        count = max(1, int(self.candidate_fraction * darkness.size))
+        candidates = np.argpartition(darkness, -count)[-count:]
+        cand_x = xs_grid[candidates][:, None]
+        cand_y = ys_grid[candidates][:, None]
+
+        # (candidatos, bordes): coseno entre desplazamiento y gradiente
+        dx = edge_x[None, :] - cand_x
+        dy = edge_y[None, :] - cand_y
+        norm = np.sqrt(dx * dx + dy * dy)
+        norm[norm == 0] = np.inf
+        dots = (dx * grad_x + dy * grad_y) / norm
+        np.maximum(dots, 0.0, out=dots)
+        scores = np.zeros(eye.size, dtype=np.float32)
+        scores[candidates] = np.mean(dots * dots, axis=1) * darkness[candidates]
+
+        scores = scores.reshape(eye.shape)
+        iy, ix = np.unravel_index(int(np.argmax(scores)), eye.shape)
+        return ix + self._subpixel(scores[iy, :], ix), iy + self._subpixel(scores[:, ix], iy)
+
+    @staticmethod
+    def _subpixel(values: np.ndarray, i: int) -> float:
+        """Desplazamiento (-0.5..0.5) del vértice de la parábola por tres puntos"""
+        if i == 0 or i == len(values) - 1:
+            return 0.0
+        left, center, right = float(values[i - 1]), float(values[i]), float(values[i + 1])
+        curvature = left - 2.0 * center + right
+        if curvature >= 0:
+            return 0.0
+        return min(0.5, max(-0.5, 0.5 * (left - right) / curvature))
+
+    @staticmethod
+    def _openness(eye: np.ndarray, cx: float, cy: float) -> float:
+        """Altura de la franja oscura que contiene a la pupila / ancho del ojo"""
+        rows, cols = eye.shape
+        half = max(1, cols // 10)
+        column = int(round(cx))
+        strip = eye[:, max(0, column - half):column + half + 1]
+        profile = strip.mean(axis=1)
+
+        dark, bright = np.percentile(eye, 5), np.median(eye)
+        if bright - dark < 1.0:
+            return 0.0
+        is_dark = profile < dark + 0.5 * (bright - dark)
+
+        row = min(rows - 1, max(0, int(round(cy))))
+        if not is_dark[row]:
+            return 0.0
+        # Filas oscuras contiguas por encima y por debajo de la pupila
+        above = np.flatnonzero(~is_dark[:row][::-1])
+        below = np.flatnonzero(~is_dark[row + 1:])
+        height = (above[0] if len(above) else row) + (below[0] if len(below) else rows - row - 1) + 1
+        return float(height) / cols
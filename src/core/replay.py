@@ -0,0 +1,359 @@
+"""Grabación de frames de cámara y reproducción determinista del pipeline"""
+import json
+import struct
+import time
+import zlib
+import logging
+import cv2 as cv
+import numpy as np
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from .mouse_controller import MouseController
+
+
+MAGIC = b"GZREC1\n"
+CHUNK_MAGIC = b"CHNK"
+# Magic, número de frames, bytes comprimidos
+CHUNK_HEADER = struct.Struct("<4sIQ")
+
+
+def _read_header(f) -> dict:
+    """Lee la cabecera JSON al inicio de un archivo .gzrec abierto"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"Archivo de grabación inválido: {f.name}")
+    (header_len,) = struct.unpack("<I", f.read(4))
+    return json.loads(f.read(header_len).decode('utf-8'))
+
+
+def read_recording_header(file_path: str) -> dict:
+    """
+    Cabecera de una grabación: 'shape', 'dtype', 'codec', 'chunk_size' y, en
+    las grabaciones nuevas, 'screen_size' (pantalla del equipo que grabó)
+
+    Raises:
+        OSError: Si no se puede leer el archivo
+        ValueError: Si no es una grabación .gzrec
+    """
+    with open(file_path, 'rb') as f:
+        return _read_header(f)
+
+
+class FrameRecorder:
+    """
+    Guarda frames y timestamps en un contenedor por bloques (.gzrec).
+
+    Cada bloque contiene `chunk_size` frames comprimidos con zlib (sin pérdida)
+    o JPEG, de modo que la reproducción solo necesita un bloque en memoria
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = 30, codec: str = "zlib",
+                 jpeg_quality: int = 90, screen_size: Optional[Tuple[int, int]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            file_path: Ruta del archivo de grabación
+            chunk_size: Frames por bloque
+            codec: 'zlib' (sin pérdida) o 'jpeg' (compacto)
+            jpeg_quality: Calidad JPEG (solo codec 'jpeg')
+            screen_size: Resolución de pantalla a guardar en la cabecera, para
+                reproducir con el mismo mapeo a pantalla
+        """
+        if codec not in ("zlib", "jpeg"):
+            raise ValueError(f"Codec desconocido: '{codec}'")
+
+        self.file_path = Path(file_path)
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.codec = codec
+        self.jpeg_quality = jpeg_quality
+        self.screen_size = screen_size
+        self.logger = logger
+
+        self._file = None
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._timestamps: List[float] = []
+        self._frames: List[bytes] = []
+        self.frames_written = 0
+
+    def _write_header(self, frame: np.ndarray):
+        """Escribe la cabecera con la resolución del primer frame"""
+        self._shape = frame.shape
+        header = json.dumps({
+            'shape': list(frame.shape),
+            'dtype': str(frame.dtype),
+            'codec': self.codec,
+            'chunk_size': self.chunk_size,
+            'screen_size': list(self.screen_size) if self.screen_size else None
+        }).encode('utf-8')
+        self._file = open(self.file_path, 'wb')
+        self._file.write(MAGIC)
+        self._file.write(struct.pack("<I", len(header)))
+        self._file.write(header)
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """
+        Añade un frame a la grabación
+
+        Args:
+            frame: Frame BGR tal como sale de la cámara
+            timestamp: Instante de captura (por defecto time.time())
+        """
+        if self._file is None:
+            self._write_header(frame)
+        elif frame.shape != self._shape:
+            raise ValueError(f"Resolución distinta a la grabación: {frame.shape} != {self._shape}")
+
+        if self.codec == "jpeg":
+            ok, encoded = cv.imencode(".jpg", frame, [cv.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                raise RuntimeError("Error codificando frame JPEG")
+            self._frames.append(encoded.tobytes())
+        else:
+            self._frames.append(np.ascontiguousarray(frame).tobytes())
+
+        self._timestamps.append(time.time() if timestamp is None else timestamp)
+        if len(self._frames) >= self.chunk_size:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        """Comprime y escribe el bloque pendiente"""
+        if not self._frames:
+            return
+
+        n = len(self._frames)
+        parts = [np.asarray(self._timestamps, dtype=np.float64).tobytes()]
+        if self.codec == "jpeg":
+            parts.append(np.asarray([len(f) for f in self._frames], dtype=np.uint32).tobytes())
+            parts.extend(self._frames)
+            payload = b"".join(parts)
+        else:
+            parts.extend(self._frames)
+            payload = zlib.compress(b"".join(parts), 1)
+
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n, len(payload)))
+        self._file.write(payload)
+        self.frames_written += n
+        self._timestamps.clear()
+        self._frames.clear()
+
+    def close(self):
+        """Escribe el último bloque y cierra el archivo"""
+        if self._file is None:
+            return
+        self._flush_chunk()
+        self._file.close()
+        self._file = None
+        if self.logger:
+            self.logger.info(f"Grabación guardada: {self.file_path} ({self.frames_written} frames)")
+
+
+class RecordingCapture:
+    """Envuelve una cámara y graba cada frame leído"""
+
+    def __init__(self, capture, recorder: FrameRecorder):
+        self.capture = capture
+        self.recorder = recorder
+
+    def read(self):
+        ret, frame = self.capture.read()
+        if ret:
+            self.recorder.write(frame)
+        return ret, frame
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def set(self, prop_id, value):
+        return self.capture.set(prop_id, value)
+
+    def get(self, prop_id):
+        return self.capture.get(prop_id)
+
+    def release(self):
+        self.recorder.close()
+        self.capture.release()
+
+
+class ReplaySource:
+    """
+    Fuente de frames compatible con cv.VideoCapture que reproduce una
+    grabación .gzrec, a velocidad real o tan rápido como sea posible
+    """
+
+    def __init__(self, file_path: str, realtime: bool = True, loop: bool = False,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            file_path: Ruta de la grabación
+            realtime: Respetar el ritmo original de los timestamps
+            loop: Volver al inicio al terminar
+        """
+        self.file_path = Path(file_path)
+        self.realtime = realtime
+        self.loop = loop
+        self.logger = logger
+
+        self._file = open(self.file_path, 'rb')
+        try:
+            header = _read_header(self._file)
+        except ValueError:
+            self._file.close()
+            raise
+        self.shape = tuple(header['shape'])
+        self.dtype = np.dtype(header['dtype'])
+        self.codec = header['codec']
+        self._data_start = self._file.tell()
+
+        self._timestamps = np.empty(0)
+        self._frames: List[np.ndarray] = []
+        self._pos = 0
+        self.frames_read = 0
+
+        # Reloj de reproducción
+        self.last_timestamp: Optional[float] = None
+        self.last_capture_time: Optional[float] = None
+        self._first_timestamp: Optional[float] = None
+        self._start_wall: Optional[float] = None
+        self._start_epoch: Optional[float] = None
+
+    def _load_chunk(self) -> bool:
+        """Carga el siguiente bloque; False al final del archivo"""
+        raw = self._file.read(CHUNK_HEADER.size)
+        if len(raw) < CHUNK_HEADER.size:
+            return False
+
+        magic, n, size = CHUNK_HEADER.unpack(raw)
+        if magic != CHUNK_MAGIC:
+            raise ValueError("Bloque corrupto en la grabación")
+        payload = self._file.read(size)
+
+        if self.codec == "jpeg":
+            self._timestamps = np.frombuffer(payload, dtype=np.float64, count=n)
+            offset = n * 8
+            lengths = np.frombuffer(payload, dtype=np.uint32, count=n, offset=offset)
+            offset += n * 4
+            frames = []
+            for length in lengths:
+                buf = np.frombuffer(payload, dtype=np.uint8, count=int(length), offset=offset)
+                frames.append(cv.imdecode(buf, cv.IMREAD_COLOR))
+                offset += int(length)
+            self._frames = frames
+        else:
+            data = zlib.decompress(payload)
+            self._timestamps = np.frombuffer(data, dtype=np.float64, count=n)
+            frames = np.frombuffer(data, dtype=self.dtype, offset=n * 8)
+            self._frames = list(frames.reshape((n,) + self.shape))
+
+        self._pos = 0
+        return True
+
+    def read(self):
+        """
+        Lee el siguiente frame
+
+        Returns:
+            Tupla (ret, frame) como cv.VideoCapture.read()
+        """
+        if self._file is None:
+            return False, None
+
+        if self._pos >= len(self._frames):
+            if not self._load_chunk():
+                if not self.loop:
+                    return False, None
+                self._file.seek(self._data_start)
+                self._first_timestamp = None
+                if not self._load_chunk():
+                    return False, None
+
+        timestamp = float(self._timestamps[self._pos])
+        frame = self._frames[self._pos].copy()
+        self._pos += 1
+
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+            self._start_wall = time.perf_counter()
+            self._start_epoch = time.time()
+        elif self.realtime:
+            delay = (timestamp - self._first_timestamp) - (time.perf_counter() - self._start_wall)
+            if delay > 0:
+                time.sleep(delay)
+
+        self.last_timestamp = timestamp
+        # Timestamp grabado trasladado al reloj actual: conserva los intervalos
+        # originales también en reproducción a máxima velocidad
+        self.last_capture_time = self._start_epoch + (timestamp - self._first_timestamp)
+        self.frames_read += 1
+        return True, frame
+
+    def isOpened(self) -> bool:
+        return self._file is not None
+
+    def set(self, prop_id, value) -> bool:
+        # La resolución y los FPS vienen fijados por la grabación
+        return False
+
+    def get(self, prop_id) -> float:
+        if prop_id == cv.CAP_PROP_FRAME_WIDTH:
+            return float(self.shape[1])
+        if prop_id == cv.CAP_PROP_FRAME_HEIGHT:
+            return float(self.shape[0])
+        if prop_id == cv.CAP_PROP_POS_MSEC:
+            return self.elapsed() * 1000.0
+        return 0.0
+
+    def elapsed(self) -> float:
+        """Segundos de grabación hasta el último frame leído (no depende del ritmo de lectura)"""
+        if self.last_timestamp is None:
+            return 0.0
+        return self.last_timestamp - (self._first_timestamp or 0.0)
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if self.logger:
+                self.logger.info(f"Reproducción terminada: {self.frames_read} frames")
+
+
+class RecordingMouseSink(MouseController):
+    """
+    MouseController que registra las acciones en lugar de ejecutarlas,
+    para reproducir sesiones sin tocar el sistema operativo.
+
+    Cada evento lleva el instante de `clock`; al reproducir es el tiempo de la
+    grabación (ReplaySource.elapsed), así dos reproducciones dan el mismo registro
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events: List[tuple] = []
+        self.clock: Callable[[], float] = time.time
+
+    def _record(self, action: str, *args):
+        self.events.append((self.clock(), action) + args)
+        if action == 'click':
+            self._notify_action(f'click_{args[2]}')
+        elif action != 'move':
+            self._notify_action(action)
+
+    def move_to(self, x: int, y: int):
+        self._record('move', x, y)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = 'left'):
+        self._record('click', x, y, button)
+
+    def run_action(self, name: str):
+        if self.actions.get(name) is None:
+            raise ValueError(f"Acción desconocida: {name}")
+        self._record(name)
+
+    def scroll(self, amount: int):
+        self._record('scroll', amount)
+
+    def summary(self) -> dict:
+        """Conteo de acciones registradas por tipo"""
+        counts = {}
+        for event in self.events:
+            counts[event[1]] = counts.get(event[1], 0) + 1
+        return counts
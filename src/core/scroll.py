@@ -0,0 +1,98 @@
+"""Scroll automático continuo: velocidad según la profundidad en la banda"""
+import time
+import logging
+from typing import Optional, Tuple
+
+
+class ScrollEngine:
+    """
+    Convierte la posición vertical de la mirada en una velocidad de scroll
+    (más rápida cuanto más cerca del borde) integrada en tiempo real, y la
+    emite en eventos agrupados a una frecuencia máxima. Así la velocidad no
+    depende de los FPS y se hace una llamada al sistema cada pocos frames.
+
+    Al entrar en una banda hay un tiempo muerto antes de empezar, y para salir
+    hay que alejarse `exit_margin` más allá de la banda (histéresis)
+    """
+
+    def __init__(self, band: float = 0.08, max_speed: float = 1200.0, exponent: float = 1.5,
+                 max_rate: float = 15.0, dead_time: float = 0.3, exit_margin: float = 0.01,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            band: Tamaño de cada banda de scroll (0-1, arriba y abajo)
+            max_speed: Unidades de scroll por segundo en el borde de la pantalla
+            exponent: Forma de la curva profundidad -> velocidad (1 = lineal)
+            max_rate: Eventos de scroll por segundo como máximo
+            dead_time: Segundos dentro de la banda antes de empezar a desplazar
+            exit_margin: Distancia extra fuera de la banda para dejar de desplazar
+        """
+        self.band = band
+        self.max_speed = max_speed
+        self.exponent = exponent
+        self.max_rate = max_rate
+        self.dead_time = dead_time
+        self.exit_margin = exit_margin
+        self.logger = logger
+
+        self.direction = 0  # 1 = arriba, -1 = abajo, 0 = fuera de las bandas
+        self.entered_at = 0.0
+        self.accumulator = 0.0
+        self.last_time: Optional[float] = None
+        self.last_emit = float('-inf')
+
+    def reset(self):
+        """Detiene el scroll en curso"""
+        self.direction = 0
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def _zone(self, gaze_y: float) -> Tuple[int, float]:
+        """Dirección y profundidad (0-1) de la mirada en las bandas"""
+        band = self.band
+        if band <= 0:
+            return 0, 0.0
+        # Mientras se desplaza, la banda actual se extiende exit_margin
+        top = band + (self.exit_margin if self.direction == 1 else 0.0)
+        bottom = 1.0 - band - (self.exit_margin if self.direction == -1 else 0.0)
+        if gaze_y < top:
+            return 1, min(1.0, max(0.0, (band - gaze_y) / band))
+        if gaze_y > bottom:
+            return -1, min(1.0, max(0.0, (gaze_y - (1.0 - band)) / band))
+        return 0, 0.0
+
+    def update(self, gaze_y: float, timestamp: Optional[float] = None) -> int:
+        """
+        Procesa una muestra de mirada
+
+        Args:
+            gaze_y: Coordenada y de mirada normalizada (0-1)
+            timestamp: Instante de la muestra en segundos (None = time.monotonic())
+
+        Returns:
+            Cantidad de scroll a emitir ahora (positivo = arriba, 0 = nada)
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        # Un hueco largo (sin rostro) no debe convertirse en un salto de scroll
+        dt = 0.0 if self.last_time is None else min(0.1, max(0.0, now - self.last_time))
+        self.last_time = now
+
+        direction, depth = self._zone(gaze_y)
+        if direction != self.direction:
+            self.direction = direction
+            self.entered_at = now
+            self.accumulator = 0.0
+            return 0
+        if direction == 0 or now - self.entered_at < self.dead_time:
+            return 0
+
+        self.accumulator += direction * self.max_speed * depth ** self.exponent * dt
+        if now - self.last_emit < 1.0 / self.max_rate:
+            return 0
+
+        amount = int(self.accumulator)
+        if amount == 0:
+            return 0
+        self.accumulator -= amount
+        self.last_emit = now
+        return amount
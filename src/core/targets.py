@@ -0,0 +1,272 @@
+"""Magnetismo del cursor hacia objetivos de la interfaz (botones, enlaces...)"""
+import json
+import math
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class TargetIndex:
+    """
+    Rectángulos de pantalla indexados en una rejilla uniforme (hash espacial)
+    de celda `cell_size` píxeles: buscar el objetivo más cercano dentro de un
+    radio solo recorre las celdas que toca el radio, sin importar cuántos
+    objetivos haya. El índice es inmutable; para cambiar los objetivos se
+    construye uno nuevo y se sustituye la referencia
+    """
+
+    def __init__(self, rects: Sequence[Sequence[float]], names: Optional[Sequence[str]] = None,
+                 cell_size: int = 64, max_size: float = 400.0):
+        """
+        Args:
+            rects: Rectángulos (x, y, ancho, alto) en píxeles de pantalla
+            names: Nombre opcional de cada rectángulo
+            cell_size: Lado de celda de la rejilla en píxeles
+            max_size: Lado máximo de un objetivo; los rectángulos mayores son
+                contenedores (ventanas, paneles) y se ignoran
+        """
+        self.cell_size = cell_size
+        self.rects: List[Tuple[float, float, float, float]] = []
+        self.names: List[Optional[str]] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+
+        for i, rect in enumerate(rects):
+            x, y, w, h = (float(v) for v in rect)
+            if w <= 0 or h <= 0:
+                raise ValueError(f"Objetivo {i} con tamaño no positivo: {rect}")
+            if w > max_size or h > max_size:
+                continue
+            index = len(self.rects)
+            self.rects.append((x, y, x + w, y + h))
+            self.names.append(names[i] if names is not None else None)
+            for cx in range(int(x // cell_size), int((x + w) // cell_size) + 1):
+                for cy in range(int(y // cell_size), int((y + h) // cell_size) + 1):
+                    self._grid.setdefault((cx, cy), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def distance(self, index: int, x: float, y: float) -> float:
+        """Distancia en píxeles del punto al rectángulo (0 si está dentro)"""
+        x0, y0, x1, y1 = self.rects[index]
+        dx = max(x0 - x, 0.0, x - x1)
+        dy = max(y0 - y, 0.0, y - y1)
+        return math.hypot(dx, dy)
+
+    def nearest(self, x: float, y: float, radius: float) -> Tuple[Optional[int], float]:
+        """
+        Objetivo más cercano al punto dentro de `radius` (a igual distancia,
+        p. ej. objetivos anidados, gana el de menor área)
+
+        Returns:
+            Tupla (índice o None, distancia)
+        """
+        size = self.cell_size
+        rects, grid = self.rects, self._grid
+        best, best_d2, best_area = None, radius * radius, math.inf
+        seen = set()
+        for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                cell = grid.get((cx, cy))
+                if cell is None:
+                    continue
+                for index in cell:
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    x0, y0, x1, y1 = rects[index]
+                    dx = max(x0 - x, 0.0, x - x1)
+                    dy = max(y0 - y, 0.0, y - y1)
+                    d2 = dx * dx + dy * dy
+                    if d2 > best_d2:
+                        continue
+                    area = (x1 - x0) * (y1 - y0)
+                    if d2 < best_d2 or area < best_area:
+                        best, best_d2, best_area = index, d2, area
+        if best is None:
+            return None, math.inf
+        return best, math.sqrt(best_d2)
+
+
+def parse_targets(data) -> Tuple[List[Tuple[float, float, float, float]], List[Optional[str]]]:
+    """
+    Convierte la lista de objetivos del archivo o de la API en rectángulos
+
+    Acepta [x, y, ancho, alto] o {"x": ..., "y": ..., "w": ..., "h": ..., "name": ...}
+
+    Raises:
+        ValueError: Si el formato es inválido
+    """
+    if not isinstance(data, list):
+        raise ValueError("los objetivos deben ser una lista")
+    rects, names = [], []
+    for item in data:
+        if isinstance(item, dict):
+            rects.append((item['x'], item['y'], item['w'], item['h']))
+            names.append(item.get('name'))
+        elif isinstance(item, (list, tuple)) and len(item) == 4:
+            rects.append(tuple(item))
+            names.append(None)
+        else:
+            raise ValueError(f"objetivo inválido: {item!r}")
+    return rects, names
+
+
+class TargetSnapper:
+    """
+    Atrae suavemente el cursor hacia el objetivo más cercano. La atracción
+    crece al acercarse (strength dentro del objetivo, 0 en el borde del
+    radio) y apunta a la zona central del objetivo, de modo que en objetivos
+    grandes el cursor se mueve libremente por el centro.
+
+    Se aplica sobre la posición mapeada de cada frame (no se acumula) y se
+    desactiva durante las sacadas para no frenar los desplazamientos largos
+    """
+
+    def __init__(self, radius: float = 60.0, strength: float = 0.6, core: float = 0.25,
+                 switch_margin: float = 8.0, cell_size: int = 64, enabled: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            radius: Distancia máxima (px) a la que un objetivo atrae el cursor
+            strength: Fracción del camino hacia el objetivo recorrida dentro de él (0-1)
+            core: Margen de cada lado (fracción del tamaño, como mucho radius/2 px)
+                excluido de la zona central
+            switch_margin: Ventaja (px) que necesita otro objetivo para quitar
+                el cursor al actual (evita saltos entre objetivos vecinos)
+            cell_size: Lado de celda (px) del índice espacial
+            enabled: Aplicar el magnetismo
+        """
+        self.radius = radius
+        self.strength = strength
+        self.core = core
+        self.switch_margin = switch_margin
+        self.cell_size = cell_size
+        self.enabled = enabled
+        self.logger = logger
+
+        self.index = TargetIndex([], cell_size=cell_size)
+        self._current: Optional[Tuple[TargetIndex, int]] = None
+
+    def set_targets(self, rects: Sequence[Sequence[float]],
+                    names: Optional[Sequence[str]] = None) -> int:
+        """
+        Reemplaza los objetivos. El índice nuevo se construye aparte y se
+        sustituye de una vez, así que se puede llamar desde otro hilo
+
+        Returns:
+            Número de objetivos
+        """
+        self.index = TargetIndex(rects, names, cell_size=self.cell_size)
+        if self.logger:
+            self.logger.debug(f"{len(self.index)} objetivos de magnetismo cargados")
+        return len(self.index)
+
+    @property
+    def current_target(self) -> Optional[str]:
+        """Nombre (o índice) del objetivo que atrae el cursor ahora"""
+        if self._current is None:
+            return None
+        index, i = self._current
+        return index.names[i] or str(i)
+
+    def update(self, x: float, y: float, gaze_event: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Ajusta una posición del cursor
+
+        Args:
+            x: Coordenada x de pantalla mapeada
+            y: Coordenada y de pantalla mapeada
+            gaze_event: Evento ocular de la muestra ('fixation', 'saccade', 'blink')
+
+        Returns:
+            Tupla (x, y) atraída hacia el objetivo cercano
+        """
+        index = self.index
+        if not self.enabled or not len(index) or self.strength <= 0 or gaze_event == 'saccade':
+            self._current = None
+            return int(x), int(y)
+
+        target, distance = index.nearest(x, y, self.radius)
+
+        # Mantener el objetivo actual salvo que otro esté claramente más cerca
+        if self._current is not None and self._current[0] is index and self._current[1] != target:
+            current = self._current[1]
+            current_distance = index.distance(current, x, y)
+            if (current_distance <= self.radius and
+                    (target is None or current_distance <= distance + self.switch_margin)):
+                target, distance = current, current_distance
+
+        if target is None:
+            self._current = None
+            return int(x), int(y)
+        self._current = (index, target)
+
+        # Punto más cercano de la zona central del objetivo
+        x0, y0, x1, y1 = index.rects[target]
+        max_margin = 0.5 * self.radius
+        margin_x = min(self.core * (x1 - x0), max_margin)
+        margin_y = min(self.core * (y1 - y0), max_margin)
+        tx = min(max(x, x0 + margin_x), x1 - margin_x)
+        ty = min(max(y, y0 + margin_y), y1 - margin_y)
+
+        weight = self.strength * (1.0 - distance / self.radius)
+        return int(round(x + weight * (tx - x))), int(round(y + weight * (ty - y)))
+
+
+class TargetFileSource:
+    """
+    Carga los objetivos de un archivo JSON y lo recarga cuando cambia (por
+    mtime, una llamada a stat por intervalo). Lo escriben herramientas
+    externas: un volcado de accesibilidad, un detector sobre capturas de
+    pantalla o una lista fija por aplicación
+    """
+
+    def __init__(self, snapper: TargetSnapper, path: str = "data/targets.json",
+                 interval: float = 1.0, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            snapper: Magnetismo que recibe los objetivos
+            path: Archivo con la lista de objetivos (ver parse_targets)
+            interval: Segundos mínimos entre comprobaciones
+        """
+        self.snapper = snapper
+        self.path = Path(path)
+        self.interval = interval
+        self.logger = logger
+
+        self._last_check = float('-inf')
+        self._mtime: Optional[int] = None
+
+    def poll(self) -> bool:
+        """
+        Recarga el archivo si cambió y ha pasado el intervalo
+
+        Returns:
+            True si se cargaron objetivos nuevos
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                rects, names = parse_targets(json.load(f))
+            count = self.snapper.set_targets(rects, names)
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            if self.logger:
+                self.logger.error(f"{self.path} inválido, se mantienen los objetivos actuales: {e}")
+            return False
+        if self.logger:
+            self.logger.info(f"{count} objetivos cargados de {self.path}")
+        return True
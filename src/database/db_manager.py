@@ -2,11 +2,27 @@
 import sqlite3
 import json
 import pickle
+import time
+import functools
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 from datetime import datetime
 
 
+def _timed_write(method):
+    """Mide la duración de una operación de escritura y la notifica a on_write"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.on_write is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.on_write(time.perf_counter() - start)
+    return wrapper
+
+
 class DatabaseManager:
     """Maneja todas las operaciones de base de datos"""
 
@@ -14,6 +30,8 @@ class DatabaseManager:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn: Optional[sqlite3.Connection] = None
+        # Callback opcional con la duración (s) de cada escritura (métricas)
+        self.on_write: Optional[Callable[[float], None]] = None
         self._initialize_database()
 
     def _initialize_database(self):
@@ -77,6 +95,7 @@ class DatabaseManager:
 
         self.conn.commit()
 
+    @_timed_write
     def register_user(self, username: str, face_embedding: bytes) -> int:
         """Registra un nuevo usuario con su embedding facial"""
         cursor = self.conn.cursor()
@@ -155,6 +174,7 @@ class DatabaseManager:
             }
         return None
 
+    @_timed_write
     def set_user_logged_in(self, user_id: int):
         """Marca un usuario como logueado (solo uno a la vez)"""
         cursor = self.conn.cursor()
@@ -167,12 +187,14 @@ class DatabaseManager:
         )
         self.conn.commit()
 
+    @_timed_write
     def logout_all_users(self):
         """Desloguea a todos los usuarios"""
         cursor = self.conn.cursor()
         cursor.execute("UPDATE users SET is_logged_in = 0")
         self.conn.commit()
 
+    @_timed_write
     def update_last_login(self, user_id: int):
         """Actualiza el último login del usuario"""
         cursor = self.conn.cursor()
@@ -182,6 +204,7 @@ class DatabaseManager:
         )
         self.conn.commit()
 
+    @_timed_write
     def save_configuration(self, user_id: int, config_key: str, config_value: Any):
         """Guarda o actualiza una configuración del usuario"""
         cursor = self.conn.cursor()
@@ -219,6 +242,7 @@ class DatabaseManager:
             configs[row['config_key']] = json.loads(row['config_value'])
         return configs
 
+    @_timed_write
     def save_calibration(self, user_id: int, calibration_matrix, samples_src, samples_dst):
         """Guarda una nueva calibración"""
         # Desactivar calibraciones anteriores
@@ -260,6 +284,7 @@ class DatabaseManager:
             }
         return None
 
+    @_timed_write
     def start_session(self, user_id: int) -> int:
         """Inicia una nueva sesión"""
         cursor = self.conn.cursor()
@@ -270,6 +295,7 @@ class DatabaseManager:
         self.conn.commit()
         return cursor.lastrowid
 
+    @_timed_write
     def end_session(self, session_id: int):
         """Finaliza una sesión"""
         cursor = self.conn.cursor()
@@ -312,6 +338,7 @@ class DatabaseManager:
             'total_calibrations': total_calibrations
         }
 
+    @_timed_write
     def delete_user(self, user_id: int):
         """Elimina un usuario y todos sus datos"""
         cursor = self.conn.cursor()
@@ -1,4 +1,5 @@
 """UI module"""
 from .main_window import MainWindow
+from .headless_window import HeadlessWindow
 
-__all__ = ['MainWindow']
+__all__ = ['MainWindow', 'HeadlessWindow']
@@ -0,0 +1,116 @@
+"""Ventana sin interfaz gráfica para equipos sin vista previa"""
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+import cv2 as cv
+import numpy as np
+from pathlib import Path
+from typing import Optional
+from .main_window import MainWindow
+
+
+# Valor de wait_key() cuando no hay tecla (cv.waitKey(...) & 0xFF)
+NO_KEY = 0xFF
+
+
+class StdinKeyReader:
+    """
+    Lee comandos de teclado desde stdin en un hilo de fondo. Cada línea
+    aporta su primer carácter como tecla (p. ej. "c" + ENTER = calibrar)
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger
+        self._keys: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Arranca el hilo lector (una sola vez)"""
+        if self._thread is not None or sys.stdin is None or not sys.stdin.readable():
+            return
+        self._thread = threading.Thread(target=self._run, name="stdin-keys", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                self._keys.put(ord(line[0]))
+        if self.logger:
+            self.logger.debug("stdin cerrado: sin más comandos de teclado")
+
+    def poll(self) -> int:
+        """Retorna la siguiente tecla pendiente o NO_KEY sin bloquear"""
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return NO_KEY
+
+
+class HeadlessWindow(MainWindow):
+    """
+    Sustituye a MainWindow en modo headless: no dibuja, no llama a imshow
+    ni a waitKey. Las teclas llegan por stdin y, opcionalmente, se guarda
+    una captura de la vista previa cada `snapshot_interval` segundos
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval: float = 0.0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            snapshot_path: Archivo JPEG donde guardar capturas (None = sin capturas)
+            snapshot_interval: Segundos entre capturas (0 = sin capturas)
+        """
+        super().__init__(window_name="Gaze Control (headless)", logger=logger)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.last_snapshot = 0.0
+        self.key_reader = StdinKeyReader(logger=logger)
+
+    def create_window(self):
+        self.key_reader.start()
+        if self.logger:
+            self.logger.info("Modo headless: teclas por stdin (letra + ENTER)")
+
+    def draw_hud(self, frame: np.ndarray, config: dict, user_info: Optional[dict] = None):
+        pass
+
+    def draw_stage_breakdown(self, frame: np.ndarray, breakdown: dict, budget_ms: float = 33.3):
+        pass
+
+    def draw_warning(self, frame: np.ndarray, message: str):
+        pass
+
+    def draw_notification(self, frame: np.ndarray, message: str, duration: float = 2.0):
+        pass
+
+    def show_frame(self, frame: np.ndarray):
+        """Guarda una captura a baja frecuencia si está configurado"""
+        if not self.snapshot_path or self.snapshot_interval <= 0:
+            return
+        now = time.time()
+        if now - self.last_snapshot < self.snapshot_interval:
+            return
+        self.last_snapshot = now
+
+        # Escritura atómica: los lectores nunca ven un JPEG a medias
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            ok, encoded = cv.imencode(".jpg", frame, [cv.IMWRITE_JPEG_QUALITY, 80])
+            if ok:
+                tmp_path = self.snapshot_path.with_suffix(".tmp")
+                tmp_path.write_bytes(encoded.tobytes())
+                os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"Error guardando captura de vista previa: {e}")
+
+    def wait_key(self, delay: int = 1) -> int:
+        return self.key_reader.poll()
+
+    def destroy(self):
+        if self.logger:
+            self.logger.info("Modo headless finalizado")
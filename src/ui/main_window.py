@@ -4,11 +4,17 @@ import numpy as np
 import time
 import logging
 from typing import Optional
+from .overlay import OverlayLayer, blend_rect
 
 
 class MainWindow:
     """Maneja la ventana principal y el renderizado de UI"""
 
+    INSTRUCTIONS = (
+        "Gestos: Ojo Izq (click) | Ojo Izq Sostenido (click derecho) | Ojo Der + Mover (pestanas)",
+        "[c] Calibrar  [r] Reset  [d] Debug  [p] Perfil  [+/-] Ganancia  [g] Dwell  [q] Salir"
+    )
+
     def __init__(self, window_name: str = "Gaze Control", logger: Optional[logging.Logger] = None):
         self.window_name = window_name
         self.logger = logger
@@ -30,6 +36,9 @@ class MainWindow:
         self.authenticated = False
         self.auth_similarity = 0.0
 
+        # Capas de overlay pre-renderadas por nombre
+        self._layers = {}
+
     def create_window(self):
         """Crea la ventana principal"""
         cv.namedWindow(self.window_name, cv.WINDOW_NORMAL)
@@ -43,6 +52,14 @@ class MainWindow:
             self.fps = self.fps_smooth * self.fps + (1 - self.fps_smooth) * (10.0 / dt)
             self.last_fps_time = current_time
 
+    def _layer(self, name: str, width: int, height: int) -> OverlayLayer:
+        """Capa cacheada por nombre; se recrea si cambia el tamaño"""
+        layer = self._layers.get(name)
+        if layer is None or layer.width != width or layer.height != height:
+            layer = OverlayLayer(width, height)
+            self._layers[name] = layer
+        return layer
+
     def draw_hud(self, frame: np.ndarray, config: dict, user_info: Optional[dict] = None):
         """
         Dibuja el HUD (Heads-Up Display) con información del sistema
@@ -54,58 +71,84 @@ class MainWindow:
         """
         h, w = frame.shape[:2]
 
-        # Fondo semi-transparente para el HUD
-        overlay = frame.copy()
-        cv.rectangle(overlay, (0, 0), (w, 100), (0, 0, 0), -1)
-        cv.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
+        # Fondo semi-transparente para el HUD (solo la franja superior)
+        blend_rect(frame, 0, 0, w, 100, (0, 0, 0), 0.4)
 
-        # Información superior izquierda
-        y_offset = 25
-        info_texts = [
+        # Información superior: se redibuja solo cuando cambian los valores
+        info_texts = (
             f"FPS: {self.fps:.1f}",
             f"Ganancia: {config.get('gain', 1.2):.2f}",
             f"Deadzone: {config.get('deadzone', 0.015):.3f}",
             f"Dwell: {'ON' if config.get('dwell_enabled', False) else 'OFF'}"
-        ]
-
-        for i, text in enumerate(info_texts):
-            cv.putText(
-                frame, text, (10, y_offset + i * 20),
-                cv.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1
-            )
-
-        # Usuario autenticado
-        if user_info and self.authenticated:
-            user_text = f"Usuario: {user_info.get('username', 'N/A')}"
-            auth_text = f"Auth: {self.auth_similarity:.0%}"
-            cv.putText(
-                frame, user_text, (w - 250, 25),
-                cv.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1
-            )
-            cv.putText(
-                frame, auth_text, (w - 250, 45),
-                cv.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1
-            )
-            # Indicador visual
-            color = (0, 255, 0) if self.auth_similarity > 0.85 else (0, 165, 255)
-            cv.circle(frame, (w - 260, 20), 8, color, -1)
-        else:
-            cv.putText(
-                frame, "No autenticado", (w - 250, 25),
-                cv.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1
-            )
-
-        # Instrucciones en la parte inferior
-        instructions = [
-            "Gestos: Ojo Izq (click) | Ojo Izq Sostenido (click derecho) | Ojo Der + Mover (pestanas)",
-            "[c] Calibrar  [r] Reset  [d] Debug  [+/-] Ganancia  [g] Dwell  [q] Salir"
-        ]
+        )
+        username = user_info.get('username', 'N/A') if user_info and self.authenticated else None
+        auth_text = f"Auth: {self.auth_similarity:.0%}"
+
+        top = self._layer('hud_top', w, 100)
+        if top.needs_render((info_texts, username, auth_text)):
+            y_offset = 25
+            for i, text in enumerate(info_texts):
+                top.put_text(text, (10, y_offset + i * 20), 0.5, (0, 255, 0))
+
+            # Usuario autenticado
+            if username is not None:
+                top.put_text(f"Usuario: {username}", (w - 250, 25), 0.5, (0, 255, 0))
+                top.put_text(auth_text, (w - 250, 45), 0.5, (0, 255, 0))
+                # Indicador visual
+                color = (0, 255, 0) if self.auth_similarity > 0.85 else (0, 165, 255)
+                top.circle((w - 260, 20), 8, color)
+            else:
+                top.put_text("No autenticado", (w - 250, 25), 0.5, (0, 0, 255))
+        top.blit(frame, 0, 0)
+
+        # Progreso del dwell en curso junto a su indicador
+        progress = config.get('dwell_progress', 0.0)
+        if progress > 0.0:
+            cv.rectangle(frame, (110, 78), (210, 86), (0, 255, 0), 1)
+            cv.rectangle(frame, (110, 78), (110 + int(100 * progress), 86), (0, 255, 0), -1)
+
+        # Instrucciones en la parte inferior (estáticas, se renderizan una vez)
+        bottom = self._layer('hud_bottom', w, 60)
+        if bottom.needs_render(self.INSTRUCTIONS):
+            for i, instruction in enumerate(self.INSTRUCTIONS):
+                bottom.put_text(
+                    instruction, (10, 45 - (len(self.INSTRUCTIONS) - 1 - i) * 20),
+                    0.42, (255, 255, 255)
+                )
+        bottom.blit(frame, 0, h - 60)
+
+    def draw_stage_breakdown(self, frame: np.ndarray, breakdown: dict, budget_ms: float = 33.3):
+        """
+        Dibuja el tiempo medio por etapa del pipeline como barras horizontales
 
-        for i, instruction in enumerate(instructions):
-            cv.putText(
-                frame, instruction, (10, h - 15 - (len(instructions) - 1 - i) * 20),
-                cv.FONT_HERSHEY_SIMPLEX, 0.42, (255, 255, 255), 1
-            )
+        Args:
+            frame: Frame donde dibujar
+            breakdown: Diccionario etapa -> ms (FrameProfiler.stage_breakdown)
+            budget_ms: Presupuesto por frame que corresponde al ancho completo
+        """
+        if not breakdown:
+            return
+
+        stages = [(name, ms) for name, ms in breakdown.items() if name != 'frame']
+        x0, y0 = 10, 110
+        bar_w = 160
+
+        blend_rect(frame, 0, y0 - 15, x0 + bar_w + 170, y0 + 16 * len(stages) + 10,
+                   (0, 0, 0), 0.5)
+
+        total = breakdown.get('frame', 0.0)
+        color = (0, 255, 0) if total <= budget_ms else (0, 0, 255)
+        cv.putText(frame, f"Frame: {total:.1f} ms / {budget_ms:.1f} ms", (x0, y0),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+
+        for i, (name, ms) in enumerate(stages):
+            y = y0 + 16 * (i + 1)
+            length = int(bar_w * min(1.0, ms / budget_ms))
+            cv.putText(frame, f"{name:<13}{ms:5.1f}", (x0, y),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.38, (255, 255, 255), 1)
+            if length > 0:
+                cv.rectangle(frame, (x0 + 150, y - 8), (x0 + 150 + length, y - 1),
+                             (0, 200, 255), -1)
 
     def draw_calibration_target(self, frame: np.ndarray, target_x: int, target_y: int,
                                is_ready: bool = False):
@@ -215,26 +258,19 @@ class MainWindow:
             message: Mensaje a mostrar
         """
         h, w = frame.shape[:2]
+        y0 = h // 2 - 50
 
-        # Fondo semi-transparente
-        overlay = frame.copy()
-        cv.rectangle(
-            overlay,
-            (w // 4, h // 2 - 50),
-            (3 * w // 4, h // 2 + 50),
-            (0, 0, 255), -1
-        )
-        cv.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+        # Fondo semi-transparente (solo el recuadro)
+        blend_rect(frame, w // 4, y0, 3 * w // 4, h // 2 + 50, (0, 0, 255), 0.7)
 
-        # Texto
-        text_size = cv.getTextSize(message, cv.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-        text_x = (w - text_size[0]) // 2
-        text_y = (h + text_size[1]) // 2
-
-        cv.putText(
-            frame, message, (text_x, text_y),
-            cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2
-        )
+        # Texto (franja de ancho completo: mensajes largos sobresalen del recuadro)
+        layer = self._layer('warning', w, 100)
+        if layer.needs_render(message):
+            text_size = cv.getTextSize(message, cv.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+            text_x = (w - text_size[0]) // 2
+            text_y = (h + text_size[1]) // 2 - y0
+            layer.put_text(message, (text_x, text_y), 0.8, (255, 255, 255), 2)
+        layer.blit(frame, 0, y0)
 
     def draw_notification(self, frame: np.ndarray, message: str, duration: float = 2.0):
         """
@@ -253,20 +289,13 @@ class MainWindow:
         y = 100
 
         # Fondo
-        overlay = frame.copy()
-        cv.rectangle(
-            overlay,
-            (x - 10, y - 30),
-            (x + text_size[0] + 10, y + 10),
-            (0, 200, 0), -1
-        )
-        cv.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+        blend_rect(frame, x - 10, y - 30, x + text_size[0] + 10, y + 10, (0, 200, 0), 0.6)
 
         # Texto
-        cv.putText(
-            frame, message, (x, y),
-            cv.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2
-        )
+        layer = self._layer('notification', w, 40)
+        if layer.needs_render(message):
+            layer.put_text(message, (x, 30), 0.7, (255, 255, 255), 2)
+        layer.blit(frame, 0, y - 30)
 
     def show_frame(self, frame: np.ndarray):
         """Muestra el frame en la ventana"""
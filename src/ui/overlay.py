@@ -0,0 +1,136 @@
+"""Capas de overlay pre-renderadas y mezclas limitadas a regiones"""
+import cv2 as cv
+import numpy as np
+from typing import Hashable, List, Optional, Tuple
+
+
+def blend_rect(frame: np.ndarray, x0: int, y0: int, x1: int, y1: int,
+               color: Tuple[int, int, int], alpha: float):
+    """
+    Mezcla un rectángulo de color sólido sobre el frame, en el sitio y solo
+    sobre la región afectada (equivale a addWeighted con una copia del frame)
+
+    Args:
+        frame: Frame BGR donde dibujar
+        x0, y0, x1, y1: Esquinas del rectángulo (inclusivas, como cv.rectangle)
+        color: Color BGR
+        alpha: Opacidad del color (0-1)
+    """
+    h, w = frame.shape[:2]
+    x0, x1 = max(0, x0), min(w, x1 + 1)
+    y0, y1 = max(0, y0), min(h, y1 + 1)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    roi = frame[y0:y1, x0:x1]
+    cv.convertScaleAbs(roi, dst=roi, alpha=1.0 - alpha)
+    if any(color):
+        cv.add(roi, (color[0] * alpha, color[1] * alpha, color[2] * alpha, 0), dst=roi)
+
+
+class OverlayLayer:
+    """
+    Capa de texto/gráficos pre-renderada con máscara. Se vuelve a dibujar solo
+    cuando cambia su clave (resolución, textos, valores) y cada frame se copia
+    sobre el frame únicamente en los rectángulos que contienen dibujo.
+
+    Con texto binario (OpenCV 4) la copia es directa con máscara; si OpenCV
+    suaviza el texto (OpenCV 5) se mezcla usando la máscara como alfa
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        self.key: Optional[Hashable] = None
+        self._regions: List[List[int]] = []
+        self._blits: Optional[list] = None
+
+    def needs_render(self, key: Hashable) -> bool:
+        """True si la capa debe redibujarse para la clave dada (y la limpia)"""
+        if key == self.key:
+            return False
+        self.key = key
+        self.image[:] = 0
+        self.mask[:] = 0
+        self._regions = []
+        self._blits = None
+        return True
+
+    def _add_region(self, x0: int, y0: int, x1: int, y1: int):
+        """Registra un rectángulo dibujado, fusionándolo con los que solapa"""
+        region = [max(0, x0), max(0, y0), min(self.width, x1), min(self.height, y1)]
+        if region[0] >= region[2] or region[1] >= region[3]:
+            return
+        merged = True
+        while merged:
+            merged = False
+            for other in self._regions:
+                if (region[0] < other[2] and other[0] < region[2] and
+                        region[1] < other[3] and other[1] < region[3]):
+                    self._regions.remove(other)
+                    region = [min(region[0], other[0]), min(region[1], other[1]),
+                              max(region[2], other[2]), max(region[3], other[3])]
+                    merged = True
+                    break
+        self._regions.append(region)
+        self._blits = None
+
+    def put_text(self, text: str, org: Tuple[int, int], scale: float,
+                 color: Tuple[int, int, int], thickness: int = 1):
+        """Dibuja texto en la capa"""
+        cv.putText(self.image, text, org, cv.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+        cv.putText(self.mask, text, org, cv.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        (tw, th), baseline = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        pad = thickness + 1
+        self._add_region(org[0] - pad, org[1] - th - pad, org[0] + tw + pad, org[1] + baseline + pad)
+
+    def circle(self, center: Tuple[int, int], radius: int, color: Tuple[int, int, int]):
+        """Dibuja un círculo relleno en la capa"""
+        cv.circle(self.image, center, radius, color, -1)
+        cv.circle(self.mask, center, radius, 255, -1)
+        self._add_region(center[0] - radius - 1, center[1] - radius - 1,
+                         center[0] + radius + 2, center[1] + radius + 2)
+
+    def rectangle(self, pt1: Tuple[int, int], pt2: Tuple[int, int], color: Tuple[int, int, int]):
+        """Dibuja un rectángulo relleno en la capa"""
+        cv.rectangle(self.image, pt1, pt2, color, -1)
+        cv.rectangle(self.mask, pt1, pt2, 255, -1)
+        self._add_region(min(pt1[0], pt2[0]), min(pt1[1], pt2[1]),
+                         max(pt1[0], pt2[0]) + 1, max(pt1[1], pt2[1]) + 1)
+
+    def _prepare(self):
+        """Precalcula por región la copia con máscara o los pesos de mezcla"""
+        self._blits = []
+        for x0, y0, x1, y1 in self._regions:
+            mask = self.mask[y0:y1, x0:x1]
+            image = self.image[y0:y1, x0:x1]
+            if not mask.any():
+                continue
+            if np.all((mask == 0) | (mask == 255)):
+                self._blits.append((x0, y0, x1, y1, image, mask, None))
+                continue
+            # Texto suavizado: la imagen está premultiplicada por el alfa
+            alpha = mask.astype(np.float32) / 255.0
+            safe = np.maximum(alpha, 1e-6)[..., None]
+            color = np.clip(image / safe, 0, 255).astype(np.uint8)
+            self._blits.append((x0, y0, x1, y1, color, alpha, 1.0 - alpha))
+
+    def blit(self, frame: np.ndarray, x: int, y: int):
+        """Dibuja el contenido de la capa sobre el frame en (x, y)"""
+        if self._blits is None:
+            self._prepare()
+
+        h, w = frame.shape[:2]
+        for x0, y0, x1, y1, src, weights, inv_weights in self._blits:
+            fx0, fy0 = x + x0, y + y0
+            fx1, fy1 = min(w, x + x1), min(h, y + y1)
+            if fx0 < 0 or fy0 < 0 or fx0 >= fx1 or fy0 >= fy1:
+                continue
+            cw, ch = fx1 - fx0, fy1 - fy0
+            roi = frame[fy0:fy1, fx0:fx1]
+            if inv_weights is None:
+                cv.copyTo(src[:ch, :cw], weights[:ch, :cw], roi)
+            else:
+                cv.blendLinear(roi, src[:ch, :cw], inv_weights[:ch, :cw], weights[:ch, :cw], dst=roi)
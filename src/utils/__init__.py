@@ -2,5 +2,10 @@
 from .logger import setup_logger
 from .config import Config
 from .error_handler import ErrorHandler
+from .ring_buffer import RingBuffer
+from .profiler import FrameProfiler
+from .metrics import MetricsRegistry, MetricsServer
+from .control_server import ControlServer
 
-__all__ = ['setup_logger', 'Config', 'ErrorHandler']
+__all__ = ['setup_logger', 'Config', 'ErrorHandler', 'RingBuffer', 'FrameProfiler',
+           'MetricsRegistry', 'MetricsServer', 'ControlServer']
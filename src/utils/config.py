@@ -1,7 +1,9 @@
 """Configuración global de la aplicación"""
 import json
+import time
+import logging
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class Config:
@@ -45,23 +47,83 @@ class Config:
         'gain': 1.85,  # Aumentado de 1.20 → Mayor sensibilidad
         'deadzone': 0.008,  # Reducido de 0.015 → Menor movimiento requerido
         'debug_mode': True,
+        'head_pose_compensation': True,  # Calibrar con iris relativo a los ojos + pose de cabeza
 
         # Gestos
         'wink_threshold': 0.20,
-        'wink_min_frames': 2,
+        'wink_min_duration': 0.066,  # Segundos (independiente de los FPS)
         'double_wink_window': 0.60,
+        'gesture_table': None,  # Lista de gestos propia (None = tabla por defecto)
+        'actions': None,  # Atajos y macros propios: {"nombre": {"type": "macro", "steps": [...]}}
+        'action_queue_size': 8,  # Acciones pendientes como máximo (se ejecutan en segundo plano)
+        'adaptive_ear_enabled': True,  # Adaptar el umbral de cada ojo al usuario
+        'ear_hysteresis': 0.10,  # Banda de histéresis relativa al umbral
+        'ear_classifier_enabled': True,  # Guiño/parpadeo/entrecerrado por serie temporal
+        'ear_classifier_model': 'data/models/ear_classifier.npz',  # train_ear_classifier.py
+        'ear_classifier_window': 0.3,  # Segundos de EAR considerados
 
         # Dwell click
         'dwell_enabled': False,
         'dwell_time': 0.70,
+        'dwell_cell_size': 0.01,  # Celda del hash espacial (vecindario de ±1-2 celdas)
+        'dwell_refractory': 1.0,  # Segundos sin dwell tras un click
+        'dwell_snap': True,  # Click en el centroide de la fijación
 
         # Scroll
         'scroll_band': 0.08,
-        'scroll_step': 80,
+        'scroll_step': 80,  # Pasos de las acciones scroll_up / scroll_down
+        'scroll_speed': 1200.0,  # Unidades/s en el borde; menos cuanto más lejos
+        'scroll_rate': 15.0,  # Eventos de scroll por segundo como máximo
+        'scroll_dead_time': 0.3,  # Segundos en la banda antes de desplazar
+
+        # Magnetismo hacia objetivos de la interfaz
+        'target_snapping': True,
+        'snap_radius': 60.0,  # Píxeles a los que un objetivo empieza a atraer el cursor
+        'snap_strength': 0.6,  # Fracción del camino al objetivo recorrida dentro de él
+        'targets_file': 'data/targets.json',  # Lista de rectángulos [x, y, ancho, alto]
+        'targets_reload_interval': 1.0,  # Segundos entre comprobaciones del archivo
+
+        # Entrada del sistema operativo
+        'input_backend': 'auto',  # auto | pyautogui | xtest (Linux/X11, python-xlib) | null
+        'input_failsafe': True,  # pyautogui: cursor en una esquina = abortar
 
         # Filtros - OPTIMIZADO PARA RESPUESTA RÁPIDA
         'filter_min_cutoff': 2.0,  # Aumentado de 1.2 → Más responsivo
         'filter_beta': 0.08,  # Aumentado de 0.04 → Mejor respuesta a movimientos rápidos
+        'smooth_landmarks': False,  # Filtrar los 478 landmarks antes de detectar gestos
+
+        # Filtro predictivo: 'one_euro', 'kalman_cv', 'kalman_ca' o 'imm'
+        'filter_type': 'one_euro',
+        'kalman_process_noise': None,  # None = valor por defecto de cada modelo
+        'kalman_measurement_noise': 2e-5,
+        'prediction_extra_latency': 0.03,  # Exposición de cámara + refresco de pantalla (s)
+        'replay_pipeline_latency': 0.05,  # Latencia fija al reproducir (s): predicción determinista
+
+        # Clasificación de eventos oculares (fijación / sacada / parpadeo)
+        'saccade_velocity_threshold': 1.0,  # Pantallas por segundo
+        'fixation_dispersion_threshold': 0.03,
+        'fixation_smoothing': 1.5,  # >1 = más suave durante fijaciones
+        'saccade_smoothing': 0.3,  # <1 = más responsivo durante sacadas
+        'blink_threshold': 0.15,
+
+        # Grabar trazas de mirada para autoajuste (autotune_filters.py)
+        'record_gaze_traces': False,
+
+        # Perfilado por etapas del loop principal (tecla [p])
+        'profiling_enabled': False,
+        'profiling_buffer_frames': 600,
+
+        # Endpoint de métricas Prometheus (http://host:puerto/metrics)
+        'metrics_enabled': False,
+        'metrics_host': '127.0.0.1',
+        'metrics_port': 9108,
+
+        # API de control local (GET/POST /params, /profile, /calibrate, /key, /status)
+        'control_api_enabled': False,
+        'control_api_port': 9109,
+
+        # Recarga en caliente de config.json (0 = desactivada)
+        'config_reload_interval': 1.0,
 
         # Cámara
         'camera_index': 0,
@@ -78,8 +140,17 @@ class Config:
         'face_similarity_threshold': 0.85,
         'auth_check_interval': 2.0,  # segundos entre verificaciones
 
+        # Logging
+        'log_json': False,  # Archivo en formato JSON por línea
+        'log_max_bytes': 10 * 1024 * 1024,  # Rotación por tamaño
+        'log_backup_count': 5,
+        'log_rate_limit': 5.0,  # Mensajes/s por punto de llamada (None = sin límite)
+
         # UI
         'show_camera_preview': True,
+        'headless': False,  # Sin vista previa ni waitKey (kioscos)
+        'headless_snapshot_path': 'data/preview.jpg',
+        'headless_snapshot_interval': 0.0,  # Segundos entre capturas (0 = desactivado)
         'show_fps': True,
         'window_name': 'Gaze Control'
     }
@@ -167,3 +238,80 @@ class Config:
             print(f"  Min Cutoff: {profile['filter_min_cutoff']}")
             print(f"  Beta: {profile['filter_beta']}")
         print("=" * 60)
+
+
+class ConfigWatcher:
+    """
+    Detecta cambios en el archivo de configuración comparando su mtime a
+    intervalos (una llamada a stat por intervalo) y retorna solo las claves
+    cuyo valor cambió respecto a la última lectura del archivo
+    """
+
+    def __init__(self, config_file: str = "data/config.json", interval: float = 1.0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            config_file: Archivo a vigilar
+            interval: Segundos mínimos entre comprobaciones
+        """
+        self.config_file = Path(config_file)
+        self.interval = interval
+        self.logger = logger
+
+        self._last_check = time.monotonic()
+        self._mtime = self._get_mtime()
+        self._snapshot = self._read() or {}
+
+    def _get_mtime(self) -> Optional[int]:
+        try:
+            return self.config_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        """Lee y valida el archivo; None si no es un objeto JSON válido"""
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.error(f"config.json inválido, se mantienen los valores actuales: {e}")
+            return None
+        if not isinstance(data, dict):
+            if self.logger:
+                self.logger.error("config.json debe contener un objeto JSON")
+            return None
+        return data
+
+    def mark_saved(self):
+        """Toma como referencia el archivo actual (tras guardarlo la propia aplicación)"""
+        self._mtime = self._get_mtime()
+        self._snapshot = self._read() or self._snapshot
+
+    def poll(self) -> Dict[str, Any]:
+        """
+        Comprueba el archivo si ha pasado el intervalo
+
+        Returns:
+            Diccionario con las claves nuevas o modificadas (vacío si no hay cambios)
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return {}
+        self._last_check = now
+
+        mtime = self._get_mtime()
+        if mtime is None or mtime == self._mtime:
+            return {}
+        self._mtime = mtime
+
+        data = self._read()
+        if data is None:
+            return {}
+
+        changes = {key: value for key, value in data.items()
+                   if key not in self._snapshot or self._snapshot[key] != value}
+        self._snapshot = data
+        if changes and self.logger:
+            self.logger.info(f"Cambios detectados en {self.config_file}: {sorted(changes)}")
+        return changes
@@ -0,0 +1,188 @@
+"""API de control local (HTTP sobre asyncio) para ajustar la aplicación en marcha"""
+import json
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ControlServer:
+    """
+    Servidor HTTP mínimo en 127.0.0.1 que corre un event loop asyncio en un
+    hilo de fondo.
+
+    Las rutas marcadas `in_frame_loop` no se ejecutan en el hilo del servidor:
+    se encolan y el loop principal las atiende con process_pending() entre
+    frames, de modo que el estado de la aplicación solo se toca desde un hilo
+    """
+
+    MAX_BODY = 64 * 1024
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9109, timeout: float = 5.0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            host: Interfaz de escucha (por defecto solo local)
+            port: Puerto TCP (0 = elegir uno libre)
+            timeout: Segundos máximos esperando al loop principal
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.logger = logger
+
+        self._routes: Dict[Tuple[str, str], Tuple[Callable[[Any], Any], bool]] = {}
+        self._commands: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+    def route(self, method: str, path: str, handler: Callable[[Any], Any],
+              in_frame_loop: bool = True):
+        """
+        Registra una ruta
+
+        Args:
+            method: 'GET' o 'POST'
+            path: Ruta exacta (p. ej. '/params')
+            handler: Función que recibe el cuerpo JSON (o None) y retorna un
+                dict (respuesta JSON) o str (texto plano)
+            in_frame_loop: Ejecutar en el loop principal (False = en el hilo
+                del servidor; solo para lecturas seguras entre hilos)
+        """
+        self._routes[(method.upper(), path)] = (handler, in_frame_loop)
+
+    # ------------------------------------------------------------------
+    # Lado del loop principal
+    # ------------------------------------------------------------------
+
+    def process_pending(self, max_commands: int = 8):
+        """Ejecuta los comandos encolados (llamar una vez por frame)"""
+        for _ in range(max_commands):
+            try:
+                handler, body, future = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(handler(body))
+            except Exception as e:
+                future.set_exception(e)
+
+    # ------------------------------------------------------------------
+    # Lado del servidor
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Arranca el servidor en un hilo de fondo; False si no pudo escuchar"""
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5.0)
+        if self._server is None:
+            return False
+        if self.logger:
+            self.logger.info(f"API de control en http://{self.host}:{self.port}")
+        return True
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"No se pudo iniciar la API de control en {self.host}:{self.port}: {e}")
+            self._server = None
+            self._started.set()
+            self._loop.close()
+            return
+
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, payload = await self._dispatch(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            status, payload = 400, {'error': 'petición inválida'}
+
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+                  500: 'Internal Server Error', 504: 'Gateway Timeout'}.get(status, 'OK')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('ascii') + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) < 2:
+            raise ValueError("línea de petición vacía")
+        method, path = request_line[0].upper(), request_line[1].split('?')[0]
+
+        length = 0
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        if length > self.MAX_BODY:
+            raise ValueError("cuerpo demasiado grande")
+
+        body = None
+        if length:
+            body = json.loads((await reader.readexactly(length)).decode('utf-8'))
+
+        route = self._routes.get((method, path))
+        if route is None:
+            return 404, {'error': f"ruta desconocida: {method} {path}"}
+        handler, in_frame_loop = route
+
+        try:
+            if not in_frame_loop:
+                return 200, handler(body)
+            future: Future = Future()
+            self._commands.put((handler, body, future))
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            return 200, result
+        except asyncio.TimeoutError:
+            return 504, {'error': 'el loop principal no respondió a tiempo'}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error en API de control ({method} {path}): {e}")
+            return 500, {'error': str(e)}
+
+    def stop(self):
+        """Detiene el servidor y su hilo"""
+        if self._loop is None or self._thread is None:
+            return
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+        self._thread = None
@@ -1,17 +1,155 @@
 """Sistema de logging para la aplicación"""
+import json
+import time
+import queue
+import atexit
 import logging
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 
-def setup_logger(name: str = "GazeControl", log_dir: str = "data/logs") -> logging.Logger:
+class RateLimitFilter(logging.Filter):
     """
-    Configura el sistema de logging
+    Limita los mensajes por logger y punto de llamada con un token bucket,
+    para que un bucle de errores (p. ej. cámara desconectada) no llene el disco
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 20):
+        """
+        Args:
+            rate: Mensajes por segundo permitidos en régimen sostenido
+            burst: Mensajes permitidos de golpe
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        # clave -> (tokens, último instante, mensajes suprimidos)
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.burst), now, 0]
+            self._buckets[key] = bucket
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            bucket[2] += 1
+            return False
+
+        bucket[0] = tokens - 1.0
+        if bucket[2]:
+            record.msg = f"{record.getMessage()} (+{bucket[2]} mensajes suprimidos)"
+            record.args = None
+            bucket[2] = 0
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON por línea"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    Archivo con rotación por tamaño y por cambio de día que agrupa las
+    escrituras: vacía el buffer cada `batch_size` registros, cada
+    `flush_interval` segundos o ante un WARNING o superior
+    """
+
+    def __init__(self, log_dir: Path, prefix: str, max_bytes: int, backup_count: int,
+                 batch_size: int = 64, flush_interval: float = 1.0, suffix: str = "log"):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.suffix = suffix
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._day = datetime.now().strftime('%Y%m%d')
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        super().__init__(self._path_for_day(self._day), maxBytes=max_bytes,
+                         backupCount=backup_count, encoding='utf-8')
+
+    def _path_for_day(self, day: str) -> str:
+        return str(self.log_dir / f"{self.prefix}_{day}.{self.suffix}")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        day = datetime.now().strftime('%Y%m%d')
+        if day != self._day:
+            # Nuevo día: pasar al archivo del día en lugar de renombrar
+            self._day = day
+            self.flush()
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = self._path_for_day(day)
+            return False
+        return super().shouldRollover(record)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+
+            now = time.monotonic()
+            if (self._pending >= self.batch_size or record.levelno >= logging.WARNING or
+                    now - self._last_flush >= self.flush_interval):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        super().flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+
+# Listeners activos por nombre de logger (se detienen al salir)
+_listeners: Dict[str, QueueListener] = {}
+
+
+def setup_logger(name: str = "GazeControl", log_dir: str = "data/logs",
+                 json_lines: bool = False, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, rate_limit: Optional[float] = 5.0,
+                 rate_burst: int = 20) -> logging.Logger:
+    """
+    Configura el sistema de logging.
+
+    Los registros se encolan con un QueueHandler y un hilo QueueListener los
+    escribe en consola y archivo, de modo que el loop principal no hace I/O
 
     Args:
         name: Nombre del logger
         log_dir: Directorio para guardar los logs
+        json_lines: Escribir el archivo en formato JSON por línea
+        max_bytes: Tamaño máximo de cada archivo antes de rotar
+        backup_count: Archivos rotados a conservar por día
+        rate_limit: Mensajes por segundo por punto de llamada (None = sin límite)
+        rate_burst: Ráfaga máxima permitida por punto de llamada
 
     Returns:
         Logger configurado
@@ -38,13 +176,36 @@ def setup_logger(name: str = "GazeControl", log_dir: str = "data/logs") -> loggi
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
-    # Handler para archivo (rotación diaria)
-    log_file = log_path / f"gaze_control_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # Handler para archivo (rotación diaria y por tamaño, escrituras agrupadas)
+    file_handler = BatchedRotatingFileHandler(
+        log_path, "gaze_control", max_bytes=max_bytes, backup_count=backup_count,
+        suffix="jsonl" if json_lines else "log"
+    )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
+
+    # El loop solo encola; el listener escribe en su propio hilo
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter(rate_limit, rate_burst))
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, console_handler, file_handler,
+                             respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    atexit.register(stop_logger, name)
 
     return logger
+
+
+def stop_logger(name: str = "GazeControl"):
+    """Vacía la cola pendiente y detiene el hilo de escritura"""
+    listener = _listeners.pop(name, None)
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,271 @@
+"""Métricas de monitorización en formato de texto Prometheus"""
+import os
+import sys
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Buckets por defecto en segundos (latencias de frame y escrituras)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.075,
+                   0.1, 0.15, 0.25, 0.5, 1.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Contador monótono. Cada métrica la escribe un único hilo (el loop
+    principal) y el servidor solo la lee, por lo que no usa locks
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.value = 0
+        self._children: Dict[Tuple[str, ...], 'Counter'] = {}
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def labels(self, *values: str) -> 'Counter':
+        """Contador hijo para una combinación de etiquetas"""
+        child = self._children.get(values)
+        if child is None:
+            child = Counter(self.name, self.documentation)
+            self._children[values] = child
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        if self.label_names:
+            for values, child in list(self._children.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, values)} "
+                             f"{_format_value(child.value)}")
+        else:
+            lines.append(f"{self.name} {_format_value(self.value)}")
+        return lines
+
+
+class Gauge:
+    """Valor instantáneo; opcionalmente calculado al exportar con una función"""
+
+    def __init__(self, name: str, documentation: str,
+                 function: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self) -> List[str]:
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                value = float('nan')
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(float(value))}"]
+
+
+class Histogram:
+    """Histograma de buckets fijos con suma y conteo"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._children: Dict[Tuple[str, ...], 'Histogram'] = {}
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def labels(self, *values: str) -> 'Histogram':
+        """Histograma hijo para una combinación de etiquetas"""
+        child = self._children.get(values)
+        if child is None:
+            child = Histogram(self.name, self.documentation, self.buckets, self.label_names)
+            self._children[values] = child
+        return child
+
+    def _render_series(self, label_values: Sequence[str] = ()) -> List[str]:
+        counts = list(self.counts)
+        labels = _format_labels(self.label_names, label_values)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = f'le="{_format_value(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, label_values, le)} "
+                         f"{cumulative}")
+        # La suma de buckets es coherente aunque el loop escriba durante la lectura
+        lines.append(f"{self.name}_sum{labels} {_format_value(float(self.sum))}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        if self.label_names:
+            for values, child in list(self._children.items()):
+                lines.extend(child._render_series(values))
+        else:
+            lines.extend(self._render_series())
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas por el servidor"""
+
+    def __init__(self, prefix: str = "gaze_"):
+        self.prefix = prefix
+        self._metrics: List = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str,
+              function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, function))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                  label_names: Sequence[str] = ()) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, buckets, label_names))
+
+    def render(self) -> str:
+        """Exposición completa en formato de texto Prometheus 0.0.4"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes() -> float:
+    """Memoria residente del proceso en bytes (0 si no se puede obtener)"""
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/statm') as f:
+                return float(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))
+
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t),
+                            ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t),
+                            ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return float(counters.WorkingSetSize)
+            return 0.0
+
+        # macOS y otros: solo está disponible el pico (ru_maxrss en bytes en macOS)
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(rss if sys.platform == 'darwin' else rss * 1024)
+    except Exception:
+        return 0.0
+
+
+class MetricsServer:
+    """Servidor HTTP local en un hilo de fondo que sirve /metrics"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            registry: Métricas a exportar
+            host: Interfaz de escucha (por defecto solo local)
+            port: Puerto TCP
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # No llenar los logs diarios con cada scrape
+                pass
+
+        return Handler
+
+    def start(self) -> bool:
+        """Arranca el servidor; False si el puerto no está disponible"""
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"No se pudo iniciar el servidor de métricas en {self.host}:{self.port}: {e}")
+            return False
+
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="metrics-server", daemon=True)
+        self._thread.start()
+        if self.logger:
+            self.logger.info(f"Métricas disponibles en http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        """Detiene el servidor"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,175 @@
+"""Instrumentación por etapas del loop principal"""
+import json
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from .ring_buffer import RingBuffer
+
+
+class FrameProfiler:
+    """
+    Mide la duración de cada etapa del pipeline con perf_counter_ns y guarda
+    un registro por frame en un buffer circular de tamaño fijo.
+
+    Desactivado, start() retorna 0 y stop() sale en la primera comparación,
+    por lo que las llamadas pueden quedarse en el camino crítico
+    """
+
+    STAGES = ('capture', 'color_convert', 'face_mesh', 'filtering',
+              'mapping', 'actuation', 'auth', 'render')
+    STAGE_INDEX = {name: i for i, name in enumerate(STAGES)}
+
+    # Columnas del registro: inicio del frame, duración total,
+    # duración por etapa y desplazamiento del primer inicio de cada etapa
+    _DUR = 2
+    _OFF = 2 + len(STAGES)
+
+    def __init__(self, capacity: int = 600, enabled: bool = False,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            capacity: Número de frames guardados
+            enabled: Activar la medición desde el inicio
+        """
+        self.enabled = enabled
+        self.logger = logger
+        self.records = RingBuffer(capacity, width=self._OFF + len(self.STAGES), dtype=np.int64)
+        self._current = np.zeros(self.records.width, dtype=np.int64)
+        self._frame_open = False
+
+    def set_enabled(self, enabled: bool):
+        """Activa o desactiva la medición"""
+        self.enabled = enabled
+        self._frame_open = False
+        if self.logger:
+            self.logger.info(f"Perfilado por etapas {'activado' if enabled else 'desactivado'}")
+
+    def begin_frame(self):
+        """Abre el registro de un frame, cerrando el anterior si sigue abierto"""
+        if not self.enabled:
+            return
+        if self._frame_open:
+            self.end_frame()
+        self._current[:] = 0
+        self._current[0] = time.perf_counter_ns()
+        self._frame_open = True
+
+    def end_frame(self):
+        """Cierra el frame actual y lo guarda en el buffer"""
+        if not self._frame_open:
+            return
+        self._current[1] = time.perf_counter_ns() - self._current[0]
+        self.records.append(self._current)
+        self._frame_open = False
+
+    def start(self) -> int:
+        """Marca el inicio de una etapa (0 si está desactivado)"""
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def stop(self, stage: str, start: int):
+        """
+        Acumula la duración de una etapa en el frame actual
+
+        Args:
+            stage: Nombre de la etapa (ver STAGES)
+            start: Valor retornado por start()
+        """
+        if not start or not self._frame_open:
+            return
+        end = time.perf_counter_ns()
+        i = self.STAGE_INDEX[stage]
+        current = self._current
+        if current[self._DUR + i] == 0:
+            current[self._OFF + i] = start - current[0]
+        current[self._DUR + i] += end - start
+
+    @contextmanager
+    def _span(self, stage: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.stop(stage, start)
+
+    def span(self, stage: str):
+        """Context manager que mide una etapa; sin coste de medición si está desactivado"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(stage)
+
+    def stage_breakdown(self, n: int = 30) -> Dict[str, float]:
+        """
+        Duración media por etapa en los últimos frames
+
+        Args:
+            n: Número de frames a promediar
+
+        Returns:
+            Diccionario etapa -> milisegundos, más 'frame' con el total
+        """
+        rows = self.records.last(n)
+        if len(rows) == 0:
+            return {}
+        means = rows.mean(axis=0) / 1e6
+        breakdown = {name: float(means[self._DUR + i]) for i, name in enumerate(self.STAGES)}
+        breakdown['frame'] = float(means[1])
+        return breakdown
+
+    def export_chrome_trace(self, file_path: str) -> int:
+        """
+        Exporta los frames guardados en formato Chrome Trace (chrome://tracing, Perfetto)
+
+        Args:
+            file_path: Archivo JSON de salida
+
+        Returns:
+            Número de frames exportados
+        """
+        rows = self.records.last()
+        events = []
+        for frame_index, row in enumerate(rows):
+            frame_start = int(row[0])
+            events.append({
+                'name': 'frame', 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': frame_start / 1000.0, 'dur': int(row[1]) / 1000.0,
+                'args': {'frame': frame_index}
+            })
+            for i, name in enumerate(self.STAGES):
+                duration = int(row[self._DUR + i])
+                if duration == 0:
+                    continue
+                events.append({
+                    'name': name, 'cat': 'stage', 'ph': 'X', 'pid': 1, 'tid': 2,
+                    'ts': (frame_start + int(row[self._OFF + i])) / 1000.0,
+                    'dur': duration / 1000.0
+                })
+
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+        if self.logger:
+            self.logger.info(f"Traza de perfilado exportada: {path} ({len(rows)} frames)")
+        return len(rows)
+
+    def clear(self):
+        """Descarta los registros guardados"""
+        self.records.clear()
+        self._frame_open = False
+
+
+class _NullSpan:
+    """Context manager vacío para el perfilador desactivado"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
@@ -0,0 +1,60 @@
+"""Buffer circular de tamaño fijo para historiales por frame"""
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Buffer circular respaldado por un array de NumPy preasignado.
+    Guarda filas de ancho fijo sin asignar memoria en cada inserción
+    """
+
+    def __init__(self, capacity: int, width: int = 1, dtype=np.float64):
+        """
+        Args:
+            capacity: Número máximo de filas
+            width: Columnas por fila
+            dtype: Tipo de dato del array
+        """
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser mayor que cero")
+
+        self.capacity = capacity
+        self.width = width
+        self._data = np.zeros((capacity, width), dtype=dtype)
+        self._index = 0
+        self._size = 0
+
+    def append(self, values):
+        """Inserta una fila, sobrescribiendo la más antigua si está lleno"""
+        self._data[self._index] = values
+        self._index = (self._index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def last(self, n: int = None) -> np.ndarray:
+        """
+        Retorna las últimas n filas en orden cronológico (copia)
+
+        Args:
+            n: Número de filas (None = todas)
+        """
+        if n is None or n > self._size:
+            n = self._size
+        start = (self._index - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n].copy()
+        return np.concatenate((self._data[start:], self._data[:self._index]))
+
+    def latest(self) -> np.ndarray:
+        """Retorna la fila más reciente (vista)"""
+        if self._size == 0:
+            raise IndexError("Buffer vacío")
+        return self._data[(self._index - 1) % self.capacity]
+
+    def clear(self):
+        """Vacía el buffer"""
+        self._index = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
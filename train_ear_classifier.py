@@ -0,0 +1,135 @@
+"""
+Script para entrenar el clasificador de guiños/parpadeos a partir de sesiones grabadas
+
+Graba sesiones con `python main.py --record sesion.gzrec` y etiqueta los gestos
+en `sesion.gzrec.labels.json` (segundos desde el inicio de la grabación):
+
+    [{"start": 3.20, "end": 3.45, "label": "wink_left"},
+     {"start": 7.10, "end": 7.22, "label": "blink"},
+     {"start": 9.00, "end": 11.0, "label": "squint"}]
+
+Etiquetas: open, wink_left, wink_right, blink, squint. Los frames fuera de
+cualquier segmento cuentan como 'open'
+"""
+import sys
+import argparse
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2 as cv
+
+from src.core.face_detector import FaceDetector
+from src.core.frame_preprocessor import FramePreprocessor
+from src.core.replay import ReplaySource
+from src.core.ear_classifier import EarSequenceClassifier, load_label_segments, build_training_set
+from src.utils.config import Config
+from src.utils.logger import setup_logger
+
+
+def extract_ear_series(session_path: Path, detector: FaceDetector, logger):
+    """
+    Recorre una grabación y extrae los EAR de cada frame con rostro
+
+    Returns:
+        Tupla (timestamps (N,) relativos al inicio, EAR (N, 2))
+    """
+    source = ReplaySource(str(session_path), realtime=False, logger=logger)
+    preprocessor = FramePreprocessor(mirror=True)
+    times, ears = [], []
+    try:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frame, rgb = preprocessor.process(frame)
+            results = detector.detect(frame, rgb)
+            ear_values = detector.get_eye_aspect_ratios(results) if results else None
+            if ear_values:
+                times.append(source.get(cv.CAP_PROP_POS_MSEC) / 1000.0)
+                ears.append(ear_values)
+    finally:
+        source.release()
+    return np.asarray(times), np.asarray(ears, dtype=np.float64).reshape(-1, 2)
+
+
+def print_confusion(classifier: EarSequenceClassifier, features: np.ndarray, labels: np.ndarray):
+    """Muestra la matriz de confusión (filas = etiqueta real)"""
+    classes = EarSequenceClassifier.CLASSES
+    predicted = np.array([classifier.predict(f) for f in features])
+    print(f"\n  {'':>11}" + "".join(f"{name:>11}" for name in classes) + f"{'acierto':>9}")
+    for name in classes:
+        rows = predicted[labels == name]
+        counts = [int(np.sum(rows == other)) for other in classes]
+        accuracy = f"{counts[classes.index(name)] / len(rows):>9.1%}" if len(rows) else f"{'-':>9}"
+        print(f"  {name:>11}" + "".join(f"{c:>11}" for c in counts) + accuracy)
+    print(f"\n  Acierto global: {np.mean(predicted == labels):.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena el clasificador temporal de guiños")
+    parser.add_argument('sessions', nargs='+', help="Grabaciones .gzrec con su archivo .labels.json")
+    parser.add_argument('--output', help="Modelo de salida (por defecto 'ear_classifier_model' de la configuración)")
+    parser.add_argument('--holdout', type=int, default=1,
+                        help="Sesiones reservadas para evaluar (las últimas; 0 = evaluar con el entrenamiento)")
+    args = parser.parse_args()
+
+    logger = setup_logger()
+    config = Config()
+    output = args.output or config.get('ear_classifier_model')
+    window = config.get('ear_classifier_window')
+
+    print("=" * 60)
+    print("ENTRENAMIENTO DEL CLASIFICADOR DE GUIÑOS - Gaze Control v2.0")
+    print("=" * 60)
+
+    detector = FaceDetector(logger=logger)
+    datasets = []
+    for session in args.sessions:
+        session_path = Path(session)
+        labels_path = Path(f"{session}.labels.json")
+        if not labels_path.exists():
+            print(f"\n✗ Falta el archivo de etiquetas {labels_path}, se omite la sesión")
+            continue
+        try:
+            segments = load_label_segments(labels_path)
+            times, ears = extract_ear_series(session_path, detector, logger)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"\n✗ Error leyendo {session_path}: {e}")
+            continue
+        if not len(times):
+            print(f"\n✗ Sin rostro detectado en {session_path}")
+            continue
+        features, labels = build_training_set(
+            times, ears, segments, base_threshold=config.get('wink_threshold'), window=window
+        )
+        datasets.append((features, labels))
+        print(f"\n✓ {session_path.name}: {len(times)} frames, {len(segments)} segmentos")
+
+    if not datasets:
+        print("\n✗ No hay sesiones válidas")
+        return
+
+    holdout = min(args.holdout, len(datasets) - 1)
+    train = datasets[:len(datasets) - holdout]
+    test = datasets[len(datasets) - holdout:] if holdout else train
+
+    classifier = EarSequenceClassifier(window=window)
+    counts = classifier.fit(np.concatenate([d[0] for d in train]), np.concatenate([d[1] for d in train]))
+    print("\nEjemplos por clase:", ", ".join(f"{name}={n}" for name, n in counts.items()))
+
+    print("\nEvaluación" + (" (sesiones reservadas)" if holdout else " (datos de entrenamiento)") + ":")
+    print_confusion(classifier, np.concatenate([d[0] for d in test]), np.concatenate([d[1] for d in test]))
+
+    if holdout:
+        # El modelo final usa todas las sesiones
+        classifier = EarSequenceClassifier(window=window)
+        classifier.fit(np.concatenate([d[0] for d in datasets]), np.concatenate([d[1] for d in datasets]))
+
+    classifier.save(output)
+    print(f"\n✓ Modelo guardado en {output}")
+
+
+if __name__ == "__main__":
+    main()